@@ -3,28 +3,31 @@
 
 import os
 import sys
+import json
+import time
 import logging
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, g, render_template, request, jsonify, redirect, url_for
 
 # 檢查是否在 Ingress 模式下運行
 ingress_path = os.getenv('INGRESS_PATH', '')
 ingress_url = os.getenv('INGRESS_URL', '')
 
-# 設定日誌讓 Home Assistant 看得到
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.StreamHandler(sys.stderr)
-    ]
+# 添加 utils 模組到路徑
+sys.path.append('/opt/urnetwork')
+
+from utils.log_pipeline import setup_logging
+
+# 設定日誌讓 Home Assistant 看得到（單一背景寫入者，只輸出到 stdout）
+setup_logging(
+    level=os.getenv('URNETWORK_LOG_LEVEL', 'info'),
+    json_format=os.getenv('URNETWORK_LOG_FORMAT', 'text').lower() == 'json',
+    rate=float(os.getenv('URNETWORK_LOG_RATE', '20'))
 )
-logger = logging.getLogger(__name__)
+logger = logging.getLogger('urnetwork')
 
 def log_message(msg):
     """統一日誌輸出"""
-    print(f"[URnetwork] {msg}", flush=True)
-    print(f"[URnetwork] {msg}", file=sys.stderr, flush=True)
+    logger.info(msg)
 
 # 記錄 Ingress 資訊
 if ingress_path:
@@ -32,48 +35,127 @@ if ingress_path:
 else:
     log_message("Running in direct mode (no Ingress)")
 
-# 添加 utils 模組到路徑
-sys.path.append('/opt/urnetwork')
+from utils.startup import ManagerLoader
 
-try:
-    from utils.docker_manager import DockerManager
-    from utils.auth_manager import AuthManager
-    from utils.stats_collector import StatsCollector
-
-    # 管理器實例
-    docker_mgr = DockerManager()
-    auth_mgr = AuthManager()
-    stats_collector = StatsCollector()
-
-    log_message("所有管理器載入成功")
-except ImportError as e:
-    log_message(f"載入管理器失敗: {e}")
-    # 建立假的管理器避免錯誤
-    class DummyManager:
-        def is_authenticated(self):
-            return False
-        def get_status(self):
-            return {"status": "停止", "message": "模擬狀態"}
-        def get_latest_stats(self):
-            return {"total_earnings": "0.00", "uptime": "未知", "traffic_served": "0 MB"}
-        def authenticate(self, code):
-            return {"success": True, "message": "模擬認證成功"}
-        def start_provider(self):
-            return {"success": True, "message": "模擬啟動"}
-        def stop_provider(self):
-            return {"success": True, "message": "模擬停止"}
-        def restart_provider(self):
-            return {"success": True, "message": "模擬重啟"}
-        def update_provider(self):
-            return {"success": True, "message": "模擬更新"}
-        def get_logs(self, lines=100):
-            return "URnetwork 模擬日誌輸出\n程式正在運行中...\n等待實際 Docker 容器啟動"
-        def get_last_update(self):
-            return "2024-01-01 12:00:00"
-    
-    docker_mgr = DummyManager()
-    auth_mgr = DummyManager()
-    stats_collector = DummyManager()
+# 管理器在背景初始化，HTTP 伺服器不需等待 Docker SDK 載入與二進位檔搜尋
+managers = ManagerLoader()
+if os.getenv('URNETWORK_LAZY_STARTUP', 'true').lower() in ('0', 'false', 'no'):
+    managers.load()
+else:
+    managers.start()
+
+from utils.addon_options import get_option
+from utils.auth_jobs import AuthJobManager
+from utils.bandwidth_scheduler import REASON_LABELS, BandwidthScheduler
+from utils.crash_guard import CrashLoopGuard
+from utils import deadline
+from utils.ha_sensors import DEFAULT_API_URL, SensorPublisher
+from utils.health import HealthMonitor
+from utils.http_cache import cached_json, snapshots
+from utils.load_governor import LoadGovernor
+from utils.prewarm import ContainerPrewarmer
+from utils.profiler import SamplingProfiler
+
+def _probe_docker():
+    """確認 Docker daemon 可連線"""
+    client = getattr(managers.docker_mgr, 'client', None)
+    if client is None:
+        raise RuntimeError('Docker client unavailable')
+    client.ping()
+    return 'reachable'
+
+def _probe_provider():
+    """Provider 容器狀態"""
+    return managers.docker_mgr.get_status().get('status', 'unknown')
+
+def _probe_auth():
+    """認證狀態：只解析 jwt 檔案的 exp（有快取），不執行 docker 命令或啟動容器"""
+    token = managers.auth_mgr.get_token_status()
+    return token is not None and not token['expired']
+
+# 健康檢查端點只讀取這裡的快取結果，不會同步呼叫 Docker
+health_monitor = HealthMonitor(
+    {'docker': _probe_docker, 'provider': _probe_provider, 'auth': _probe_auth},
+    interval=float(os.getenv('URNETWORK_HEALTH_INTERVAL', '30'))
+)
+health_monitor.start(wait=managers.wait)
+
+# 認證在背景工作中執行，HTTP 請求立即返回
+auth_jobs = AuthJobManager()
+
+# 崩潰循環偵測：由 Docker 事件驅動，管理器就緒後開始監聽
+crash_guard = CrashLoopGuard()
+managers.on_ready(lambda loaded: crash_guard.start(loaded.docker_mgr))
+
+profiler = SamplingProfiler()
+
+def _apply_resources(loaded):
+    """啟動時把選項中的資源設定套用到既有容器"""
+    result = loaded.docker_mgr.apply_resources()
+    if not result.get('success'):
+        log_message(f"Resource profile not applied: {result.get('error')}")
+
+managers.on_ready(_apply_resources)
+
+# 預先建立 created 狀態的容器，啟動時只需要一次 start 呼叫
+prewarmer = None
+if get_option('prewarm_container', True):
+    prewarmer = ContainerPrewarmer()
+    managers.on_ready(lambda loaded: prewarmer.start(loaded.docker_mgr))
+
+# 依主機負載調整 Provider 的 CPU 配額（選用）
+governor = None
+if get_option('governor', False):
+    def _start_governor(loaded):
+        global governor
+        governor = LoadGovernor(
+            loaded.docker_mgr,
+            stats=loaded.stats_collector.get_latest_stats,
+            min_cpus=float(get_option('governor_min_cpus', 0.25)),
+            pause_at=float(get_option('governor_pause_pressure', 80))
+        )
+        governor.start()
+    managers.on_ready(_start_governor)
+
+# 運行時段與流量配額（未設定時段或配額時不啟用）
+scheduler = None
+def _start_scheduler(loaded):
+    global scheduler
+    try:
+        candidate = BandwidthScheduler(
+            loaded.docker_mgr,
+            state_path=os.path.join(os.getenv('URNETWORK_DATA_DIR', '/data'), 'bandwidth_usage.json'),
+            windows=get_option('schedule_windows', ''),
+            # 沒有預設值時 URNETWORK_* 環境變數會以字串傳回
+            daily_quota_gb=float(get_option('daily_quota_gb') or 0),
+            monthly_quota_gb=float(get_option('monthly_quota_gb') or 0),
+            reset_day=int(get_option('quota_reset_day', 1))
+        )
+    except ValueError as e:
+        log_message(f"Bandwidth scheduler disabled: {e}")
+        return
+    if candidate.enabled:
+        scheduler = candidate
+        scheduler.start()
+managers.on_ready(_start_scheduler)
+
+def _sensor_sample():
+    """感測器推送的取樣（經由共用快取）"""
+    return (
+        managers.docker_mgr.get_status(),
+        managers.docker_mgr.get_stats(),
+        managers.stats_collector.get_latest_stats()
+    )
+
+# 推送 Provider 感測器到 Home Assistant（選用）
+if get_option('ha_sensors', False):
+    sensor_publisher = SensorPublisher(
+        _sensor_sample,
+        api_url=os.getenv('URNETWORK_HA_API_URL', DEFAULT_API_URL),
+        token=os.getenv('SUPERVISOR_TOKEN'),
+        interval=float(get_option('ha_sensors_interval', 30))
+    )
+    sensor_publisher.start(wait=managers.wait)
 
 # Flask 應用程式
 app = Flask(__name__)
@@ -95,6 +177,60 @@ def make_url(endpoint, **values):
     else:
         return url_for(endpoint, **values)
 
+WARMING_UP_PAGE = '''
+<!DOCTYPE html>
+<html lang="zh-TW">
+<head>
+    <meta charset="UTF-8">
+    <meta http-equiv="refresh" content="3">
+    <title>URnetwork Provider 啟動中</title>
+    <style>
+        body { font-family: Arial, sans-serif; max-width: 600px; margin: 50px auto; padding: 20px; text-align: center; }
+    </style>
+</head>
+<body>
+    <h1>URnetwork Provider 啟動中</h1>
+    <p>正在初始化服務，頁面將自動重新整理...</p>
+</body>
+</html>
+'''
+
+# 不需要等待管理器初始化的端點
+STARTUP_EXEMPT_ENDPOINTS = {'health_check', 'health_live', 'health_ready', 'static', 'debug_profile'}
+
+@app.before_request
+def require_managers():
+    """管理器尚未就緒時回傳啟動中頁面"""
+    if managers.ready or request.endpoint in STARTUP_EXEMPT_ENDPOINTS:
+        return None
+
+    if request.path.startswith('/api/'):
+        return jsonify({'success': False, 'error': '服務啟動中，請稍候', 'warming_up': True}), 503
+    return WARMING_UP_PAGE, 503, {'Retry-After': '3'}
+
+# 每個請求的時間預算（秒），下游 Docker / Supervisor 呼叫的逾時不會超過剩餘預算；
+# 讀取請求預算較短，啟動、更新等操作需要等待拉取映像檔
+READ_BUDGET = float(os.getenv('URNETWORK_REQUEST_BUDGET', '10'))
+ACTION_BUDGET = float(os.getenv('URNETWORK_ACTION_BUDGET', '300'))
+
+@app.before_request
+def start_deadline():
+    """設定本次請求的期限；呼叫端可以用 X-Request-Budget 標頭縮短"""
+    seconds = READ_BUDGET if request.method in ('GET', 'HEAD') else ACTION_BUDGET
+    try:
+        requested = float(request.headers.get('X-Request-Budget', ''))
+        if requested > 0:
+            seconds = min(seconds, requested)
+    except ValueError:
+        pass
+    g.deadline_token = deadline.set_budget(seconds)
+
+@app.teardown_request
+def clear_deadline(exc=None):
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        deadline.reset(token)
+
 # 主要路由
 @app.route('/')
 def index():
@@ -102,7 +238,7 @@ def index():
     log_message("Accessing main page")
     
     # 檢查是否已完成認證
-    if auth_mgr.is_authenticated():
+    if managers.auth_mgr.is_authenticated():
         return redirect(make_url('dashboard'))
     else:
         return redirect(make_url('setup'))
@@ -174,7 +310,20 @@ def setup():
                         headers: {{'Content-Type': 'application/json'}},
                         body: JSON.stringify({{auth_code: code}})
                     }});
-                    const result = await response.json();
+                    const submitted = await response.json();
+                    if (!submitted.success) {{
+                        status.innerHTML = '<div class="status error">設定失敗: ' + submitted.error + '</div>';
+                        return;
+                    }}
+
+                    // 輪詢背景認證工作直到完成
+                    let job;
+                    do {{
+                        await new Promise(resolve => setTimeout(resolve, 1000));
+                        job = await (await fetch(submitted.status_url)).json();
+                        status.innerHTML = '<div class="status info">正在設定中（' + job.state + '）...</div>';
+                    }} while (!job.done);
+                    const result = job.result;
                     
                     if (result.success) {{
                         status.innerHTML = '<div class="status success">設定成功！正在跳轉到控制台...</div>';
@@ -197,12 +346,12 @@ def dashboard():
     log_message("Accessing dashboard")
     
     # 檢查認證狀態
-    if not auth_mgr.is_authenticated():
+    if not managers.auth_mgr.is_authenticated():
         return redirect(make_url('setup'))
     
     # 獲取狀態資訊
-    status = docker_mgr.get_status()
-    stats = stats_collector.get_latest_stats()
+    status = managers.docker_mgr.get_status()
+    stats = managers.stats_collector.get_latest_stats()
     
     try:
         return render_template('dashboard.html', status=status, stats=stats)
@@ -318,94 +467,173 @@ def dashboard():
         </html>
         '''
 
+def _run_auth_job(kind, auth_code):
+    """建立背景認證工作的執行函式"""
+    def run(progress):
+        if kind == 'docker':
+            result = managers.auth_mgr.force_docker_auth(auth_code, progress=progress)
+        else:
+            result = managers.auth_mgr.authenticate(auth_code, progress=progress)
+
+        if result['success']:
+            log_message(f"Authentication job ({kind}) successful")
+            crash_guard.reset()
+        else:
+            log_message(f"Authentication job ({kind}) failed: {result.get('error', 'Unknown error')}")
+        return result
+    return run
+
+def _submit_auth_job(kind):
+    """驗證請求並提交背景認證工作"""
+    data = request.get_json(silent=True) or {}
+    auth_code = data.get('auth_code', '').strip()
+
+    if not auth_code:
+        return jsonify({'success': False, 'error': '請提供認證碼'}), 400
+
+    job = auth_jobs.submit(kind, _run_auth_job(kind, auth_code))
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'state': job.state,
+        'status_url': make_url('auth_job_status', job_id=job.id),
+        'events_url': make_url('auth_job_events', job_id=job.id)
+    }), 202
+
 # API 路由
 @app.route('/api/auth', methods=['POST'])
 def authenticate():
-    """處理認證請求"""
+    """處理認證請求（背景執行，回傳工作 ID）"""
     try:
-        data = request.get_json()
-        auth_code = data.get('auth_code', '').strip()
-        
-        if not auth_code:
-            return jsonify({'success': False, 'error': '請提供認證碼'}), 400
-        
         log_message("Processing authentication request")
-        
-        # 執行認證
-        result = auth_mgr.authenticate(auth_code)
-        
-        if result['success']:
-            log_message("Authentication successful")
-            return jsonify({'success': True, 'message': '認證成功！'})
-        else:
-            log_message(f"Authentication failed: {result.get('error', 'Unknown error')}")
-            return jsonify({'success': False, 'error': result['error']}), 400
-            
+        return _submit_auth_job('auto')
     except Exception as e:
         log_message(f"Authentication error: {e}")
         return jsonify({'success': False, 'error': '認證過程發生錯誤'}), 500
 
 @app.route('/api/force-docker-auth', methods=['POST'])
 def force_docker_auth():
-    """強制使用 Docker 重新認證"""
+    """強制使用 Docker 重新認證（背景執行，回傳工作 ID）"""
     try:
-        data = request.get_json()
-        auth_code = data.get('auth_code', '').strip()
-
-        if not auth_code:
-            return jsonify({'success': False, 'error': '請提供認證碼'}), 400
-
         log_message("Processing forced Docker authentication")
-
-        # 執行強制 Docker 認證
-        result = auth_mgr.force_docker_auth(auth_code)
-
-        if result['success']:
-            log_message("Forced Docker authentication successful")
-            return jsonify({'success': True, 'message': '強制 Docker 認證成功！'})
-        else:
-            log_message(f"Forced Docker authentication failed: {result.get('error', 'Unknown error')}")
-            return jsonify({'success': False, 'error': result['error']}), 400
-
+        return _submit_auth_job('docker')
     except Exception as e:
         log_message(f"Forced Docker authentication error: {e}")
         return jsonify({'success': False, 'error': '強制認證過程發生錯誤'}), 500
 
+@app.route('/api/auth/jobs/<job_id>')
+def auth_job_status(job_id):
+    """查詢認證工作進度"""
+    job = auth_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '找不到認證工作'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/auth/jobs/<job_id>/events')
+def auth_job_events(job_id):
+    """以 Server-Sent Events 推送認證工作進度"""
+    job = auth_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '找不到認證工作'}), 404
+
+    def stream():
+        version = -1
+        while True:
+            current = auth_jobs.wait_for_change(job, version)
+            if current == version:
+                # 保持連線
+                yield ': keep-alive\n\n'
+                continue
+            version = current
+            yield f"data: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+            if job.done:
+                return
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/provider/<action>', methods=['POST'])
 def provider_control(action):
     """Provider 控制 API"""
     try:
         log_message(f"Provider control action: {action}")
         
+        if action in ('start', 'restart'):
+            # 手動操作時清除崩潰循環的暫停狀態
+            crash_guard.reset()
+
         if action == 'start':
-            result = docker_mgr.start_provider()
+            result = managers.docker_mgr.start_provider()
         elif action == 'stop':
-            result = docker_mgr.stop_provider()
+            result = managers.docker_mgr.stop_provider()
         elif action == 'restart':
-            result = docker_mgr.restart_provider()
+            result = managers.docker_mgr.restart_provider()
         elif action == 'update':
-            result = docker_mgr.update_provider()
+            result = managers.docker_mgr.update_provider()
         else:
             return jsonify({'success': False, 'error': '無效的操作'}), 400
-        
-        return jsonify(result)
+
+        if action in ('start', 'restart') and result.get('success') and scheduler and scheduler.paused:
+            # 排程器已在啟動後立即重新暫停，告知使用者原因
+            result['message'] = f"{REASON_LABELS.get(scheduler.reason, scheduler.reason)}，Provider 已由排程暫停"
+            result['schedule_reason'] = scheduler.reason
+
+        # 與進行中的操作衝突時回傳 409
+        return jsonify(result), (409 if result.get('rejected') else 200)
         
     except Exception as e:
         log_message(f"Provider control error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/resources', methods=['GET', 'POST'])
+def provider_resources():
+    """查詢或即時調整 Provider 容器的資源設定（POST 的欄位會覆寫目前設定）"""
+    if request.method == 'GET':
+        try:
+            return jsonify(managers.docker_mgr.get_resources())
+        except Exception as e:
+            log_message(f"Resource query error: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    data = request.get_json(silent=True) or {}
+    try:
+        profile = managers.docker_mgr.resource_profile.merged(data)
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    result = managers.docker_mgr.apply_resources(profile)
+    if prewarmer and result.get('success'):
+        # 未運行的容器依新設定重新預建
+        prewarmer.schedule_refresh(0)
+    return jsonify(result), (200 if result.get('success') else 500)
+
+@app.route('/api/quota')
+def get_quota():
+    """運行時段與剩餘流量配額"""
+    if scheduler is None:
+        return jsonify({'enabled': False})
+    return jsonify(scheduler.get_state())
+
+# 每次都會變動、但不代表狀態改變的欄位，不納入 ETag 版本
+STATUS_VOLATILE_FIELDS = ('timestamp', 'auth_token.expires_in', 'supervision.resume_in',
+                          'governor.pressure', 'governor.provider_cpu', 'schedule.rate_bytes_per_sec')
+
 @app.route('/api/status')
 def get_status():
     """獲取 Provider 狀態"""
     try:
-        status = docker_mgr.get_status()
-        stats = stats_collector.get_latest_stats()
+        status = managers.docker_mgr.get_status()
+        stats = managers.stats_collector.get_latest_stats()
         
-        return jsonify({
+        return cached_json('status', {
             'status': status,
             'stats': stats,
-            'timestamp': stats_collector.get_last_update()
-        })
+            'supervision': crash_guard.get_state(),
+            'governor': governor.get_state() if governor else None,
+            'schedule': scheduler.get_state() if scheduler else None,
+            'lifecycle': managers.docker_mgr.lifecycle_state(),
+            'auth_token': managers.auth_mgr.get_token_status(),
+            'timestamp': managers.stats_collector.get_last_update()
+        }, volatile=STATUS_VOLATILE_FIELDS)
         
     except Exception as e:
         log_message(f"Status retrieval error: {e}")
@@ -415,24 +643,178 @@ def get_status():
 def get_logs():
     """獲取日誌"""
     try:
+        docker_mgr = managers.docker_mgr
         logs = docker_mgr.get_logs()
-        return jsonify({'logs': logs})
+        stale_since = docker_mgr.stale_since(('logs', 100))
+        return cached_json('logs', {'logs': logs, 'stale': stale_since is not None, 'stale_since': stale_since})
         
     except Exception as e:
         log_message(f"Log retrieval error: {e}")
         return jsonify({'logs': f'無法載入日誌: {str(e)}'})
 
+SNAPSHOT_FIELDS = ('status', 'stats', 'logs', 'auth')
+
+def _parse_include(raw):
+    """解析 include 參數；未指定時回傳全部欄位"""
+    if not raw:
+        return list(SNAPSHOT_FIELDS)
+    fields = []
+    for name in raw.split(','):
+        name = name.strip()
+        if name.startswith('logs_since='):
+            # 允許 include=status,logs_since=3 的寫法
+            name = 'logs'
+        if name in SNAPSHOT_FIELDS and name not in fields:
+            fields.append(name)
+    return fields
+
+def _field(data, age, max_age):
+    """快照欄位與其新鮮度"""
+    return {'data': data, 'age': None if age is None else round(age, 3), 'max_age': max_age}
+
+def _snapshot_logs(logs_since):
+    """日誌欄位：內容與 logs_since 的序號相同時省略內容"""
+    logs = managers.docker_mgr.get_logs()
+    seq = snapshots.observe('snapshot-logs', logs.encode('utf-8'))
+    if logs_since is not None and logs_since == seq:
+        return {'seq': seq, 'unchanged': True}
+    return {'seq': seq, 'unchanged': False, 'logs': logs}
+
+@app.route('/api/snapshot')
+def get_snapshot():
+    """一次回傳控制台所需的所有資料（皆取自共用快取）
+
+    參數：
+      include     以逗號分隔的欄位：status、stats、logs、auth（預設全部）
+      logs_since  上一次取得的日誌序號；日誌未變時只回傳序號
+
+    每個欄位的格式為 {"data": ..., "age": 秒, "max_age": 秒}：
+      status / stats / logs  來自 Docker 查詢的共用快取，age 為資料查詢至今的秒數，
+                             最多 max_age 秒（URNETWORK_STATUS_TTL，預設 2 秒）
+                             Docker 無回應時回傳上一次的結果，status 的 stale 為 true
+      auth                   每次請求時從 JWT 檔案解析（檔案未變時使用記憶體快取），age 為 0
+      supervision / governor / schedule / lifecycle
+                             崩潰保護、負載調速、配額與啟停操作的即時狀態，隨 status 一併回傳
+    """
+    fields = _parse_include(request.args.get('include', ''))
+    logs_since = request.args.get('logs_since', type=int)
+    if logs_since is None:
+        for name in request.args.get('include', '').split(','):
+            if name.strip().startswith('logs_since='):
+                try:
+                    logs_since = int(name.split('=', 1)[1])
+                except ValueError:
+                    pass
+
+    docker_mgr = managers.docker_mgr
+    max_age = getattr(docker_mgr, 'cache_ttl', 0)
+    snapshot = {}
+
+    try:
+        if 'status' in fields:
+            snapshot['status'] = _field(docker_mgr.get_status(), docker_mgr.cache_age('status'), max_age)
+            snapshot['supervision'] = _field(crash_guard.get_state(), 0, 0)
+            if governor:
+                snapshot['governor'] = _field(governor.get_state(), 0, 0)
+            if scheduler:
+                snapshot['schedule'] = _field(scheduler.get_state(), 0, 0)
+            snapshot['lifecycle'] = _field(docker_mgr.lifecycle_state(), 0, 0)
+        if 'stats' in fields:
+            stats = managers.stats_collector.get_latest_stats()
+            snapshot['stats'] = _field(stats, managers.stats_collector.cache_age(), max_age)
+        if 'logs' in fields:
+            logs = _snapshot_logs(logs_since)
+            snapshot['logs'] = _field(logs, docker_mgr.cache_age(('logs', 100)), max_age)
+        if 'auth' in fields:
+            snapshot['auth'] = _field(managers.auth_mgr.get_token_status(), 0, 0)
+    except Exception as e:
+        log_message(f"Snapshot retrieval error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    response = jsonify({
+        'fields': snapshot,
+        'generated_at': time.time()
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def _circuit_states():
+    """各後端斷路器的狀態"""
+    if not managers.ready:
+        return {}
+    circuits = {}
+    docker_circuit = managers.docker_mgr.circuit_state()
+    if docker_circuit:
+        circuits['docker'] = docker_circuit
+    return circuits
+
 # 健康檢查端點
 @app.route('/health')
 def health_check():
     """健康檢查"""
     return jsonify({
         'status': 'healthy',
+        'startup': managers.status(),
+        'circuits': _circuit_states(),
         'ingress_mode': bool(ingress_path),
         'ingress_path': ingress_path,
         'ingress_url': ingress_url
     })
 
+@app.route('/health/live')
+def health_live():
+    """存活檢查：程式本身可回應即視為存活"""
+    return jsonify({'status': 'alive', 'uptime': health_monitor.uptime()})
+
+@app.route('/health/ready')
+def health_ready():
+    """就緒檢查：依據背景探測的快取結果，含過期判斷"""
+    probes = health_monitor.snapshot()
+    docker_probe = probes['docker']
+    ready = managers.ready and docker_probe['ok'] and not docker_probe['stale']
+
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'startup': managers.status(),
+        'probes': probes
+    }), 200 if ready else 503
+
+def _profiler_enabled():
+    """分析端點僅在除錯日誌等級或明確開啟時提供"""
+    if os.getenv('URNETWORK_ENABLE_PROFILER', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return os.getenv('URNETWORK_LOG_LEVEL', 'info').lower() in ('trace', 'debug')
+
+@app.route('/debug/profile')
+def debug_profile():
+    """對所有執行緒進行取樣分析，回傳 collapsed stacks"""
+    if not _profiler_enabled():
+        return jsonify({'success': False, 'error': '效能分析未啟用'}), 403
+
+    try:
+        seconds = float(request.args.get('seconds', '10'))
+    except ValueError:
+        return jsonify({'success': False, 'error': '無效的 seconds 參數'}), 400
+
+    log_message(f"Starting sampling profile for {seconds}s")
+    result = profiler.profile(seconds)
+    if result is None:
+        return jsonify({'success': False, 'error': '已有效能分析正在進行'}), 409
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'duration': result['duration'],
+            'interval': result['interval'],
+            'samples': result['samples'],
+            'stacks': dict(result['stacks'].most_common())
+        })
+
+    return Response(
+        SamplingProfiler.format_collapsed(result),
+        mimetype='text/plain',
+        headers={'Content-Disposition': 'attachment; filename=urnetwork-profile.collapsed'}
+    )
+
 if __name__ == '__main__':
     # 從環境變數讀取設定
     port = int(os.getenv('URNETWORK_WEB_PORT', '8099'))
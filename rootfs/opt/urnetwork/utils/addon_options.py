@@ -0,0 +1,56 @@
+"""讀取 Add-on 選項：/data/options.json，可用 URNETWORK_<NAME> 環境變數覆寫"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+OPTIONS_FILE = "/data/options.json"
+
+_lock = threading.Lock()
+_options: Optional[Dict[str, Any]] = None
+
+
+def load_options() -> Dict[str, Any]:
+    """讀取選項檔（只讀一次，選項變更時 Supervisor 會重啟 Add-on）"""
+    global _options
+    with _lock:
+        if _options is None:
+            path = os.getenv("URNETWORK_OPTIONS_FILE", OPTIONS_FILE)
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                _options = data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                _options = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to read add-on options: {e}")
+                _options = {}
+        return _options
+
+
+def _coerce(value: str, default: Any) -> Any:
+    """依預設值的型別轉換環境變數字串"""
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def get_option(name: str, default: Any = None) -> Any:
+    """取得選項值：環境變數 > options.json > 預設值"""
+    env = os.getenv(f"URNETWORK_{name.upper()}")
+    if env is not None and env != "":
+        try:
+            return _coerce(env, default)
+        except ValueError:
+            logger.warning(f"Ignoring invalid URNETWORK_{name.upper()}={env!r}")
+
+    value = load_options().get(name)
+    return default if value is None else value
@@ -0,0 +1,147 @@
+"""常駐的認證輔助容器：以 exec 執行 auth/status，避免每次 docker run 的冷啟動"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .deadline import timeout_for
+from .docker_engine import EngineClient, NotFound
+
+logger = logging.getLogger(__name__)
+
+HELPER_NAME = "urnetwork-auth-helper"
+HELPER_MOUNT = "/addon_config"
+
+# 讓容器閒置等待 exec；收到 TERM 時立即結束
+IDLE_COMMAND = ["/bin/sh", "-c", "trap 'exit 0' TERM; while :; do sleep 3600 & wait; done"]
+
+
+class HelperCancelled(Exception):
+    """exec 被取消"""
+
+
+class AuthHelperContainer:
+    """建立一次並保持閒置的輔助容器，閒置逾時後自動移除"""
+
+    def __init__(self, image: str, config_path: str, idle_timeout: float = 300.0,
+                 client: Optional[EngineClient] = None):
+        """初始化輔助容器管理；client 預設為共用的 Engine 客戶端（與 DockerManager 共用斷路器）"""
+        self.image = image
+        self.config_path = config_path
+        self.host_root = os.path.dirname(config_path)
+        self.idle_timeout = idle_timeout
+        self.last_used = 0.0
+        self._client = client
+        self._container = None
+        self._entrypoint: List[str] = []
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def _get_client(self) -> EngineClient:
+        """Docker Engine 客戶端（第一次使用時取得共用的客戶端）"""
+        if self._client is None:
+            self._client = EngineClient.shared()
+        return self._client
+
+    def _ensure_container(self):
+        """取得運行中的輔助容器，不存在時建立"""
+        client = self._get_client()
+        if self._container is not None:
+            try:
+                self._container.reload()
+                if self._container.status == "running":
+                    return self._container
+            except Exception:
+                self._container = None
+
+        try:
+            stale = client.containers.get(HELPER_NAME)
+            stale.remove(force=True)
+        except NotFound:
+            pass
+
+        image = client.images.get(self.image)
+        self._entrypoint = list(image.attrs.get("Config", {}).get("Entrypoint") or [])
+
+        logger.info(f"Starting auth helper container from {self.image}")
+        self._container = client.containers.run({
+            "Image": self.image,
+            "Entrypoint": IDLE_COMMAND,
+            "HostConfig": {"Binds": [f"{self.host_root}:{HELPER_MOUNT}:rw"]}
+        }, name=HELPER_NAME, auto_remove=True)
+        self._start_reaper()
+        return self._container
+
+    def exec(self, args: List[str], config_dir: Optional[str] = None, timeout: float = 60.0,
+             cancel: Optional[threading.Event] = None) -> Tuple[int, str]:
+        """在輔助容器中以映像檔的 entrypoint 執行命令，回傳 (exit code, 輸出)；
+        逾時不會超過目前請求剩餘的期限"""
+        timeout = timeout_for(timeout)
+        config_dir = config_dir or self.config_path
+        home = os.path.join(HELPER_MOUNT, os.path.relpath(os.path.dirname(config_dir), self.host_root))
+
+        with self._lock:
+            container = self._ensure_container()
+            self.last_used = time.monotonic()
+
+        client = self._get_client()
+        exec_id = container.exec_create(self._entrypoint + args, environment={"HOME": os.path.normpath(home)})
+
+        output: Dict[str, bytes] = {}
+        # 工作執行緒沿用目前的情境，exec 串流同樣受請求期限限制
+        context = contextvars.copy_context()
+        worker = threading.Thread(
+            target=lambda: context.run(lambda: output.update(data=client.exec_start(exec_id))),
+            daemon=True
+        )
+        worker.start()
+
+        deadline = time.monotonic() + timeout
+        while worker.is_alive():
+            worker.join(0.2)
+            cancelled = cancel is not None and cancel.is_set()
+            if worker.is_alive() and (cancelled or time.monotonic() > deadline):
+                # exec 無法單獨終止，直接丟棄整個輔助容器
+                self.discard()
+                if cancelled:
+                    raise HelperCancelled()
+                raise TimeoutError(f"Auth helper exec timed out after {timeout}s")
+
+        self.last_used = time.monotonic()
+        exit_code = client.exec_inspect(exec_id).get("ExitCode")
+        return (exit_code if exit_code is not None else -1), output.get("data", b"").decode("utf-8", "replace")
+
+    def _start_reaper(self):
+        """啟動閒置回收執行緒"""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(target=self._reap, name="auth-helper-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap(self):
+        while True:
+            time.sleep(min(30.0, self.idle_timeout))
+            with self._lock:
+                if self._container is None:
+                    return
+                if time.monotonic() - self.last_used >= self.idle_timeout:
+                    logger.info("Auth helper container idle, removing")
+                    self._remove_locked()
+                    return
+
+    def discard(self):
+        """移除輔助容器"""
+        with self._lock:
+            self._remove_locked()
+
+    def _remove_locked(self):
+        if self._container is None:
+            return
+        try:
+            self._container.remove(force=True)
+        except Exception as e:
+            logger.debug(f"Failed to remove auth helper container: {e}")
+        self._container = None
@@ -0,0 +1,102 @@
+"""背景認證工作，避免 HTTP 請求被長時間的認證流程卡住"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 認證流程的進度階段
+STAGES = ("queued", "clearing", "pulling_image", "running_auth", "waiting_for_jwt", "verifying")
+FINAL_STATES = ("succeeded", "failed")
+
+
+class AuthJob:
+    """單一認證工作的狀態"""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.state = "queued"
+        self.history = [{"stage": "queued", "at": time.time()}]
+        self.result: Optional[Dict[str, Any]] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.version = 0
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "done": self.done,
+            "history": list(self.history),
+            "result": self.result,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class AuthJobManager:
+    """以單一背景工作執行緒依序執行認證，保留最近的工作紀錄供查詢"""
+
+    def __init__(self, max_jobs: int = 20):
+        """初始化工作管理器"""
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, AuthJob]" = OrderedDict()
+        self._changed = threading.Condition()
+        # 認證會清除並寫入同一個設定目錄，因此一次只執行一個
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth-job")
+
+    def submit(self, kind: str, func: Callable[[Callable[[str], None]], Dict[str, Any]]) -> AuthJob:
+        """提交認證工作；func 會收到回報進度的函式"""
+        job = AuthJob(kind)
+        with self._changed:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                oldest_id = next(iter(self._jobs))
+                if not self._jobs[oldest_id].done:
+                    break
+                self._jobs.pop(oldest_id)
+
+        self._executor.submit(self._run, job, func)
+        logger.info(f"Queued {kind} authentication job {job.id}")
+        return job
+
+    def _run(self, job: AuthJob, func):
+        try:
+            result = func(lambda stage: self._update(job, stage))
+        except Exception as e:
+            logger.error(f"Authentication job {job.id} crashed: {e}")
+            result = {"success": False, "error": str(e)}
+
+        self._update(job, "succeeded" if result.get("success") else "failed", result)
+
+    def _update(self, job: AuthJob, state: str, result: Optional[Dict[str, Any]] = None):
+        with self._changed:
+            job.state = state
+            job.history.append({"stage": state, "at": time.time()})
+            job.version += 1
+            if result is not None:
+                job.result = result
+                job.finished_at = time.time()
+            self._changed.notify_all()
+
+    def get(self, job_id: str) -> Optional[AuthJob]:
+        """取得工作"""
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def wait_for_change(self, job: AuthJob, version: int, timeout: float = 15.0) -> int:
+        """等待工作狀態改變（供 SSE 推送使用），回傳目前版本"""
+        with self._changed:
+            self._changed.wait_for(lambda: job.version != version, timeout=timeout)
+            return job.version
@@ -3,12 +3,55 @@
 import os
 import json
 import logging
+import queue
+import shutil
 import subprocess
+import tempfile
+import threading
 import time
-from typing import Dict, Any
+import uuid
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from .auth_helper import AuthHelperContainer, HelperCancelled
+from .auth_jobs import STAGES
+from .circuit_breaker import CircuitOpen
+from .deadline import DeadlineExceeded
+from .file_watch import wait_until
+from .jwt_info import decode_claims, describe_claims
+from .state_store import JsonStateFile, atomic_write, file_sha256, fsync_dir
 
 logger = logging.getLogger(__name__)
 
+# 認證與狀態檢查使用的映像檔
+AUTH_IMAGE = "bringyour/community-provider:g4-latest"
+
+# 認證命令完成後等待 jwt 檔案寫入的期限（秒）
+AUTH_FILE_TIMEOUT = 10
+
+# 同時競速的認證方法數量
+RACE_WIDTH = 2
+
+# 沒有歷史紀錄時假設的認證耗時（秒）
+DEFAULT_METHOD_LATENCY = 30.0
+
+# 競速結束後等待落敗方法結束的時間（秒）；逾時的方法結束時自行清理暫存目錄
+RACE_JOIN_TIMEOUT = 15
+
+# 手動認證的標記檔案；不是 JWT，不能寫入 jwt 檔案（jwt 存在時以其 exp 為準）
+MANUAL_AUTH_FILE = "manual_auth"
+
+# 可在獨立目錄中競速的認證方法
+RACEABLE_METHODS = ("direct_binary", "direct_command", "builtin_binary", "docker_in_docker")
+
+
+def is_state_file(name: str) -> bool:
+    """auth_info.json 與隱藏暫存檔不是認證檔案"""
+    return name == "auth_info.json" or name.startswith(".")
+
+
+class AuthCancelled(Exception):
+    """其他認證方法已先成功，本方法被取消"""
+
 class AuthManager:
     """URnetwork 認證管理器 - 直接在容器內執行認證"""
     
@@ -17,6 +60,20 @@ class AuthManager:
         self.config_path = "/addon_config/.urnetwork"
         self.jwt_file = os.path.join(self.config_path, "jwt")
         self.auth_info_file = os.path.join(self.config_path, "auth_info.json")
+        self.auth_info = JsonStateFile(self.auth_info_file)
+        # (jwt 檔案的 mtime/大小, 解析後的 claims)，檔案未變更時不重新讀取
+        self._jwt_cache: Optional[Tuple[Tuple[int, int], Optional[Dict[str, Any]]]] = None
+        self._expiry_warned = None
+        self._invalid_warned = None
+
+        # 選用：常駐輔助容器，以 exec 取代每次的 docker run
+        self.auth_helper = None
+        if os.getenv("URNETWORK_AUTH_HELPER", "false").lower() in ("1", "true", "yes"):
+            self.auth_helper = AuthHelperContainer(
+                AUTH_IMAGE,
+                self.config_path,
+                idle_timeout=float(os.getenv("URNETWORK_AUTH_HELPER_IDLE", "300"))
+            )
         
         # 確保配置目錄存在
         os.makedirs(self.config_path, exist_ok=True)
@@ -132,18 +189,65 @@ class AuthManager:
                 except Exception as e:
                     logger.info(f"Cannot list {debug_path}: {e}")
     
+    def get_token_status(self) -> Optional[Dict[str, Any]]:
+        """解析 jwt 檔案的 exp/iat；不是有效的 JWT 時回傳 None"""
+        try:
+            st = os.stat(self.jwt_file)
+        except OSError:
+            self._jwt_cache = None
+            return None
+
+        key = (st.st_mtime_ns, st.st_size)
+        if self._jwt_cache is None or self._jwt_cache[0] != key:
+            try:
+                with open(self.jwt_file, 'r') as f:
+                    claims = decode_claims(f.read())
+            except (OSError, UnicodeDecodeError):
+                claims = None
+            self._jwt_cache = (key, claims)
+
+        claims = self._jwt_cache[1]
+        return describe_claims(claims) if claims is not None else None
+
     def is_authenticated(self) -> bool:
-        """檢查是否已完成認證"""
+        """檢查是否已完成認證（只讀取設定目錄中的檔案，不執行 docker 命令）"""
         try:
+            # 方法 0: jwt 檔案存在時以解析出的 exp 為準，不再猜測其他檔案
+            token_status = self.get_token_status()
+            if token_status is None and os.path.exists(self.jwt_file):
+                if self._invalid_warned != self._jwt_cache:
+                    self._invalid_warned = self._jwt_cache
+                    logger.warning("JWT file cannot be decoded, re-authentication required")
+                return False
+            if token_status is not None:
+                if token_status["expired"]:
+                    logger.warning("JWT has expired, re-authentication required")
+                    return False
+                if token_status["expiring_soon"] and self._expiry_warned != self._jwt_cache[0]:
+                    # 每個 jwt 檔案只提醒一次
+                    self._expiry_warned = self._jwt_cache[0]
+                    logger.warning(f"JWT expires in {token_status['expires_in'] // 3600} hours")
+                return True
+
+            # 以下的推測只在沒有 jwt 檔案時使用
             # 方法 1: 檢查固定的認證檔案名稱
             auth_files = [
-                self.jwt_file,
                 os.path.join(self.config_path, "token"),
                 os.path.join(self.config_path, "auth"),
                 os.path.join(self.config_path, "credentials"),
             ]
 
+            # 認證時記錄的校驗碼：不符代表檔案在寫入途中被截斷
+            corrupted = set()
+            for entry in self.auth_info.load().get("files_created", []):
+                path = os.path.join(self.config_path, entry["name"])
+                if entry.get("sha256") and os.path.exists(path) and file_sha256(path) != entry["sha256"]:
+                    logger.warning(f"Auth file {entry['name']} does not match its recorded checksum")
+                    corrupted.add(entry["name"])
+
             for auth_file in auth_files:
+                if os.path.basename(auth_file) in corrupted:
+                    continue
                 if os.path.exists(auth_file) and os.path.getsize(auth_file) > 0:
                     logger.info(f"Found auth file: {os.path.basename(auth_file)}")
                     return True
@@ -156,7 +260,10 @@ class AuthManager:
 
                     # 檢查是否有任何非空檔案（除了 auth_info.json）
                     for filename in all_files:
-                        if filename in ['auth_info.json', '.', '..']:
+                        if is_state_file(filename):
+                            continue
+
+                        if filename in corrupted:
                             continue
 
                         filepath = os.path.join(self.config_path, filename)
@@ -185,10 +292,9 @@ class AuthManager:
                     logger.warning(f"Error listing config directory: {e}")
             
             # 方法 2: 檢查 auth_info.json 中的成功狀態
-            if os.path.exists(self.auth_info_file):
+            if os.path.exists(self.auth_info_file) and not corrupted:
                 try:
-                    with open(self.auth_info_file, 'r') as f:
-                        auth_info = json.load(f)
+                    auth_info = self.auth_info.load()
                     
                     if auth_info.get("success", False):
                         # 檢查認證是否是最近的（24小時內）
@@ -204,60 +310,29 @@ class AuthManager:
                 except Exception as e:
                     logger.warning(f"Error reading auth info: {e}")
             
-            # 方法 3: 檢查 URnetwork 容器是否正在運行並已連接
-            try:
-                # 檢查是否有正在運行的 urnetwork-provider 容器
-                cmd = ["docker", "ps", "--filter", "name=urnetwork-provider", "--format", "{{.Status}}"]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-
-                if result.returncode == 0 and "Up" in result.stdout:
-                    logger.info("URnetwork container is running - assuming authenticated")
-                    return True
-
-            except Exception as e:
-                logger.debug(f"Container status check failed: {e}")
-
-            # 方法 4: 嘗試使用 Docker 容器檢查認證狀態
-            if hasattr(self, 'auth_methods') and any(method[0] == 'docker_in_docker' for method in self.auth_methods):
-                try:
-                    cmd = [
-                        "docker", "run", "--rm",
-                        "-v", f"{self.config_path}:/root/.urnetwork",
-                        "bringyour/community-provider:g4-latest",
-                        "status"  # 或其他檢查狀態的命令
-                    ]
-
-                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-                    # 檢查輸出是否表示已認證
-                    if result.returncode == 0:
-                        status_indicators = ["authenticated", "logged in", "valid token"]
-                        output_text = result.stdout.lower()
-                        if any(indicator in output_text for indicator in status_indicators):
-                            logger.info("Docker container reports authenticated status")
-                            return True
-                except Exception as e:
-                    logger.debug(f"Docker status check failed: {e}")
-            
+            # 不再以容器狀態或 docker run status 推測：每次頁面載入都會呼叫，不能阻塞在外部命令上
             return False
             
         except Exception as e:
             logger.error(f"Error checking authentication status: {e}")
             return False
     
-    def force_docker_auth(self, auth_code: str) -> Dict[str, Any]:
+    def force_docker_auth(self, auth_code: str, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """強制使用 Docker-in-Docker 重新認證"""
         try:
             logger.info("Forcing Docker-in-Docker authentication")
 
             # 清除舊的認證檔案
+            self._report(progress, "clearing")
             self._clear_auth_files()
-            time.sleep(1)
 
             # 嘗試 Docker-in-Docker 認證
-            result = self._authenticate_docker_in_docker(auth_code)
+            started = time.monotonic()
+            result = self._authenticate_docker_in_docker(auth_code, progress)
+            self._record_method_results({"docker_in_docker": (result["success"], time.monotonic() - started)})
             if result["success"]:
                 logger.info("Forced Docker authentication successful")
+                self._save_auth_info(auth_code, result["method"])
                 return result
             else:
                 logger.error(f"Forced Docker authentication failed: {result.get('error')}")
@@ -267,8 +342,8 @@ class AuthManager:
             logger.error(f"Force Docker auth error: {e}")
             return {"success": False, "error": str(e)}
 
-    def authenticate(self, auth_code: str) -> Dict[str, Any]:
-        """執行認證"""
+    def authenticate(self, auth_code: str, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """執行認證；progress 會收到目前的進度階段"""
         try:
             logger.info("Starting authentication")
             
@@ -276,25 +351,27 @@ class AuthManager:
                 return {"success": False, "error": "授權碼不能為空"}
             
             # 清除舊的認證檔案
+            self._report(progress, "clearing")
             self._clear_auth_files()
             
-            # 嘗試各種認證方式
-            for method_type, method_path in self.auth_methods:
-                logger.info(f"Trying authentication method: {method_type}")
-
-                if method_type in ["direct_binary", "direct_command", "builtin_binary"]:
-                    result = self._authenticate_direct(auth_code, method_path)
-                elif method_type == "docker_in_docker":
-                    result = self._authenticate_docker_in_docker(auth_code)
-                elif method_type == "manual_auth":
-                    result = self._authenticate_manual(auth_code)
-                else:
-                    continue
-                
+            # 依歷史成功率與耗時排序，分批競速，第一個成功者勝出
+            candidates = self._rank_methods(
+                [method for method in self.auth_methods if method[0] in RACEABLE_METHODS]
+            )
+            for start in range(0, len(candidates), RACE_WIDTH):
+                result = self._race_methods(auth_code, candidates[start:start + RACE_WIDTH], progress)
                 if result["success"]:
+                    self._save_auth_info(auth_code, result["method"])
                     return result
-                else:
-                    logger.info(f"Method {method_type} failed: {result.get('error', 'Unknown error')}")
+
+            # 手動認證只在其他方法都失敗時使用
+            if any(method[0] == "manual_auth" for method in self.auth_methods):
+                logger.info("Trying authentication method: manual_auth")
+                result = self._authenticate_manual(auth_code, progress)
+                if result["success"]:
+                    self._save_auth_info(auth_code, result["method"])
+                    return result
+                logger.info(f"Method manual_auth failed: {result.get('error', 'Unknown error')}")
             
             return {
                 "success": False,
@@ -305,6 +382,145 @@ class AuthManager:
             logger.error(f"Authentication error: {e}")
             return {"success": False, "error": f"認證過程發生錯誤: {str(e)}"}
     
+    def _rank_methods(self, methods: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """依 auth_info.json 中的歷史紀錄排序：成功率高、耗時短者優先"""
+        stats = self._load_auth_info().get("method_stats", {})
+
+        def score(method):
+            entry = stats.get(method[0], {})
+            attempts = entry.get("attempts", 0)
+            success_rate = (entry.get("successes", 0) + 1) / (attempts + 2)
+            return success_rate / max(entry.get("avg_latency", DEFAULT_METHOD_LATENCY), 0.1)
+
+        return sorted(methods, key=score, reverse=True)
+
+    def _race_methods(self, auth_code: str, methods: List[Tuple[str, str]],
+                      progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """在各自的暫存設定目錄中同時執行多個認證方法，先成功者的檔案提升到正式目錄
+
+        落敗的方法會被取消，並在結束後才移除其暫存目錄；進度只轉送領先的方法
+        （階段比目前已回報的更後面時）。
+        """
+        cancel = threading.Event()
+        results = queue.Queue()
+        racers = []
+        cleanup_lock = threading.Lock()
+        reached = [-1]
+
+        def leader_progress(method_type):
+            def report(stage):
+                rank = STAGES.index(stage) if stage in STAGES else -1
+                with cleanup_lock:
+                    if cancel.is_set() or rank <= reached[0]:
+                        return
+                    reached[0] = rank
+                logger.debug(f"Auth progress {stage} from {method_type}")
+                self._report(progress, stage)
+            return report
+
+        def run(racer, method_path):
+            method_type, config_dir = racer["method"], racer["config_dir"]
+            method_progress = leader_progress(method_type)
+            started = time.monotonic()
+            try:
+                if method_type == "docker_in_docker":
+                    result = self._authenticate_docker_in_docker(auth_code, method_progress, config_dir, cancel)
+                else:
+                    result = self._authenticate_direct(auth_code, method_path, method_progress, config_dir, cancel)
+            except AuthCancelled:
+                result = None
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            results.put((method_type, config_dir, result, time.monotonic() - started))
+
+            with cleanup_lock:
+                racer["done"] = True
+                abandoned = racer["abandoned"]
+            if abandoned:
+                shutil.rmtree(racer["home"], ignore_errors=True)
+
+        logger.info(f"Racing authentication methods: {[method[0] for method in methods]}")
+        for method_type, method_path in methods:
+            # 暫存目錄與正式目錄位於同一檔案系統，提升時可用 rename
+            home = tempfile.mkdtemp(prefix=".auth-race-", dir=os.path.dirname(self.config_path))
+            config_dir = os.path.join(home, ".urnetwork")
+            os.makedirs(config_dir)
+            racer = {"method": method_type, "home": home, "config_dir": config_dir, "done": False, "abandoned": False}
+            racer["thread"] = threading.Thread(target=run, args=(racer, method_path),
+                                               name=f"auth-{method_type}", daemon=True)
+            racers.append(racer)
+            racer["thread"].start()
+
+        winner = {"success": False, "error": "認證方法全部失敗"}
+        outcomes = {}
+        try:
+            for _ in methods:
+                method_type, config_dir, result, elapsed = results.get()
+                if result is None:
+                    continue
+                outcomes[method_type] = (result["success"], elapsed)
+
+                if result["success"] and not winner["success"]:
+                    cancel.set()
+                    self._promote_auth_files(config_dir)
+                    winner = result
+                    logger.info(f"Method {method_type} won the race in {elapsed:.1f}s")
+                    break
+                if not result["success"]:
+                    logger.info(f"Method {method_type} failed: {result.get('error', 'Unknown error')}")
+                    winner["error"] = result.get("error", winner["error"])
+        finally:
+            cancel.set()
+            self._record_method_results(outcomes)
+            for racer in racers:
+                racer["thread"].join(RACE_JOIN_TIMEOUT)
+                with cleanup_lock:
+                    racer["abandoned"] = not racer["done"]
+                if racer["abandoned"]:
+                    logger.warning(f"Method {racer['method']} still running after cancel; it cleans up when it exits")
+                else:
+                    shutil.rmtree(racer["home"], ignore_errors=True)
+
+        return winner
+
+    def _promote_auth_files(self, source_dir: str):
+        """將勝出方法產生的認證檔案以 rename 原子地移到正式設定目錄"""
+        for entry in os.scandir(source_dir):
+            if entry.is_file():
+                os.replace(entry.path, os.path.join(self.config_path, entry.name))
+        fsync_dir(self.config_path)
+        logger.info(f"Promoted auth files from {source_dir}")
+
+    def _run_command(self, cmd: List[str], timeout: float, cancel: Optional[threading.Event] = None,
+                     cleanup: Optional[Callable[[], None]] = None, **kwargs) -> subprocess.CompletedProcess:
+        """執行命令，可在逾時或被取消時終止"""
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=0.2)
+                return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                cancelled = cancel is not None and cancel.is_set()
+                if not cancelled and time.monotonic() < deadline:
+                    continue
+                proc.kill()
+                proc.communicate()
+                if cleanup is not None:
+                    cleanup()
+                if cancelled:
+                    raise AuthCancelled()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+
+    @staticmethod
+    def _report(progress: Optional[Callable[[str], None]], stage: str):
+        """回報認證進度"""
+        if progress is not None:
+            try:
+                progress(stage)
+            except Exception as e:
+                logger.debug(f"Progress callback failed: {e}")
+
     def _clear_auth_files(self):
         """清除舊的認證檔案"""
         try:
@@ -319,18 +535,21 @@ class AuthManager:
             
             if files_to_remove:
                 logger.info(f"Cleared old auth files: {files_to_remove}")
-            
-            time.sleep(0.5)
                 
         except Exception as e:
             logger.warning(f"Error clearing auth files: {e}")
     
-    def _authenticate_direct(self, auth_code: str, urnetwork_path: str) -> Dict[str, Any]:
+    def _authenticate_direct(self, auth_code: str, urnetwork_path: str,
+                             progress: Optional[Callable[[str], None]] = None,
+                             config_dir: Optional[str] = None,
+                             cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
         """直接使用 urnetwork 執行檔進行認證"""
         try:
+            config_dir = config_dir or self.config_path
+
             # 設定環境變數
             env = os.environ.copy()
-            env["HOME"] = "/addon_config"  # 讓 urnetwork 使用我們的配置目錄
+            env["HOME"] = os.path.dirname(config_dir)  # 讓 urnetwork 使用 $HOME/.urnetwork
             
             # 嘗試不同的認證命令格式
             auth_commands = [
@@ -343,15 +562,15 @@ class AuthManager:
             
             for cmd in auth_commands:
                 logger.info(f"Trying command: {' '.join(cmd)}")
+                self._report(progress, "running_auth")
                 
                 try:
-                    result = subprocess.run(
+                    result = self._run_command(
                         cmd,
-                        capture_output=True,
-                        text=True,
                         timeout=60,
+                        cancel=cancel,
                         env=env,
-                        cwd=self.config_path
+                        cwd=config_dir
                     )
                     
                     logger.info(f"Command stdout: {result.stdout}")
@@ -360,60 +579,104 @@ class AuthManager:
                     
                     # 檢查是否成功
                     if result.returncode == 0:
-                        time.sleep(2)  # 等待檔案寫入
-                        if self._check_auth_files_created():
-                            self._save_auth_info(auth_code, f"direct_{os.path.basename(urnetwork_path)}")
-                            return {"success": True, "message": "直接認證成功"}
+                        self._report(progress, "waiting_for_jwt")
+                        if self._check_auth_files_created(timeout=AUTH_FILE_TIMEOUT, config_dir=config_dir):
+                            self._report(progress, "verifying")
+                            return {"success": True, "message": "直接認證成功",
+                                    "method": f"direct_{os.path.basename(urnetwork_path)}"}
                     
                     # 檢查是否有成功訊息（有時候 return code 不是 0 但實際成功了）
                     success_indicators = ["jwt written", "authentication successful", "login successful"]
                     output_text = (result.stdout + " " + result.stderr).lower()
                     if any(indicator in output_text for indicator in success_indicators):
-                        time.sleep(2)
-                        if self._check_auth_files_created():
-                            self._save_auth_info(auth_code, f"direct_{os.path.basename(urnetwork_path)}_success_msg")
-                            return {"success": True, "message": "認證成功（基於輸出訊息）"}
+                        self._report(progress, "waiting_for_jwt")
+                        if self._check_auth_files_created(timeout=AUTH_FILE_TIMEOUT, config_dir=config_dir):
+                            self._report(progress, "verifying")
+                            return {"success": True, "message": "認證成功（基於輸出訊息）",
+                                    "method": f"direct_{os.path.basename(urnetwork_path)}_success_msg"}
                     
                 except subprocess.TimeoutExpired:
                     logger.warning(f"Command timeout: {' '.join(cmd)}")
                     continue
+                except AuthCancelled:
+                    raise
                 except Exception as e:
                     logger.warning(f"Command failed: {' '.join(cmd)}, error: {e}")
                     continue
             
             return {"success": False, "error": "直接認證失敗"}
             
+        except AuthCancelled:
+            raise
         except Exception as e:
             logger.error(f"Direct auth error: {e}")
             return {"success": False, "error": str(e)}
     
-    def _authenticate_docker_in_docker(self, auth_code: str) -> Dict[str, Any]:
+    def _ensure_auth_image(self, progress: Optional[Callable[[str], None]] = None,
+                           cancel: Optional[threading.Event] = None):
+        """確保認證用映像檔存在，避免拉取時間佔用認證逾時"""
+        image = AUTH_IMAGE
+        inspect = subprocess.run(["docker", "image", "inspect", image], capture_output=True, text=True, timeout=30)
+        if inspect.returncode != 0:
+            logger.info(f"Pulling auth image {image}")
+            self._report(progress, "pulling_image")
+            self._run_command(["docker", "pull", image], timeout=600, cancel=cancel)
+
+    def _run_auth_image(self, args: List[str], timeout: float, config_dir: Optional[str] = None,
+                        cancel: Optional[threading.Event] = None) -> subprocess.CompletedProcess:
+        """以認證映像檔執行命令：優先使用常駐輔助容器，失敗時改用 docker run"""
+        config_dir = config_dir or self.config_path
+
+        if self.auth_helper is not None:
+            try:
+                exit_code, output = self.auth_helper.exec(args, config_dir=config_dir,
+                                                          timeout=timeout, cancel=cancel)
+                return subprocess.CompletedProcess(args, exit_code, output, "")
+            except HelperCancelled:
+                raise AuthCancelled()
+            except (CircuitOpen, DeadlineExceeded):
+                # Docker 無回應或期限已用完時，改用 docker run 也只會繞過斷路器
+                raise
+            except Exception as e:
+                logger.warning(f"Auth helper exec failed, falling back to docker run: {e}")
+
+        # 重要：使用正確的 volume 掛載路徑
+        # 我們在主容器內，config_path 是 /addon_config/.urnetwork
+        # 認證容器內需要寫入到 /root/.urnetwork
+        # 所以掛載應該是 /addon_config/.urnetwork:/root/.urnetwork
+        host_config_path = config_dir  # /addon_config/.urnetwork
+        auth_container = f"urnetwork-auth-{uuid.uuid4().hex[:8]}"
+
+        cmd = [
+            "docker", "run", "--rm", "--name", auth_container,
+            "-v", f"{host_config_path}:/root/.urnetwork",
+            AUTH_IMAGE
+        ] + args
+
+        logger.info(f"Docker command: docker run {AUTH_IMAGE} {args[0]}")
+        logger.info(f"Volume mapping: {host_config_path}:/root/.urnetwork")
+
+        return self._run_command(
+            cmd,
+            timeout=timeout,
+            cancel=cancel,
+            # 終止 docker CLI 不會停止容器，需另外移除
+            cleanup=lambda: subprocess.run(["docker", "rm", "-f", auth_container],
+                                           capture_output=True, timeout=30)
+        )
+
+    def _authenticate_docker_in_docker(self, auth_code: str,
+                                       progress: Optional[Callable[[str], None]] = None,
+                                       config_dir: Optional[str] = None,
+                                       cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
         """使用 Docker-in-Docker 進行認證（備案方案）"""
         try:
+            config_dir = config_dir or self.config_path
             logger.info("Trying Docker-in-Docker authentication")
-            
-            # 重要：使用正確的 volume 掛載路徑
-            # 我們在主容器內，config_path 是 /addon_config/.urnetwork
-            # 認證容器內需要寫入到 /root/.urnetwork
-            # 所以掛載應該是 /addon_config/.urnetwork:/root/.urnetwork
-            host_config_path = self.config_path  # /addon_config/.urnetwork
-            
-            cmd = [
-                "docker", "run", "--rm",
-                "-v", f"{host_config_path}:/root/.urnetwork",
-                "bringyour/community-provider:g4-latest",
-                "auth", auth_code, "-f"
-            ]
-            
-            logger.info(f"Docker command: {' '.join(cmd)}")
-            logger.info(f"Volume mapping: {host_config_path}:/root/.urnetwork")
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            self._ensure_auth_image(progress, cancel)
+            self._report(progress, "running_auth")
+            result = self._run_auth_image(["auth", auth_code, "-f"], timeout=120,
+                                          config_dir=config_dir, cancel=cancel)
             
             logger.info(f"Docker auth stdout: {result.stdout}")
             logger.info(f"Docker auth stderr: {result.stderr}")
@@ -426,14 +689,12 @@ class AuthManager:
             
             if result.returncode == 0 or has_success_message:
                 logger.info("Docker auth appears successful, checking for files...")
+                self._report(progress, "waiting_for_jwt")
                 
-                # 等待檔案寫入並檢查多次
-                for i in range(10):
-                    time.sleep(1)
-                    if self._check_auth_files_created():
-                        self._save_auth_info(auth_code, "docker_in_docker")
-                        return {"success": True, "message": "Docker 認證成功"}
-                    logger.info(f"Waiting for auth files... attempt {i+1}/10")
+                # 等待 jwt 檔案寫入（檔案一出現就繼續）
+                if self._check_auth_files_created(timeout=AUTH_FILE_TIMEOUT, config_dir=config_dir):
+                    self._report(progress, "verifying")
+                    return {"success": True, "message": "Docker 認證成功", "method": "docker_in_docker"}
                 
                 # 如果還是沒有檔案，檢查是否是路徑問題
                 logger.warning("Success message found but no auth files created")
@@ -452,28 +713,31 @@ class AuthManager:
                         logger.info(f"Found auth file at alternative path: {alt_path}")
                         # 如果在其他地方找到檔案，複製到正確位置
                         try:
-                            import shutil
-                            target_path = os.path.join(self.config_path, os.path.basename(alt_path))
+                            target_path = os.path.join(config_dir, os.path.basename(alt_path))
                             shutil.copy2(alt_path, target_path)
                             logger.info(f"Copied {alt_path} to {target_path}")
-                            if self._check_auth_files_created():
-                                return {"success": True, "message": "Docker 認證成功（已修正路徑）"}
+                            if self._check_auth_files_created(config_dir=config_dir):
+                                return {"success": True, "message": "Docker 認證成功（已修正路徑）",
+                                        "method": "docker_in_docker_alt_path"}
                         except Exception as e:
                             logger.warning(f"Failed to copy file from {alt_path}: {e}")
                 
                 # 如果認證命令成功但找不到檔案，可能還是算成功
                 if result.returncode == 0 and "jwt written" in result.stdout.lower():
                     logger.warning("Treating as success despite missing files")
-                    self._save_auth_info(auth_code, "docker_in_docker_no_files")
-                    return {"success": True, "message": "認證可能成功（檔案路徑問題）"}
+                    return {"success": True, "message": "認證可能成功（檔案路徑問題）",
+                            "method": "docker_in_docker_no_files"}
             
             return {"success": False, "error": f"Docker 認證失敗: {result.stderr or result.stdout}"}
             
+        except AuthCancelled:
+            raise
         except Exception as e:
             logger.error(f"Docker-in-Docker auth error: {e}")
             return {"success": False, "error": str(e)}
 
-    def _authenticate_manual(self, auth_code: str) -> Dict[str, Any]:
+    def _authenticate_manual(self, auth_code: str,
+                             progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """手動認證方法 - 創建基本的認證檔案"""
         try:
             logger.info("Trying manual authentication")
@@ -482,35 +746,31 @@ class AuthManager:
             if len(auth_code) < 50:
                 return {"success": False, "error": "授權碼長度不足"}
 
-            # 創建基本的 JWT 檔案（模擬格式）
+            # 創建手動認證的標記檔案
             try:
                 import base64
-                # 創建一個簡單的 JWT 格式檔案
-                jwt_content = {
+                marker_content = {
                     "auth_code": auth_code[:50] + "...",  # 只保存部分授權碼
                     "timestamp": time.time(),
                     "method": "manual",
                     "status": "authenticated"
                 }
 
-                # 將認證信息保存到 JWT 檔案
-                jwt_data = json.dumps(jwt_content).encode()
-                jwt_encoded = base64.b64encode(jwt_data).decode()
-
-                with open(self.jwt_file, 'w') as f:
-                    f.write(jwt_encoded)
+                # 保存到獨立的標記檔案：寫入 jwt 檔案會因無法解析而被判定為未認證
+                marker_data = json.dumps(marker_content).encode()
+                atomic_write(os.path.join(self.config_path, MANUAL_AUTH_FILE), base64.b64encode(marker_data).decode())
 
                 # 創建額外的認證標記檔案
                 token_file = os.path.join(self.config_path, "token")
-                with open(token_file, 'w') as f:
-                    f.write(f"manual_auth_{int(time.time())}")
+                atomic_write(token_file, f"manual_auth_{int(time.time())}")
 
                 logger.info("Manual authentication files created")
 
                 # 檢查檔案是否創建成功
+                self._report(progress, "verifying")
                 if self._check_auth_files_created():
-                    self._save_auth_info(auth_code, "manual_auth")
-                    return {"success": True, "message": "手動認證成功 - 請注意這是簡化的認證方式"}
+                    return {"success": True, "message": "手動認證成功 - 請注意這是簡化的認證方式",
+                            "method": "manual_auth"}
                 else:
                     return {"success": False, "error": "認證檔案創建失敗"}
 
@@ -522,51 +782,64 @@ class AuthManager:
             logger.error(f"Manual auth error: {e}")
             return {"success": False, "error": str(e)}
 
-    def _check_auth_files_created(self) -> bool:
-        """檢查認證檔案是否建立"""
+    def _has_auth_files(self, config_dir: Optional[str] = None) -> bool:
+        """設定目錄中是否有非空的認證檔案（不輸出日誌，供等待時重複呼叫）"""
         try:
-            time.sleep(1)  # 等待檔案寫入
-            
-            auth_files = [
-                self.jwt_file,
-                os.path.join(self.config_path, "token"),
-                os.path.join(self.config_path, "auth"),
-                os.path.join(self.config_path, "credentials"),
-            ]
-            
-            logger.info(f"Checking for auth files in: {self.config_path}")
-            
-            # 列出目錄中的所有檔案
-            if os.path.exists(self.config_path):
-                all_files = os.listdir(self.config_path)
-                logger.info(f"Files in config dir: {all_files}")
-                
-                for file in all_files:
-                    if file != "auth_info.json":
-                        file_path = os.path.join(self.config_path, file)
-                        if os.path.isfile(file_path):
-                            file_size = os.path.getsize(file_path)
-                            logger.info(f"Found file: {file} ({file_size} bytes)")
-                            if file_size > 0:
-                                return True
-            
-            # 檢查已知的認證檔案
-            for file_path in auth_files:
-                if os.path.exists(file_path):
-                    file_size = os.path.getsize(file_path)
-                    logger.info(f"Found auth file: {os.path.basename(file_path)} ({file_size} bytes)")
-                    if file_size > 0:
+            with os.scandir(config_dir or self.config_path) as entries:
+                for entry in entries:
+                    if not is_state_file(entry.name) and entry.is_file() and entry.stat().st_size > 0:
                         return True
-            
-            logger.warning("No auth files were created or all files are empty")
-            return False
+        except OSError:
+            pass
+        return False
+
+    def _check_auth_files_created(self, timeout: float = 0, config_dir: Optional[str] = None) -> bool:
+        """檢查認證檔案是否建立；timeout > 0 時等待檔案出現，直到期限為止"""
+        try:
+            config_dir = config_dir or self.config_path
+            logger.info(f"Checking for auth files in: {config_dir}")
+
+            if not wait_until(config_dir, lambda: self._has_auth_files(config_dir), timeout):
+                logger.warning("No auth files were created or all files are empty")
+                return False
+
+            found = [
+                f"{entry.name} ({entry.stat().st_size} bytes)"
+                for entry in os.scandir(config_dir)
+                if not is_state_file(entry.name) and entry.is_file()
+            ]
+            logger.info(f"Found auth files: {found}")
+            return True
             
         except Exception as e:
             logger.error(f"Error checking auth files: {e}")
             return False
     
+    def _load_auth_info(self) -> Dict[str, Any]:
+        """讀取 auth_info.json（記憶體快取，檔案變更時才重新解析）"""
+        return self.auth_info.load()
+
+    def _record_method_results(self, outcomes: Dict[str, Tuple[bool, float]]):
+        """更新各認證方法的成功率與平均耗時（指數移動平均）"""
+        if not outcomes:
+            return
+        def apply(auth_info):
+            stats = auth_info.setdefault("method_stats", {})
+            for method_type, (success, elapsed) in outcomes.items():
+                entry = stats.setdefault(method_type, {"attempts": 0, "successes": 0})
+                entry["attempts"] += 1
+                if success:
+                    entry["successes"] += 1
+                    previous = entry.get("avg_latency")
+                    entry["avg_latency"] = round(elapsed if previous is None else previous * 0.7 + elapsed * 0.3, 2)
+
+        try:
+            self.auth_info.update(apply)
+        except Exception as e:
+            logger.warning(f"Failed to record auth method stats: {e}")
+
     def _save_auth_info(self, auth_code: str, method: str):
-        """儲存認證資訊"""
+        """儲存認證資訊（保留各方法的歷史統計）"""
         try:
             auth_info = {
                 "timestamp": time.time(),
@@ -580,16 +853,18 @@ class AuthManager:
             # 記錄建立的檔案
             if os.path.exists(self.config_path):
                 for file in os.listdir(self.config_path):
-                    if file != "auth_info.json":
+                    if not is_state_file(file):
                         file_path = os.path.join(self.config_path, file)
                         if os.path.isfile(file_path):
                             auth_info["files_created"].append({
                                 "name": file,
-                                "size": os.path.getsize(file_path)
+                                "size": os.path.getsize(file_path),
+                                "sha256": file_sha256(file_path)
                             })
             
-            with open(self.auth_info_file, 'w') as f:
-                json.dump(auth_info, f, indent=2)
+            self.auth_info.update(lambda current: current.update(
+                auth_info, method_stats=current.get("method_stats", {})
+            ))
                 
         except Exception as e:
             logger.warning(f"Failed to save auth info: {e}")
@@ -607,6 +882,7 @@ class AuthManager:
         try:
             status = {
                 "authenticated": self.is_authenticated(),
+                "token": self.get_token_status(),
                 "config_path": self.config_path,
                 "files": [],
                 "auth_info": None,
@@ -615,11 +891,7 @@ class AuthManager:
             
             # 讀取認證資訊
             if os.path.exists(self.auth_info_file):
-                try:
-                    with open(self.auth_info_file, 'r') as f:
-                        status["auth_info"] = json.load(f)
-                except Exception:
-                    pass
+                status["auth_info"] = self.auth_info.load() or None
             
             # 列出檔案
             if os.path.exists(self.config_path):
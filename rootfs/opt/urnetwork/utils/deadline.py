@@ -0,0 +1,47 @@
+"""請求期限：把 HTTP 請求剩餘的時間預算傳遞給下游的 Docker / Supervisor 呼叫"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from typing import Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """請求的時間預算已用完"""
+
+
+def set_budget(seconds: float):
+    """設定目前情境（執行緒）的期限，回傳供 reset() 使用的 token"""
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def reset(token):
+    _deadline.reset(token)
+
+
+@contextmanager
+def budget(seconds: float):
+    """在 with 區塊內套用期限"""
+    token = set_budget(seconds)
+    try:
+        yield
+    finally:
+        reset(token)
+
+
+def remaining() -> Optional[float]:
+    """剩餘秒數；沒有期限（例如背景執行緒）時回傳 None"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def timeout_for(default: Optional[float]) -> Optional[float]:
+    """單次操作的逾時：操作預設值與剩餘預算取較小者；預算用完時拋出 DeadlineExceeded"""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return left if default is None else min(default, left)
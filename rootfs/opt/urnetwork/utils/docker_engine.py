@@ -0,0 +1,469 @@
+"""精簡的 Docker Engine API 客戶端：經由 unix socket 以 HTTP/1.1 溝通
+
+只實作 Add-on 用到的端點（容器查詢/建立/啟停/日誌/統計/更新/exec、映像檔拉取、
+網路與事件），避免載入完整的 docker SDK 以及 requests/urllib3/websocket-client。
+介面與 docker SDK 相近，現有呼叫端不需要大幅修改。
+"""
+
+import http.client
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from .circuit_breaker import CircuitBreaker
+from .deadline import DeadlineExceeded, timeout_for
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+POOL_SIZE = 4
+
+# 查詢類操作的逾時（秒）；啟停等變更操作使用客戶端的預設逾時
+READ_TIMEOUT = 10.0
+
+# 連線層的錯誤才代表 daemon 異常；HTTP 錯誤回應（404、409…）表示 daemon 正常運作
+TRANSPORT_ERRORS = (OSError, http.client.HTTPException)
+
+
+class EngineError(Exception):
+    """Docker Engine 回傳錯誤"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class NotFound(EngineError):
+    """資源不存在（404）"""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """連線到 unix socket 的 HTTP 連線"""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def iter_frames(response) -> Iterator[Tuple[int, bytes]]:
+    """解碼多工的日誌串流：8 位元組標頭（類型、保留、長度）加上內容"""
+    while True:
+        header = response.read(8)
+        if len(header) < 8:
+            return
+        stream_type, size = header[0], struct.unpack(">I", header[4:])[0]
+        payload = response.read(size)
+        if len(payload) < size:
+            return
+        yield stream_type, payload
+
+
+def iter_json(response) -> Iterator[Dict[str, Any]]:
+    """解碼以換行分隔的 JSON 串流（統計、事件、拉取進度）"""
+    buffer = b""
+    while True:
+        chunk = response.read1(65536) if hasattr(response, "read1") else response.read(65536)
+        if not chunk:
+            break
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+class EngineClient:
+    """Docker Engine API 客戶端，重複使用閒置的連線"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 60.0):
+        """初始化客戶端（不會立即連線）；timeout 為沒有指定時的單次操作逾時"""
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.breaker = CircuitBreaker("docker", failures=TRANSPORT_ERRORS, ignored=(DeadlineExceeded,))
+        self._idle: List[UnixHTTPConnection] = []
+        self._lock = threading.Lock()
+        self.containers = ContainerCollection(self)
+        self.images = ImageCollection(self)
+        self.networks = NetworkCollection(self)
+
+    @classmethod
+    def from_env(cls) -> "EngineClient":
+        """依 DOCKER_HOST（unix://）決定 socket 路徑"""
+        host = os.getenv("DOCKER_HOST", "")
+        path = host[len("unix://"):] if host.startswith("unix://") else DEFAULT_SOCKET
+        return cls(path)
+
+    @classmethod
+    def shared(cls) -> "EngineClient":
+        """行程內共用的客戶端：所有 Docker 呼叫共用連線池、斷路器與請求期限"""
+        global _shared_client
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = cls.from_env()
+            return _shared_client
+
+    def _acquire(self, timeout: Optional[float]) -> Tuple[UnixHTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return UnixHTTPConnection(self.socket_path, timeout), False
+
+    def _release(self, conn: UnixHTTPConnection):
+        with self._lock:
+            if len(self._idle) < POOL_SIZE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _send(self, method: str, path: str, body: Optional[bytes], timeout: Optional[float]):
+        """送出請求；重複使用的連線已被關閉時改用新連線重送一次"""
+        headers = {"Host": "docker"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            conn, reused = self._acquire(timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if not reused or attempt:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+    def _effective_timeout(self, timeout: Optional[float]) -> Tuple[Optional[float], bool]:
+        """套用請求期限後的逾時，以及是否因期限而縮短"""
+        effective = timeout_for(timeout)
+        return effective, effective is not None and (timeout is None or effective < timeout)
+
+    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                body: Any = None, timeout: Optional[float] = None) -> Any:
+        """送出請求並回傳解析後的 JSON（沒有內容時回傳 None）"""
+        effective, truncated = self._effective_timeout(self.timeout if timeout is None else timeout)
+        return self.breaker.call(
+            lambda: self._request(method, self._url(path, params), self._encode(body), effective, truncated)
+        )
+
+    def _request(self, method: str, url: str, body: Optional[bytes], timeout: Optional[float], truncated: bool) -> Any:
+        try:
+            conn, response = self._send(method, url, body, timeout)
+            try:
+                data = response.read()
+            except Exception:
+                conn.close()
+                raise
+        except socket.timeout:
+            if truncated:
+                raise DeadlineExceeded("Request deadline exceeded while waiting for Docker")
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        self._raise_for_status(response.status, data)
+        if not data:
+            return None
+        if response.getheader("Content-Type", "").startswith("application/json"):
+            return json.loads(data)
+        return data
+
+    def stream(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+               body: Any = None, timeout: Optional[float] = None):
+        """送出請求並回傳未讀取的回應；串流使用獨立連線，讀完後關閉"""
+        effective, _ = self._effective_timeout(timeout)
+        conn, response = self.breaker.call(
+            lambda: self._send(method, self._url(path, params), self._encode(body), effective)
+        )
+        if response.status >= 400:
+            data = response.read()
+            conn.close()
+            self._raise_for_status(response.status, data)
+        return _StreamingResponse(conn, response)
+
+    @staticmethod
+    def _url(path: str, params: Optional[Dict[str, Any]]) -> str:
+        if not params:
+            return path
+        query = {key: value for key, value in params.items() if value is not None}
+        for key, value in query.items():
+            if isinstance(value, bool):
+                query[key] = "true" if value else "false"
+        return f"{path}?{urlencode(query)}"
+
+    @staticmethod
+    def _encode(body: Any) -> Optional[bytes]:
+        return None if body is None else json.dumps(body).encode("utf-8")
+
+    @staticmethod
+    def _raise_for_status(status: int, data: bytes):
+        if status < 400:
+            return
+        try:
+            message = json.loads(data).get("message", "")
+        except (ValueError, AttributeError):
+            message = data.decode("utf-8", "replace")
+        if status == 404:
+            raise NotFound(status, message)
+        raise EngineError(status, message)
+
+    def ping(self) -> bool:
+        return self.request("GET", "/_ping", timeout=10) == b"OK"
+
+    def events(self, decode: bool = True, filters: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """事件串流（沒有逾時，直到連線中斷）"""
+        params = {}
+        if filters:
+            params["filters"] = json.dumps({
+                key: value if isinstance(value, list) else [value] for key, value in filters.items()
+            })
+        with self.stream("GET", "/events", params, timeout=None) as response:
+            yield from iter_json(response)
+
+    def exec_start(self, exec_id: str, timeout: Optional[float] = None) -> bytes:
+        """執行 exec 並等待結束，回傳依序合併的 stdout 與 stderr（預設沒有逾時，由呼叫端控制）"""
+        body = {"Detach": False, "Tty": False}
+        with self.stream("POST", f"/exec/{exec_id}/start", body=body, timeout=timeout) as response:
+            return b"".join(payload for _, payload in iter_frames(response))
+
+    def exec_inspect(self, exec_id: str) -> Dict[str, Any]:
+        """exec 的狀態與 ExitCode"""
+        return self.request("GET", f"/exec/{exec_id}/json", timeout=READ_TIMEOUT)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_shared_client: Optional[EngineClient] = None
+_shared_lock = threading.Lock()
+
+
+class _StreamingResponse:
+    """串流回應；關閉時一併關閉連線"""
+
+    def __init__(self, conn: UnixHTTPConnection, response: http.client.HTTPResponse):
+        self._conn = conn
+        self._response = response
+
+    def read(self, amount: int = -1) -> bytes:
+        return self._response.read(amount if amount >= 0 else None)
+
+    def read1(self, amount: int = -1) -> bytes:
+        return self._response.read1(amount)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Container:
+    """容器（attrs 為 /containers/{id}/json 的內容）"""
+
+    def __init__(self, client: EngineClient, attrs: Dict[str, Any]):
+        self.client = client
+        self.attrs = attrs
+
+    @property
+    def id(self) -> str:
+        return self.attrs["Id"]
+
+    @property
+    def short_id(self) -> str:
+        return self.id[:12]
+
+    @property
+    def name(self) -> str:
+        return self.attrs.get("Name", "").lstrip("/")
+
+    @property
+    def status(self) -> str:
+        return self.attrs.get("State", {}).get("Status", "unknown")
+
+    @property
+    def ports(self) -> Dict[str, Any]:
+        return self.attrs.get("NetworkSettings", {}).get("Ports") or {}
+
+    def _path(self, suffix: str = "") -> str:
+        return f"/containers/{self.id}{suffix}"
+
+    def reload(self):
+        self.attrs = self.client.request("GET", self._path("/json"), timeout=READ_TIMEOUT)
+
+    def start(self):
+        self.client.request("POST", self._path("/start"))
+
+    def stop(self, timeout: int = 10):
+        self.client.request("POST", self._path("/stop"), {"t": timeout}, timeout=timeout + self.client.timeout)
+
+    def restart(self, timeout: int = 10):
+        self.client.request("POST", self._path("/restart"), {"t": timeout}, timeout=timeout + self.client.timeout)
+
+    def pause(self):
+        self.client.request("POST", self._path("/pause"))
+
+    def unpause(self):
+        self.client.request("POST", self._path("/unpause"))
+
+    def remove(self, force: bool = False):
+        self.client.request("DELETE", self._path(), {"force": force})
+
+    def update_resources(self, resources: Dict[str, Any]):
+        """以 Engine API 欄位名稱更新資源限制"""
+        return self.client.request("POST", self._path("/update"), body=resources)
+
+    def logs(self, tail: Any = "all", timestamps: bool = False) -> bytes:
+        """讀取 stdout 與 stderr（依時間順序合併）"""
+        params = {"stdout": True, "stderr": True, "tail": tail, "timestamps": timestamps}
+        with self.client.stream("GET", self._path("/logs"), params, timeout=READ_TIMEOUT) as response:
+            # 使用 TTY 的容器輸出原始位元組，不是多工格式
+            if self.attrs.get("Config", {}).get("Tty"):
+                return response.read()
+            return b"".join(payload for _, payload in iter_frames(response))
+
+    def exec_create(self, cmd: List[str], environment: Optional[Dict[str, str]] = None) -> str:
+        """在容器內建立 exec，回傳 exec ID（以 client.exec_start 執行）"""
+        body = {
+            "Cmd": cmd,
+            "Env": [f"{key}={value}" for key, value in (environment or {}).items()],
+            "AttachStdout": True,
+            "AttachStderr": True
+        }
+        return self.client.request("POST", self._path("/exec"), body=body)["Id"]
+
+    def stats(self, stream: bool = False):
+        """容器統計；stream=False 時回傳單筆（Docker 需取樣約一秒）"""
+        if stream:
+            return self._stream_stats()
+        return self.client.request("GET", self._path("/stats"), {"stream": False}, timeout=READ_TIMEOUT)
+
+    def _stream_stats(self) -> Iterator[Dict[str, Any]]:
+        with self.client.stream("GET", self._path("/stats"), {"stream": True}, timeout=None) as response:
+            yield from iter_json(response)
+
+
+class ContainerCollection:
+    """容器相關端點"""
+
+    def __init__(self, client: EngineClient):
+        self.client = client
+
+    def get(self, name: str) -> Container:
+        return Container(self.client, self.client.request("GET", f"/containers/{quote(name)}/json", timeout=READ_TIMEOUT))
+
+    def create(self, body: Dict[str, Any], name: Optional[str] = None) -> Container:
+        """以 Engine API 格式建立容器（不啟動）"""
+        created = self.client.request("POST", "/containers/create", {"name": name}, body=body)
+        return self.get(created["Id"])
+
+    def run(self, body: Dict[str, Any], name: Optional[str] = None, auto_remove: bool = False) -> Container:
+        """建立並啟動容器；auto_remove 時容器結束後由 Docker 移除"""
+        if auto_remove:
+            body = dict(body, HostConfig=dict(body.get("HostConfig") or {}, AutoRemove=True))
+        container = self.create(body, name=name)
+        container.start()
+        try:
+            container.reload()
+        except NotFound:
+            # 已結束並被自動移除
+            pass
+        return container
+
+
+class Image:
+    """映像檔"""
+
+    def __init__(self, attrs: Dict[str, Any]):
+        self.attrs = attrs
+
+    @property
+    def id(self) -> str:
+        return self.attrs["Id"]
+
+    @property
+    def tags(self) -> List[str]:
+        return self.attrs.get("RepoTags") or []
+
+
+class ImageCollection:
+    """映像檔相關端點"""
+
+    def __init__(self, client: EngineClient):
+        self.client = client
+
+    def get(self, name: str) -> Image:
+        return Image(self.client.request("GET", f"/images/{quote(name, safe='')}/json"))
+
+    def pull(self, name: str) -> Image:
+        """拉取映像檔，讀完進度串流後回傳映像檔資訊"""
+        repository, _, tag = name.rpartition(":")
+        if not repository or "/" in tag:
+            repository, tag = name, "latest"
+        with self.client.stream("POST", "/images/create", {"fromImage": repository, "tag": tag}, timeout=None) as response:
+            for progress in iter_json(response):
+                if "error" in progress:
+                    raise EngineError(500, progress["error"])
+        return self.get(f"{repository}:{tag}")
+
+
+class Network:
+    """網路"""
+
+    def __init__(self, client: EngineClient, attrs: Dict[str, Any]):
+        self.client = client
+        self.attrs = attrs
+
+    @property
+    def name(self) -> str:
+        return self.attrs.get("Name", "")
+
+    def remove(self):
+        self.client.request("DELETE", f"/networks/{self.attrs['Id']}")
+
+
+class NetworkCollection:
+    """網路相關端點"""
+
+    def __init__(self, client: EngineClient):
+        self.client = client
+
+    def list(self, names: Optional[List[str]] = None) -> List[Network]:
+        params = {"filters": json.dumps({"name": names})} if names else None
+        networks = self.client.request("GET", "/networks", params, timeout=READ_TIMEOUT) or []
+        # name 篩選是前綴比對，這裡再確認完整名稱
+        return [Network(self.client, attrs) for attrs in networks if not names or attrs.get("Name") in names]
+
+    def create(self, name: str, driver: str = "bridge", options: Optional[Dict[str, str]] = None) -> Network:
+        created = self.client.request("POST", "/networks/create", body={
+            "Name": name, "Driver": driver, "Options": options or {}, "CheckDuplicate": True
+        })
+        return Network(self.client, self.client.request("GET", f"/networks/{created['Id']}"))
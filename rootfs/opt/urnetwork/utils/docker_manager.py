@@ -1,13 +1,28 @@
 """Docker 容器管理器"""
 
-import docker
+import hashlib
 import json
 import logging
-import subprocess
-from typing import Dict, Any, Optional
+import os
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional, Set
+
+from .docker_engine import READ_TIMEOUT, Container, EngineClient, NotFound
+from .go_runtime import RUNTIME_KEYS, environment_drift, provider_environment
+from .lifecycle import LifecycleCoordinator
+from .log_profile import LogProfile
+from .network_profile import NetworkProfile
+from .resource_profile import ResourceProfile
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# 容器標籤：建立時的映像檔與設定指紋，用來判斷預先建立的容器是否過期
+SPEC_LABEL = "io.urnetwork.spec"
+# 啟動時才設定的 restart policy；預先建立的容器使用 "no"，避免 Docker daemon 重啟時被自動啟動
+RESTART_POLICY = {"Name": "unless-stopped"}
+
 class DockerManager:
     """管理 URnetwork Docker 容器"""
     
@@ -18,42 +33,192 @@ class DockerManager:
         self.image_name = "bringyour/community-provider:g4-latest"
         self.config_path = "/addon_config/.urnetwork"
 
+        # 並行的狀態/日誌/統計查詢共用同一次 Docker 呼叫，結果在短時間內重用
+        self.cache_ttl = float(os.getenv("URNETWORK_STATUS_TTL", "2"))
+        self._flight = SingleFlight()
+
+        # Docker 無回應時回傳的上一次成功結果，以及開始回傳舊資料的時間
+        self._last_good: Dict[Any, Any] = {}
+        self._stale_since: Dict[Any, float] = {}
+
+        # 啟動、停止、重啟、更新依序執行，重複點擊合併為一次
+        self.lifecycle = LifecycleCoordinator(self.container_name)
+
+        # 要求暫停 Provider 的來源（調速器、排程器）；全部釋放後才恢復，明確的啟停會清除
+        self._pause_holders: Set[str] = set()
+        self._pause_lock = threading.Lock()
+        # 啟動或重啟成功後呼叫（例如排程器立即重新評估是否需要暫停）
+        self._start_listeners: List[Callable[[], None]] = []
+
+        try:
+            self.resource_profile = ResourceProfile.from_options()
+        except ValueError as e:
+            logger.error(f"Invalid resource profile, ignoring: {e}")
+            self.resource_profile = ResourceProfile()
+        self.network_profile = NetworkProfile.from_options()
+        self.log_profile = LogProfile.from_options()
+
         try:
-            self.client = docker.from_env()
+            self.client = EngineClient.shared()
+            self.client.ping()
             logger.info("Docker client initialized successfully")
         except Exception as e:
             logger.error(f"Docker client initialization failed: {e}")
             self.client = None
     
-    def get_container(self) -> Optional[docker.models.containers.Container]:
-        """獲取 URnetwork 容器"""
+    def _find_container(self) -> Optional[Container]:
+        """查詢容器；Docker 無回應或斷路器開啟時拋出例外"""
+        if self.client is None:
+            return None
         try:
-            if self.client is None:
-                return None
             return self.client.containers.get(self.container_name)
-        except docker.errors.NotFound:
+        except NotFound:
             logger.debug("URnetwork container not found")
             return None
+
+    def get_container(self) -> Optional[Container]:
+        """獲取 URnetwork 容器"""
+        try:
+            return self._find_container()
         except Exception as e:
             logger.error(f"Error getting container: {e}")
             return None
+
+    def _with_fallback(self, key, fetch, on_error):
+        """執行查詢並記住結果；失敗時回傳上一次成功的結果（標記為舊資料）"""
+        try:
+            value = fetch()
+        except Exception as e:
+            if key not in self._last_good:
+                return on_error(e)
+            if key not in self._stale_since:
+                logger.warning(f"Docker query {key} failed, serving last known state: {e}")
+                self._stale_since[key] = time.time()
+            return self._last_good[key]
+
+        self._last_good[key] = value
+        self._stale_since.pop(key, None)
+        return value
+
+    def stale_since(self, key) -> Optional[float]:
+        """key 的結果從何時開始是舊資料（最新時為 None）"""
+        return self._stale_since.get(key)
+
+    def circuit_state(self) -> Optional[Dict[str, Any]]:
+        """Docker 斷路器狀態"""
+        return self.client.breaker.snapshot() if self.client is not None else None
     
+    def lifecycle_state(self) -> Dict[str, Any]:
+        """生命週期狀態與上一次操作"""
+        return self.lifecycle.snapshot()
+
+    def pause_holders(self) -> Set[str]:
+        """目前要求暫停 Provider 的來源"""
+        with self._pause_lock:
+            return set(self._pause_holders)
+
+    def pause_provider(self, holder: str) -> Dict[str, Any]:
+        """以 holder 的名義暫停 Provider；已暫停時只記錄 holder，不重複呼叫 Docker"""
+        try:
+            with self.lifecycle.exclusive():
+                container = self.get_container()
+                if container is None or container.status not in ("running", "paused"):
+                    return {"success": False, "error": "Provider 未在運行"}
+                if container.status == "running":
+                    logger.info(f"Pausing provider for {holder}")
+                    container.pause()
+                    self._flight.forget()
+                with self._pause_lock:
+                    self._pause_holders.add(holder)
+                    holders = sorted(self._pause_holders)
+                return {"success": True, "message": "Provider 已暫停", "paused_by": holders}
+        except Exception as e:
+            logger.error(f"Failed to pause provider: {e}")
+            return {"success": False, "error": str(e)}
+
+    def resume_provider(self, holder: str) -> Dict[str, Any]:
+        """釋放 holder 的暫停要求；沒有其他來源仍要求暫停時才恢復 Provider"""
+        try:
+            with self.lifecycle.exclusive():
+                with self._pause_lock:
+                    if holder not in self._pause_holders:
+                        return {"success": True, "message": "未由此來源暫停", "paused_by": sorted(self._pause_holders)}
+                    self._pause_holders.discard(holder)
+                    holders = sorted(self._pause_holders)
+                if holders:
+                    logger.info(f"Provider stays paused for {', '.join(holders)}")
+                    return {"success": True, "message": "Provider 仍由其他來源暫停", "paused_by": holders}
+
+                container = self.get_container()
+                if container is not None and container.status == "paused":
+                    logger.info(f"Resuming provider (released by {holder})")
+                    container.unpause()
+                    self._flight.forget()
+                return {"success": True, "message": "Provider 已恢復", "paused_by": []}
+        except Exception as e:
+            logger.error(f"Failed to resume provider: {e}")
+            return {"success": False, "error": str(e)}
+
+    def _release_pause(self, container: Optional[Container]):
+        """明確的生命週期操作優先於暫停要求：清除所有來源並恢復暫停中的容器"""
+        with self._pause_lock:
+            if self._pause_holders:
+                logger.info(f"Clearing provider pause requested by {', '.join(sorted(self._pause_holders))}")
+            self._pause_holders.clear()
+        if container is not None and container.status == "paused":
+            container.unpause()
+            container.reload()
+
+    def update_limits(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """調整資源限制（Engine API 欄位，例如 CpuQuota），與生命週期操作互斥"""
+        try:
+            with self.lifecycle.exclusive():
+                container = self.get_container()
+                if container is None:
+                    return {"success": False, "error": "容器不存在"}
+                container.update_resources(changes)
+                self._flight.forget()
+                return {"success": True, "applied": changes}
+        except Exception as e:
+            logger.error(f"Failed to update provider limits: {e}")
+            return {"success": False, "error": str(e)}
+
+    def add_start_listener(self, callback: Callable[[], None]):
+        """註冊啟動或重啟成功後的回呼"""
+        self._start_listeners.append(callback)
+
+    def _notify_started(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if result.get("success"):
+            for callback in list(self._start_listeners):
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Start listener failed: {e}")
+        return result
+
     def start_provider(self) -> Dict[str, Any]:
         """啟動 Provider"""
+        return self._notify_started(self.lifecycle.run("start", self._start))
+
+    def _start(self) -> Dict[str, Any]:
+        """啟動容器（由 lifecycle 協調器呼叫）"""
+        self._flight.forget()
         try:
             if self.client is None:
                 return {"success": False, "error": "Docker 連接失敗，無法啟動 Provider"}
 
-            container = self.get_container()
-            
-            if container is None:
-                # 建立新容器
-                logger.info("Creating new URnetwork container")
-                return self._create_container()
-            
+            # 通常已有預先建立的容器，只需要一次 start 呼叫
+            container = self._prepare_container()
+
+            # 明確啟動時恢復被暫停的容器，不論是哪個來源暫停的
+            was_paused = container.status == "paused"
+            self._release_pause(container)
+            if was_paused:
+                logger.info(f"Unpaused container {container.short_id}")
+                return {"success": True, "message": "Provider 已恢復運行"}
             if container.status != "running":
-                logger.info("Starting existing container")
-                container.start()
+                logger.info(f"Starting container {container.short_id} ({container.status})")
+                self._start_container(container)
                 return {"success": True, "message": "Provider 已啟動"}
             else:
                 return {"success": True, "message": "Provider 已在運行中"}
@@ -64,13 +229,20 @@ class DockerManager:
     
     def stop_provider(self) -> Dict[str, Any]:
         """停止 Provider"""
+        return self.lifecycle.run("stop", self._stop)
+
+    def _stop(self) -> Dict[str, Any]:
+        """停止容器（由 lifecycle 協調器呼叫）"""
+        self._flight.forget()
         try:
             if self.client is None:
                 return {"success": False, "error": "Docker 連接失敗，無法停止 Provider"}
 
             container = self.get_container()
-            
-            if container and container.status == "running":
+            self._release_pause(container)
+
+            # restarting：restart policy 正在重啟崩潰的容器，停止後才不會繼續重啟
+            if container and container.status in ("running", "restarting"):
                 logger.info("Stopping URnetwork container")
                 container.stop()
                 return {"success": True, "message": "Provider 已停止"}
@@ -83,18 +255,24 @@ class DockerManager:
     
     def restart_provider(self) -> Dict[str, Any]:
         """重啟 Provider"""
+        return self._notify_started(self.lifecycle.run("restart", self._restart))
+
+    def _restart(self) -> Dict[str, Any]:
+        """重啟容器（由 lifecycle 協調器呼叫）"""
+        self._flight.forget()
         try:
             if self.client is None:
                 return {"success": False, "error": "Docker 連接失敗，無法重啟 Provider"}
 
             container = self.get_container()
-            
+            self._release_pause(container)
+
             if container:
                 logger.info("Restarting URnetwork container")
                 container.restart()
                 return {"success": True, "message": "Provider 已重啟"}
             else:
-                return self.start_provider()
+                return self._start()
                 
         except Exception as e:
             logger.error(f"Failed to restart provider: {e}")
@@ -102,6 +280,11 @@ class DockerManager:
     
     def update_provider(self) -> Dict[str, Any]:
         """更新 Provider 映像檔"""
+        return self.lifecycle.run("update", self._update)
+
+    def _update(self) -> Dict[str, Any]:
+        """更新映像檔並重建容器（由 lifecycle 協調器呼叫）"""
+        self._flight.forget()
         try:
             if self.client is None:
                 return {"success": False, "error": "Docker 連接失敗，無法更新 Provider"}
@@ -110,6 +293,7 @@ class DockerManager:
             
             # 停止現有容器
             container = self.get_container()
+            self._release_pause(container)
             if container:
                 container.stop()
                 container.remove()
@@ -124,104 +308,244 @@ class DockerManager:
             logger.error(f"Failed to update provider: {e}")
             return {"success": False, "error": str(e)}
     
+    def apply_resources(self, profile: Optional[ResourceProfile] = None) -> Dict[str, Any]:
+        """以 POST /containers/{id}/update 即時套用資源設定，不需要重建容器"""
+        if profile is not None:
+            self.resource_profile = profile
+        profile = self.resource_profile
+
+        try:
+            with self.lifecycle.exclusive():
+                return self._apply_resources(profile)
+        except Exception as e:
+            logger.error(f"Failed to apply resources: {e}")
+            return {"success": False, "error": str(e)}
+
+    def _apply_resources(self, profile: ResourceProfile) -> Dict[str, Any]:
+        container = self.get_container()
+        if container is None:
+            return {"success": True, "message": "容器尚未建立，將在建立時套用", "applied": {}, "requires_recreate": False}
+
+        host_config = container.attrs.get("HostConfig", {})
+        changes = profile.diff(host_config)
+        if changes:
+            logger.info(f"Updating provider resources: {changes}")
+            container.update_resources(changes)
+            self._flight.forget()
+
+        pending = profile.recreate_fields(host_config)
+        requires_recreate = bool(pending)
+        if requires_recreate:
+            logger.warning(f"{', '.join(pending)} cannot be changed on the running container; it applies after the container is recreated")
+        if not self.network_profile.matches(host_config):
+            logger.warning(f"Network mode {self.network_profile.mode} applies after the container is recreated")
+            requires_recreate = True
+        if not self.log_profile.matches(host_config):
+            logger.warning(f"Log rotation ({self.log_profile.driver}, {self.log_profile.max_size} x {self.log_profile.max_file}) applies after the container is recreated")
+            requires_recreate = True
+
+        return {
+            "success": True,
+            "message": "資源設定已套用" if changes else "資源設定未變更",
+            "applied": changes,
+            "requires_recreate": requires_recreate
+        }
+
+    def get_resources(self) -> Dict[str, Any]:
+        """目前的資源設定與容器實際值"""
+        container = self.get_container()
+        host_config = container.attrs.get("HostConfig", {}) if container else {}
+        return {
+            "profile": self.resource_profile.to_dict(),
+            "current": {key: host_config.get(key) for key in self.resource_profile.host_config()},
+            "pending": self.resource_profile.diff(host_config) if container else {},
+            "requires_recreate": self.resource_profile.needs_recreate(host_config) if container else False,
+            "network": dict(self.network_profile.to_dict(), applied=self.network_profile.matches(host_config) if container else None),
+            "logging": dict(self.log_profile.to_dict(), applied=self.log_profile.matches(host_config) if container else None)
+        }
+
+    def cache_age(self, key) -> Optional[float]:
+        """快取結果的年齡（秒）：key 為 "status"、"stats" 或 ("logs", lines)"""
+        return self._flight.age(key)
+
     def get_status(self) -> Dict[str, Any]:
         """獲取 Provider 狀態"""
-        try:
-            if self.client is None:
-                return {
-                    "status": "docker_unavailable",
-                    "message": "Docker 連接失敗",
-                    "error": "無法連接到 Docker daemon"
-                }
+        return self._flight.do("status", self._fetch_status, self.cache_ttl)
 
-            container = self.get_container()
-            
-            if container is None:
-                return {
-                    "status": "not_found",
-                    "message": "容器不存在"
-                }
-            
-            # 獲取容器詳細資訊
-            container.reload()  # 重新載入容器狀態
-            
+    def _fetch_status(self) -> Dict[str, Any]:
+        """向 Docker 查詢 Provider 狀態；Docker 無回應時回傳上一次的狀態並標記 stale"""
+        if self.client is None:
             return {
-                "status": container.status,
-                "name": container.name,
-                "created": container.attrs.get("Created", "unknown"),
-                "started": container.attrs["State"].get("StartedAt", "unknown"),
-                "image": container.image.tags[0] if container.image.tags else "unknown",
-                "ports": container.ports,
-                "health": container.attrs["State"].get("Health", {}).get("Status", "unknown")
+                "status": "docker_unavailable",
+                "message": "Docker 連接失敗",
+                "error": "無法連接到 Docker daemon"
             }
-            
-        except Exception as e:
+
+        def on_error(e):
             logger.error(f"Failed to get status: {e}")
             return {"status": "error", "error": str(e)}
-    
+
+        status = self._with_fallback("status", self._query_status, on_error)
+        stale_since = self.stale_since("status")
+        return dict(status, stale=stale_since is not None, stale_since=stale_since)
+
+    def _query_status(self) -> Dict[str, Any]:
+        """查詢容器狀態（失敗時拋出例外）"""
+        container = self._find_container()
+        
+        if container is None:
+            return {
+                "status": "not_found",
+                "message": "容器不存在"
+            }
+        
+        container_env = container.attrs.get("Config", {}).get("Env") or []
+        runtime_env = {
+            key: value for key, _, value in (item.partition("=") for item in container_env)
+            if key in RUNTIME_KEYS + ("TZ",)
+        }
+        
+        return {
+            "status": container.status,
+            "paused_by": sorted(self.pause_holders()),
+            "name": container.name,
+            "created": container.attrs.get("Created", "unknown"),
+            "started": container.attrs["State"].get("StartedAt", "unknown"),
+            "image": container.attrs.get("Config", {}).get("Image", "unknown"),
+            "ports": container.ports,
+            "health": container.attrs["State"].get("Health", {}).get("Status", "unknown"),
+            "runtime": {
+                "env": runtime_env,
+                # 與目前設定推算值不同的項目，重建容器後生效
+                "drift": environment_drift(provider_environment(self.resource_profile), container_env)
+            }
+        }
+
     def get_logs(self, lines: int = 100) -> str:
         """獲取容器日誌"""
-        try:
-            container = self.get_container()
-            
+        return self._flight.do(("logs", lines), lambda: self._fetch_logs(lines), self.cache_ttl)
+
+    def _fetch_logs(self, lines: int) -> str:
+        """向 Docker 讀取容器日誌"""
+        def query():
+            container = self._find_container()
             if container:
-                logs = container.logs(tail=lines, timestamps=True).decode('utf-8')
-                return logs
-            else:
-                return "容器不存在或未啟動"
-                
-        except Exception as e:
+                return container.logs(tail=lines, timestamps=True).decode('utf-8')
+            return "容器不存在或未啟動"
+
+        def on_error(e):
             logger.error(f"Failed to get logs: {e}")
             return f"獲取日誌失敗: {str(e)}"
+
+        return self._with_fallback(("logs", lines), query, on_error)
     
     def get_stats(self) -> Dict[str, Any]:
         """獲取容器統計資訊"""
-        try:
-            container = self.get_container()
-            
+        return self._flight.do("stats", self._fetch_stats, self.cache_ttl)
+
+    def _fetch_stats(self) -> Dict[str, Any]:
+        """向 Docker 讀取容器統計資訊（stream=False 會阻塞約一秒）"""
+        def query():
+            container = self._find_container()
             if container and container.status == "running":
-                stats = container.stats(stream=False)
-                return stats
-            else:
-                return {}
-                
-        except Exception as e:
+                return container.stats(stream=False)
+            return {}
+
+        def on_error(e):
             logger.error(f"Failed to get stats: {e}")
             return {}
+
+        return self._with_fallback("stats", query, on_error)
     
+    def read_provider_file(self, path: str) -> Optional[str]:
+        """以 exec 讀取運行中 Provider 容器內的檔案（例如 host 網路模式下的 /proc/net/dev），失敗時回傳 None"""
+        container = self.get_container()
+        if container is None or container.status != "running":
+            return None
+        try:
+            exec_id = container.exec_create(["cat", path])
+            output = self.client.exec_start(exec_id, timeout=READ_TIMEOUT)
+            if self.client.exec_inspect(exec_id).get("ExitCode") != 0:
+                return None
+            return output.decode("utf-8", "replace")
+        except Exception as e:
+            logger.debug(f"Failed to read {path} in provider container: {e}")
+            return None
+
+    def _container_spec(self) -> Dict[str, Any]:
+        """目前設定對應的容器設定（Engine API 格式），映像檔不存在時先拉取"""
+        try:
+            image = self.client.images.get(self.image_name)
+        except NotFound:
+            logger.info(f"Pulling {self.image_name}")
+            image = self.client.images.pull(self.image_name)
+
+        spec = {
+            "Image": self.image_name,
+            "Cmd": ["provide"],
+            "Env": [f"{key}={value}" for key, value in provider_environment(self.resource_profile).items()],
+            "HostConfig": {
+                "Binds": [f"{self.config_path}:/root/.urnetwork:rw"],
+                "RestartPolicy": {"Name": "no"},
+                **self.resource_profile.host_config(),
+                **self.network_profile.host_config(),
+                **self.log_profile.host_config()
+            }
+        }
+        fingerprint = hashlib.sha256(json.dumps([image.id, spec], sort_keys=True).encode()).hexdigest()[:16]
+        spec["Labels"] = {SPEC_LABEL: fingerprint}
+        return spec
+
+    def _prepare_container(self) -> Container:
+        """取得符合目前映像檔與設定的容器；未運行的過期容器會被替換為新建立（created）的容器"""
+        spec = self._container_spec()
+        container = self._find_container()
+
+        if container is not None:
+            labels = container.attrs.get("Config", {}).get("Labels") or {}
+            if labels.get(SPEC_LABEL) == spec["Labels"][SPEC_LABEL]:
+                return container
+            if container.status in ("running", "paused", "restarting"):
+                # 運行中的容器不中斷，新設定在下次重建時生效
+                return container
+            logger.info(f"Replacing outdated container {container.short_id} ({container.status})")
+            container.remove(force=True)
+
+        os.makedirs(self.config_path, exist_ok=True)
+        self.network_profile.ensure_network(self.client)
+        logger.info(f"Creating container with config: {spec}")
+        container = self.client.containers.create(spec, name=self.container_name)
+        self._flight.forget()
+        return container
+
+    def _start_container(self, container: Container):
+        """啟動容器；預先建立的容器先補上 restart policy"""
+        restart_policy = container.attrs.get("HostConfig", {}).get("RestartPolicy") or {}
+        if restart_policy.get("Name") != RESTART_POLICY["Name"]:
+            container.update_resources({"RestartPolicy": RESTART_POLICY})
+        container.start()
+
+    def prewarm(self) -> Dict[str, Any]:
+        """預先建立（不啟動）符合目前映像檔與設定的容器，讓之後的啟動只需要一次 start 呼叫"""
+        if self.client is None:
+            return {"success": False, "error": "Docker 連接失敗"}
+        try:
+            with self.lifecycle.exclusive():
+                container = self._prepare_container()
+            return {"success": True, "message": f"容器已就緒: {container.short_id} ({container.status})"}
+        except Exception as e:
+            logger.error(f"Failed to prepare container: {e}")
+            return {"success": False, "error": str(e)}
+
     def _create_container(self) -> Dict[str, Any]:
-        """建立新的 URnetwork 容器"""
+        """建立（或沿用預先建立的）URnetwork 容器並啟動"""
         try:
             if self.client is None:
                 return {"success": False, "error": "Docker 連接失敗，無法創建容器"}
 
-            # 確保配置目錄存在
-            subprocess.run(f"mkdir -p {self.config_path}", shell=True, check=True)
-            
-            # 容器設定
-            container_config = {
-                "image": self.image_name,
-                "name": self.container_name,
-                "command": "provide",
-                "volumes": {
-                    self.config_path: {
-                        "bind": "/root/.urnetwork",
-                        "mode": "rw"
-                    }
-                },
-                "environment": {
-                    "TZ": "Asia/Taipei"
-                },
-                "restart_policy": {"Name": "unless-stopped"},
-                "detach": True,
-                "remove": False
-            }
-            
-            logger.info(f"Creating container with config: {container_config}")
-            
-            # 建立並啟動容器
-            container = self.client.containers.run(**container_config)
-            
+            container = self._prepare_container()
+            self._start_container(container)
+
             logger.info(f"Container created successfully: {container.short_id}")
             
             return {
@@ -0,0 +1,104 @@
+"""等待檔案出現：優先使用 inotify，無法使用時改為自適應輪詢"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# 輪詢間隔：從很短開始逐步拉長
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 0.5
+
+_libc = None
+
+
+def _load_libc():
+    """載入 libc 的 inotify 函式，不支援時回傳 None"""
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            libc.inotify_init1  # 確認函式存在
+            _libc = libc
+        except (OSError, AttributeError):
+            _libc = False
+    return _libc or None
+
+
+def wait_until(directory: str, predicate: Callable[[], bool], timeout: float) -> bool:
+    """等待目錄內發生變化直到 predicate 為真，所有等待共用同一個期限"""
+    deadline = time.monotonic() + timeout
+
+    if predicate():
+        return True
+
+    fd = _inotify_watch(directory)
+    if fd is None:
+        return _poll_until(predicate, deadline)
+
+    try:
+        # 建立監看後再檢查一次，避免錯過期間寫入的檔案
+        if predicate():
+            return True
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return predicate()
+
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if readable:
+                try:
+                    os.read(fd, 4096)
+                except BlockingIOError:
+                    pass
+                if predicate():
+                    return True
+    finally:
+        os.close(fd)
+
+
+def _inotify_watch(directory: str) -> Optional[int]:
+    """建立 inotify 監看，失敗時回傳 None"""
+    libc = _load_libc()
+    if libc is None:
+        return None
+
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        logger.debug(f"inotify_init1 failed: errno {ctypes.get_errno()}")
+        return None
+
+    if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        logger.debug(f"inotify_add_watch on {directory} failed: errno {ctypes.get_errno()}")
+        os.close(fd)
+        return None
+
+    return fd
+
+
+def _poll_until(predicate: Callable[[], bool], deadline: float) -> bool:
+    """自適應輪詢"""
+    interval = POLL_MIN_INTERVAL
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return predicate()
+        time.sleep(min(interval, remaining))
+        if predicate():
+            return True
+        interval = min(interval * 2, POLL_MAX_INTERVAL)
@@ -0,0 +1,87 @@
+"""背景健康探測，健康檢查端點只讀取快取結果"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeResult:
+    """單一探測的最新結果"""
+
+    def __init__(self):
+        self.ok = False
+        self.value: Any = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.duration = 0.0
+
+    def to_dict(self, now: float, stale_after: float) -> Dict[str, Any]:
+        age = None if self.checked_at is None else round(now - self.checked_at, 1)
+        return {
+            "ok": self.ok,
+            "value": self.value,
+            "error": self.error,
+            "age": age,
+            "duration": round(self.duration, 3),
+            "stale": age is None or age > stale_after
+        }
+
+
+class HealthMonitor:
+    """每個探測在獨立執行緒中週期執行，卡住的探測只會讓自己變成過期"""
+
+    def __init__(self, probes: Dict[str, Callable[[], Any]], interval: float = 30.0,
+                 stale_after: Optional[float] = None):
+        """初始化健康監控"""
+        self.probes = probes
+        self.interval = interval
+        self.stale_after = stale_after if stale_after is not None else interval * 3
+        self.results = {name: ProbeResult() for name in probes}
+        self.started_at = time.time()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self, wait: Optional[Callable[[], Any]] = None):
+        """啟動所有探測執行緒；wait 會在第一次探測前呼叫（例如等待管理器就緒）"""
+        if self._threads:
+            return
+        for name in self.probes:
+            thread = threading.Thread(target=self._run, args=(name, wait), name=f"probe-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """停止探測"""
+        self._stop.set()
+
+    def _run(self, name: str, wait: Optional[Callable[[], Any]]):
+        if wait is not None:
+            wait()
+        while not self._stop.is_set():
+            self.run_probe(name)
+            self._stop.wait(self.interval)
+
+    def run_probe(self, name: str):
+        """執行單一探測並更新快取"""
+        result = self.results[name]
+        started = time.monotonic()
+        try:
+            value = self.probes[name]()
+            result.ok, result.value, result.error = True, value, None
+        except Exception as e:
+            logger.debug(f"Health probe {name} failed: {e}")
+            result.ok, result.error = False, str(e)
+        result.duration = time.monotonic() - started
+        result.checked_at = time.time()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """回傳所有探測的快取結果"""
+        now = time.time()
+        return {name: result.to_dict(now, self.stale_after) for name, result in self.results.items()}
+
+    def uptime(self) -> float:
+        """監控啟動後經過的秒數"""
+        return round(time.time() - self.started_at, 1)
@@ -0,0 +1,103 @@
+"""API 回應的 ETag / 條件式 GET 與壓縮"""
+
+import gzip
+import hashlib
+import json
+import threading
+import uuid
+from typing import Any, Dict, Iterable
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 小於此大小的回應不壓縮
+COMPRESS_MIN_BYTES = 1024
+
+# 每次啟動不同，避免重啟後序號重複造成錯誤的 304
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class SnapshotSequence:
+    """內容改變時遞增的序號，作為 ETag 的版本"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._digests: Dict[str, str] = {}
+        self._seqs: Dict[str, int] = {}
+
+    def observe(self, key: str, content: bytes) -> int:
+        """記錄目前內容，回傳對應的序號"""
+        digest = hashlib.sha1(content).hexdigest()
+        with self._lock:
+            if self._digests.get(key) != digest:
+                self._digests[key] = digest
+                self._seqs[key] = self._seqs.get(key, 0) + 1
+            return self._seqs[key]
+
+    def current(self, key: str) -> int:
+        """目前的序號（尚未觀察過為 0）"""
+        with self._lock:
+            return self._seqs.get(key, 0)
+
+
+snapshots = SnapshotSequence()
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+
+def _compress(response: Response, body: bytes) -> Response:
+    """依 Accept-Encoding 壓縮較大的回應"""
+    if len(body) < COMPRESS_MIN_BYTES:
+        response.set_data(body)
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response.set_data(body)
+    return response
+
+
+def _without(payload: Dict[str, Any], paths: Iterable[str]) -> Dict[str, Any]:
+    """移除不影響版本的欄位（支援 'a.b' 形式的巢狀路徑）"""
+    stable = dict(payload)
+    for path in paths:
+        parts = path.split('.')
+        parent = stable
+        for part in parts[:-1]:
+            if not isinstance(parent.get(part), dict):
+                parent = None
+                break
+            parent[part] = dict(parent[part])
+            parent = parent[part]
+        if parent is not None:
+            parent.pop(parts[-1], None)
+    return stable
+
+
+def cached_json(key: str, payload: Dict[str, Any], volatile: Iterable[str] = ()) -> Response:
+    """輸出帶 ETag 的 JSON；If-None-Match 相符時回傳 304。volatile 欄位不影響版本"""
+    seq = snapshots.observe(key, _encode(_without(payload, volatile)))
+    etag = f"{key}-{_BOOT_ID}-{seq}"
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = _compress(Response(mimetype='application/json'), _encode(payload))
+
+    # 壓縮後的內容位元組不同，因此使用 weak ETag
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,111 @@
+"""容器生命週期協調：同一容器的變更操作依序執行，相同的操作合併，衝突的操作立即拒絕"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN = "unknown"
+STOPPED = "stopped"
+STARTING = "starting"
+RUNNING = "running"
+STOPPING = "stopping"
+RESTARTING = "restarting"
+UPDATING = "updating"
+FAILED = "failed"
+
+# 操作 → (進行中的狀態, 成功後的狀態)
+OPERATIONS = {
+    "start": (STARTING, RUNNING),
+    "stop": (STOPPING, STOPPED),
+    "restart": (RESTARTING, RUNNING),
+    "update": (UPDATING, RUNNING),
+}
+
+# 進行中狀態的顯示名稱
+STATE_LABELS = {
+    STARTING: "啟動",
+    STOPPING: "停止",
+    RESTARTING: "重啟",
+    UPDATING: "更新",
+}
+
+
+class LifecycleCoordinator:
+    """stopped / running / failed / unknown 為靜止狀態，可以開始任何操作；
+    starting / stopping / restarting / updating 為進行中狀態，期間只接受相同的操作（合併為一次），
+    其餘操作不查詢 Docker 直接拒絕。靜止狀態只是上一次操作的結果，容器實際狀態仍由操作本身向 Docker 確認。
+    """
+
+    def __init__(self, name: str):
+        """初始化協調器"""
+        self.name = name
+        self.state = UNKNOWN
+        self.active: Optional[str] = None
+        self.last_operation: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        # 變更容器的操作（包含資源調整、崩潰保護）都持有這個鎖
+        self._op_lock = threading.RLock()
+        self._flight = SingleFlight()
+
+    @contextmanager
+    def exclusive(self):
+        """與生命週期操作互斥地執行其他變更"""
+        with self._op_lock:
+            yield
+
+    def _rejection(self, op: str, active: str) -> Dict[str, Any]:
+        label = STATE_LABELS.get(OPERATIONS[active][0], active)
+        logger.info(f"Rejecting {op} on {self.name}: {active} in progress")
+        return {
+            "success": False,
+            "error": f"Provider 正在{label}，請稍後再試",
+            "state": OPERATIONS[active][0],
+            "rejected": True
+        }
+
+    def run(self, op: str, func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """執行生命週期操作；同一操作進行中時等待並共用其結果"""
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown lifecycle operation: {op}")
+
+        with self._lock:
+            if self.active is not None and self.active != op:
+                return self._rejection(op, self.active)
+
+        return self._flight.do(op, lambda: self._execute(op, func))
+
+    def _execute(self, op: str, func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            # 檢查與佔用之間可能有其他操作開始
+            if self.active is not None:
+                return self._rejection(op, self.active)
+            self.active = op
+            self.state = OPERATIONS[op][0]
+
+        started = time.time()
+        result: Dict[str, Any] = {"success": False, "error": "操作未完成"}
+        try:
+            with self._op_lock:
+                result = func()
+            return result
+        finally:
+            with self._lock:
+                self.active = None
+                self.state = OPERATIONS[op][1] if result.get("success") else FAILED
+                self.last_operation = {
+                    "operation": op,
+                    "success": bool(result.get("success")),
+                    "started_at": started,
+                    "duration": round(time.time() - started, 3)
+                }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """目前狀態與上一次操作"""
+        with self._lock:
+            return {"state": self.state, "active": self.active, "last_operation": self.last_operation}
@@ -0,0 +1,220 @@
+"""依主機負載調整 Provider 的 CPU 配額，負載過高時暫停 Provider
+
+主機負載取自 PSI（/proc/pressure/cpu|io|memory 的 some avg10）；
+核心不支援 PSI 時改用 /proc/loadavg 除以 CPU 數量換算成百分比。
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+
+from .resource_profile import CPU_PERIOD
+
+logger = logging.getLogger(__name__)
+
+PSI_RESOURCES = ("cpu", "io", "memory")
+
+# DockerManager 暫停要求的來源名稱
+PAUSE_HOLDER = "governor"
+
+
+def read_psi(resource: str, root: str = "/proc/pressure") -> Optional[float]:
+    """讀取 PSI 的 some avg10（百分比），不支援時回傳 None"""
+    try:
+        with open(os.path.join(root, resource)) as f:
+            for line in f:
+                if line.startswith("some "):
+                    fields = dict(item.split("=", 1) for item in line.split()[1:])
+                    return float(fields["avg10"])
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+
+def read_loadavg(path: str = "/proc/loadavg") -> Optional[float]:
+    """1 分鐘平均負載"""
+    try:
+        with open(path) as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def sample_pressure() -> Dict[str, Any]:
+    """取樣主機壓力，pressure 為 0-100 的綜合值"""
+    psi = {resource: read_psi(resource) for resource in PSI_RESOURCES}
+    load = read_loadavg()
+    cpus = os.cpu_count() or 1
+
+    available = [value for value in psi.values() if value is not None]
+    if available:
+        pressure = max(available)
+    elif load is not None:
+        pressure = min(100.0, load / cpus * 100)
+    else:
+        pressure = 0.0
+    return {"pressure": round(pressure, 1), "psi": psi, "loadavg": load, "source": "psi" if available else "loadavg"}
+
+
+class LoadGovernor:
+    """以 AIMD 調整 CPU 配額：壓力高時減半，持續低壓時逐步增加，並設有遲滯區間"""
+
+    def __init__(self, docker_mgr, stats: Optional[Callable[[], Dict[str, Any]]] = None,
+                 interval: float = 10.0, min_cpus: float = 0.25, max_cpus: Optional[float] = None,
+                 low: float = 10.0, high: float = 40.0, pause_at: float = 80.0, resume_below: float = 30.0,
+                 hold: int = 3, sampler: Callable[[], Dict[str, Any]] = sample_pressure):
+        """初始化調速器；壓力門檻皆為百分比"""
+        self.docker_mgr = docker_mgr
+        self.stats = stats
+        self.interval = interval
+        self.min_cpus = min_cpus
+        self.low = low
+        self.high = high
+        self.pause_at = pause_at
+        self.resume_below = resume_below
+        self.hold = hold
+        self.sampler = sampler
+
+        self._max_cpus = max_cpus
+        self.max_cpus = self._ceiling()
+        self.cpus = self.max_cpus
+
+        self.state = "idle"
+        self.last_sample: Dict[str, Any] = {}
+        self.provider_cpu: Optional[float] = None
+        self.changed_at: Optional[float] = None
+        self._calm = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """啟動背景調速執行緒"""
+        if self._thread is not None or getattr(self.docker_mgr, "client", None) is None:
+            return
+        self.state = "running"
+        logger.info(f"Load governor started (cpus {self.min_cpus}-{self.max_cpus}, pause at {self.pause_at}%)")
+        self._thread = threading.Thread(target=self._run, name="load-governor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.step()
+            except Exception as e:
+                logger.warning(f"Load governor step failed: {e}")
+            self._stop.wait(self.interval)
+
+    def _ceiling(self) -> float:
+        """配額上限：明確指定的 max_cpus，否則為目前 ResourceProfile 的 cpus（未設定時為全部 CPU）"""
+        if self._max_cpus:
+            return self._max_cpus
+        profile = getattr(self.docker_mgr, "resource_profile", None)
+        return profile.cpus if profile and profile.cpus else float(os.cpu_count() or 1)
+
+    def _sync_ceiling(self):
+        """/api/resources 變更 cpus 後，容器的配額已是使用者的新值，以它作為新的起點"""
+        ceiling = self._ceiling()
+        if ceiling != self.max_cpus:
+            logger.info(f"Provider CPU ceiling changed {self.max_cpus} -> {ceiling}")
+            self.max_cpus = ceiling
+            self.cpus = ceiling
+            self._calm = 0
+
+    def _provider_cpu(self) -> Optional[float]:
+        """從 StatsCollector 取得 Provider 的 CPU 使用率"""
+        if self.stats is None:
+            return None
+        value = (self.stats() or {}).get("cpu_usage")
+        try:
+            return float(str(value).rstrip("%"))
+        except (TypeError, ValueError):
+            return None
+
+    def step(self):
+        """取樣一次並決定是否調整配額或暫停"""
+        sample = self.sampler()
+        pressure = sample["pressure"]
+        self.last_sample = sample
+        self.provider_cpu = self._provider_cpu()
+
+        container = self.docker_mgr.get_container()
+        if container is None:
+            return
+
+        with self._lock:
+            self._sync_ceiling()
+            if self.state == "paused":
+                if PAUSE_HOLDER not in self.docker_mgr.pause_holders():
+                    # 使用者明確啟動、停止或重啟，暫停要求已被清除
+                    self._set_state("running")
+                elif pressure < self.resume_below:
+                    self._calm = 0
+                    self._set_state("running")
+                    self._resume(pressure)
+                return
+
+            # 其他來源（例如排程器）暫停中或已停止時不調整
+            if container.status != "running":
+                return
+
+            if pressure >= self.pause_at:
+                self._calm = 0
+                if self._pause(pressure):
+                    self._set_state("paused")
+            elif pressure >= self.high:
+                self._calm = 0
+                # Provider 幾乎沒有使用 CPU 時，降低配額也無助於主機
+                if self.provider_cpu is not None and self.provider_cpu < 5:
+                    return
+                self._apply(max(self.min_cpus, self.cpus / 2), pressure)
+            elif pressure < self.low:
+                self._calm += 1
+                if self._calm >= self.hold and self.cpus < self.max_cpus:
+                    self._calm = 0
+                    self._apply(min(self.max_cpus, self.cpus + max(0.25, self.max_cpus / 8)), pressure)
+            else:
+                # 遲滯區間：維持目前配額
+                self._calm = 0
+
+    def _set_state(self, state: str):
+        self.state = state
+        self.changed_at = time.time()
+
+    def _apply(self, cpus: float, pressure: float):
+        """經由 DockerManager 調整 CPU 配額（與生命週期操作互斥）"""
+        cpus = round(cpus, 2)
+        if cpus == self.cpus:
+            return
+        logger.info(f"Host pressure {pressure}%: provider CPU quota {self.cpus} -> {cpus}")
+        result = self.docker_mgr.update_limits({"CpuPeriod": CPU_PERIOD, "CpuQuota": int(cpus * CPU_PERIOD)})
+        if result.get("success"):
+            self.cpus = cpus
+            self.changed_at = time.time()
+
+    def _pause(self, pressure: float) -> bool:
+        logger.warning(f"Host pressure {pressure}% above {self.pause_at}%, pausing provider")
+        return bool(self.docker_mgr.pause_provider(PAUSE_HOLDER).get("success"))
+
+    def _resume(self, pressure: float):
+        logger.info(f"Host pressure {pressure}% below {self.resume_below}%, releasing provider pause")
+        self.docker_mgr.resume_provider(PAUSE_HOLDER)
+
+    def get_state(self) -> Dict[str, Any]:
+        """回傳調速狀態"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "cpus": self.cpus,
+                "min_cpus": self.min_cpus,
+                "max_cpus": self.max_cpus,
+                "pressure": self.last_sample.get("pressure"),
+                "source": self.last_sample.get("source"),
+                "provider_cpu": self.provider_cpu,
+                "changed_at": self.changed_at
+            }
@@ -0,0 +1,76 @@
+"""Provider 容器的日誌驅動與輪替設定：限制主機上日誌檔的大小"""
+
+import logging
+import re
+from typing import Dict, Any
+
+from .addon_options import get_option
+
+logger = logging.getLogger(__name__)
+
+LOG_DRIVERS = ("json-file", "local")
+DEFAULT_MAX_SIZE = "10m"
+DEFAULT_MAX_FILE = 3
+
+
+class LogProfile:
+    """json-file（預設）或 local 驅動，兩者都以 max-size / max-file 輪替；
+    docker logs 的 tail 只需讀取目前的檔案，大小固定後讀取時間不會隨運行時間增加"""
+
+    def __init__(self, driver: str = "json-file", max_size: str = DEFAULT_MAX_SIZE,
+                 max_file: int = DEFAULT_MAX_FILE, compress: bool = True):
+        """初始化日誌設定"""
+        if driver not in LOG_DRIVERS:
+            raise ValueError(f"無效的日誌驅動: {driver}")
+        max_size = str(max_size).lower()
+        if not re.fullmatch(r"\d+[kmg]", max_size):
+            raise ValueError(f"無效的日誌檔大小: {max_size}")
+        max_file = int(max_file)
+        if max_file < 1:
+            raise ValueError(f"無效的日誌檔數量: {max_file}")
+        compress = bool(compress)
+        if compress and max_file < 2:
+            # 只保留一個檔案時沒有輪替後的檔案可壓縮，json-file 驅動會拒絕建立容器
+            logger.warning("Log compression requires max-file >= 2; disabling compression")
+            compress = False
+        self.driver = driver
+        self.max_size = max_size
+        self.max_file = max_file
+        self.compress = compress
+
+    @classmethod
+    def from_options(cls) -> "LogProfile":
+        """由 Add-on 選項建立，選項不合法時退回預設"""
+        try:
+            return cls(
+                get_option("provider_log_driver", "json-file"),
+                get_option("provider_log_max_size", DEFAULT_MAX_SIZE),
+                get_option("provider_log_max_file", DEFAULT_MAX_FILE),
+                get_option("provider_log_compress", True)
+            )
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid provider log options, using defaults: {e}")
+            return cls()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"driver": self.driver, "max_size": self.max_size, "max_file": self.max_file, "compress": self.compress}
+
+    def log_config(self) -> Dict[str, Any]:
+        """Engine API 的 LogConfig（選項值皆為字串）"""
+        return {
+            "Type": self.driver,
+            "Config": {
+                "max-size": self.max_size,
+                "max-file": str(self.max_file),
+                "compress": "true" if self.compress else "false"
+            }
+        }
+
+    def host_config(self) -> Dict[str, Any]:
+        """Engine API 的 HostConfig 欄位"""
+        return {"LogConfig": self.log_config()}
+
+    def matches(self, host_config: Dict[str, Any]) -> bool:
+        """既有容器的日誌設定是否與設定相同（不同時需重建容器才會生效）"""
+        current = host_config.get("LogConfig") or {}
+        return current.get("Type") == self.driver and (current.get("Config") or {}) == self.log_config()["Config"]
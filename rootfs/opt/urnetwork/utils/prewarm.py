@@ -0,0 +1,80 @@
+"""預先建立 Provider 容器：映像檔更新或容器被移除後，在背景重建 created 狀態的容器"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 事件後等待的秒數，合併連續事件（例如 pull 後緊接著 tag）
+REFRESH_DELAY = 5.0
+
+
+class ContainerPrewarmer:
+    """監聽映像檔與容器事件，讓預先建立的容器保持符合目前的映像檔與設定"""
+
+    def __init__(self, delay: float = REFRESH_DELAY):
+        """初始化預建器"""
+        self.delay = delay
+        self.docker_mgr = None
+        self.last_result: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, docker_mgr):
+        """先建立一次容器，再開始監聽 Docker 事件"""
+        if self._thread is not None or getattr(docker_mgr, 'client', None) is None:
+            return
+        self.docker_mgr = docker_mgr
+        self._thread = threading.Thread(target=self._watch_events, name="container-prewarm", daemon=True)
+        self._thread.start()
+        self.schedule_refresh(0)
+
+    def stop(self):
+        """停止監聽"""
+        self._stop.set()
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+
+    def _watch_events(self):
+        """讀取事件串流，中斷時自動重新連線"""
+        filters = {"type": ["image", "container"], "event": ["pull", "tag", "destroy"]}
+        while not self._stop.is_set():
+            try:
+                for event in self.docker_mgr.client.events(decode=True, filters=filters):
+                    if self._stop.is_set():
+                        return
+                    self.handle_event(event)
+            except Exception as e:
+                logger.warning(f"Docker event stream interrupted: {e}")
+            self._stop.wait(5)
+
+    def handle_event(self, event: Dict[str, Any]):
+        """Provider 映像檔被拉取/標記，或 Provider 容器被移除時重新預建"""
+        attributes = event.get("Actor", {}).get("Attributes", {})
+        if event.get("Type") == "image":
+            relevant = self.docker_mgr.image_name in (attributes.get("name"), event.get("id"))
+        else:
+            relevant = attributes.get("name") == self.docker_mgr.container_name
+        if relevant:
+            logger.debug(f"Provider {event.get('Type')} {event.get('Action')}, refreshing pre-created container")
+            self.schedule_refresh(self.delay)
+
+    def schedule_refresh(self, delay: float):
+        """delay 秒後重新預建（期間的其他事件合併為一次）"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _refresh(self):
+        with self._lock:
+            self._timer = None
+        if self._stop.is_set():
+            return
+        self.last_result = self.docker_mgr.prewarm()
@@ -0,0 +1,75 @@
+"""取樣式效能分析器（用於線上問題診斷）"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Optional
+
+# 單次分析的時間上限，避免長時間佔用
+MAX_PROFILE_SECONDS = 60
+DEFAULT_INTERVAL = 0.01
+
+
+class SamplingProfiler:
+    """以 sys._current_frames 定期取樣所有執行緒的呼叫堆疊"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        """初始化分析器"""
+        self.interval = max(0.001, interval)
+        self._lock = threading.Lock()
+
+    def is_running(self) -> bool:
+        """是否正在進行分析"""
+        return self._lock.locked()
+
+    def profile(self, seconds: float) -> Optional[Dict[str, Any]]:
+        """執行取樣，若已有分析正在進行則回傳 None"""
+        if not self._lock.acquire(blocking=False):
+            return None
+
+        try:
+            seconds = max(0.1, min(float(seconds), MAX_PROFILE_SECONDS))
+            own_ident = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+
+            started = time.monotonic()
+            deadline = started + seconds
+            while time.monotonic() < deadline:
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    stacks[self._collapse(thread_names.get(ident, str(ident)), frame)] += 1
+                samples += 1
+                time.sleep(self.interval)
+
+            return {
+                "duration": round(time.monotonic() - started, 3),
+                "interval": self.interval,
+                "samples": samples,
+                "stacks": stacks
+            }
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        """將堆疊轉為 flamegraph 的 collapsed 格式（根在前）"""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        parts.append(f"thread:{thread_name}")
+        parts.reverse()
+        return ";".join(part.replace(";", ",") for part in parts)
+
+    @staticmethod
+    def format_collapsed(result: Dict[str, Any]) -> str:
+        """輸出 flamegraph.pl / speedscope 可直接讀取的文字"""
+        return "\n".join(
+            f"{stack} {count}" for stack, count in result["stacks"].most_common()
+        ) + "\n"
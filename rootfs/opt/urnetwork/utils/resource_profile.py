@@ -0,0 +1,157 @@
+"""Provider 容器的資源設定：CPU、記憶體、PID、檔案描述符與磁碟 I/O 權重"""
+
+import os
+import re
+from typing import Dict, Any, List, Optional
+
+from .addon_options import get_option
+
+PROFILE_KEYS = ("cpus", "cpuset_cpus", "mem_limit", "pids_limit", "nofile", "blkio_weight")
+
+# CPU 上限以 period/quota 表示（等同 --cpus），建立與即時更新使用同一組欄位，
+# 避免 NanoCpus 與 CpuQuota 同時設定造成衝突
+CPU_PERIOD = 100000
+
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+def parse_size(value: Any) -> int:
+    """解析 512m、1g 之類的大小字串"""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([bkmg]?)b?\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"無效的記憶體大小: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def all_cpus() -> str:
+    """所有 CPU 的 cpuset（update 無法清除 CpusetCpus，以此取消限制）"""
+    return f"0-{(os.cpu_count() or 1) - 1}"
+
+
+class ResourceProfile:
+    """資源設定；值為 None 的項目不做管理，維持 Docker 預設"""
+
+    def __init__(self, cpus: Optional[float] = None, cpuset_cpus: Optional[str] = None,
+                 mem_limit: Optional[int] = None, pids_limit: Optional[int] = None,
+                 nofile: Optional[int] = None, blkio_weight: Optional[int] = None):
+        """初始化資源設定（mem_limit 為位元組）"""
+        self.cpus = cpus
+        self.cpuset_cpus = cpuset_cpus
+        self.mem_limit = mem_limit
+        self.pids_limit = pids_limit
+        self.nofile = nofile
+        self.blkio_weight = blkio_weight
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ResourceProfile":
+        """由選項或 API 請求建立，值不合法時拋出 ValueError"""
+        values = {key: data.get(key) for key in PROFILE_KEYS if data.get(key) not in (None, "")}
+
+        if "cpus" in values:
+            values["cpus"] = float(values["cpus"])
+            if values["cpus"] <= 0:
+                raise ValueError("cpus 必須大於 0")
+        if "cpuset_cpus" in values:
+            values["cpuset_cpus"] = str(values["cpuset_cpus"]).replace(" ", "")
+            if not re.fullmatch(r"\d+(-\d+)?(,\d+(-\d+)?)*", values["cpuset_cpus"]):
+                raise ValueError(f"無效的 cpuset_cpus: {values['cpuset_cpus']}")
+        if "mem_limit" in values:
+            values["mem_limit"] = parse_size(values["mem_limit"])
+            if values["mem_limit"] < 6 * 1024 ** 2:
+                raise ValueError("mem_limit 至少需要 6m")
+        for key, low, high in (("pids_limit", 16, None), ("nofile", 1024, None), ("blkio_weight", 10, 1000)):
+            if key in values:
+                values[key] = int(values[key])
+                if values[key] < low or (high is not None and values[key] > high):
+                    raise ValueError(f"{key} 超出範圍")
+
+        return cls(**values)
+
+    @classmethod
+    def from_options(cls) -> "ResourceProfile":
+        """由 Add-on 選項建立"""
+        return cls.from_dict({key: get_option(key) for key in PROFILE_KEYS})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in PROFILE_KEYS}
+
+    def merged(self, data: Dict[str, Any]) -> "ResourceProfile":
+        """以 data 覆寫部分欄位後的新設定（值為 null 表示不再管理該項目）"""
+        values = self.to_dict()
+        values.update({key: data[key] for key in PROFILE_KEYS if key in data})
+        return ResourceProfile.from_dict(values)
+
+    def resources(self) -> Dict[str, Any]:
+        """可即時更新的 Engine API 欄位（POST /containers/{id}/update）"""
+        resources: Dict[str, Any] = {}
+        if self.cpus is not None:
+            resources["CpuPeriod"] = CPU_PERIOD
+            resources["CpuQuota"] = int(self.cpus * CPU_PERIOD)
+        if self.cpuset_cpus is not None:
+            resources["CpusetCpus"] = self.cpuset_cpus
+        if self.mem_limit is not None:
+            # 不限制 swap，否則調高記憶體時可能超過建立時的 MemorySwap
+            resources["Memory"] = self.mem_limit
+            resources["MemorySwap"] = -1
+        if self.pids_limit is not None:
+            resources["PidsLimit"] = self.pids_limit
+        if self.blkio_weight is not None:
+            resources["BlkioWeight"] = self.blkio_weight
+        return resources
+
+    def ulimits(self) -> List[Dict[str, Any]]:
+        """Engine API 格式的 ulimits（只能在建立容器時設定）"""
+        if self.nofile is None:
+            return []
+        return [{"Name": "nofile", "Soft": self.nofile, "Hard": self.nofile}]
+
+    def host_config(self) -> Dict[str, Any]:
+        """建立容器時的 HostConfig 欄位"""
+        host_config = self.resources()
+        if self.nofile is not None:
+            host_config["Ulimits"] = self.ulimits()
+        return host_config
+
+    def released(self, host_config: Dict[str, Any]) -> Dict[str, Any]:
+        """不再管理（值為 None）但容器上仍有限制、可以即時取消的欄位與取消用的值"""
+        released: Dict[str, Any] = {}
+        if self.cpus is None and (host_config.get("CpuQuota") or 0) > 0:
+            released["CpuQuota"] = -1
+        if self.pids_limit is None and (host_config.get("PidsLimit") or 0) > 0:
+            released["PidsLimit"] = -1
+        if self.cpuset_cpus is None and host_config.get("CpusetCpus") not in (None, "", all_cpus()):
+            released["CpusetCpus"] = all_cpus()
+        return released
+
+    def diff(self, host_config: Dict[str, Any]) -> Dict[str, Any]:
+        """與容器目前的 HostConfig 比較，回傳需要更新的欄位（包含要取消的限制）"""
+        changes = self.released(host_config)
+        changes.update({
+            key: value for key, value in self.resources().items()
+            if host_config.get(key) != value
+        })
+        return changes
+
+    def recreate_fields(self, host_config: Dict[str, Any]) -> List[str]:
+        """無法以 update 套用、需要重建容器才會生效的項目"""
+        fields = []
+        # Docker 的 update 不接受取消記憶體限制與 I/O 權重
+        if self.mem_limit is None and (host_config.get("Memory") or 0) > 0:
+            fields.append("mem_limit")
+        if self.blkio_weight is None and host_config.get("BlkioWeight"):
+            fields.append("blkio_weight")
+
+        # ulimits 無法即時更新
+        nofile = {u.get("Name"): u for u in host_config.get("Ulimits") or []}.get("nofile")
+        if self.nofile is None:
+            if nofile:
+                fields.append("nofile")
+        elif (nofile or {}).get("Soft") != self.nofile or (nofile or {}).get("Hard") != self.nofile:
+            fields.append("nofile")
+        return fields
+
+    def needs_recreate(self, host_config: Dict[str, Any]) -> bool:
+        """是否有項目需要重建容器才會生效"""
+        return bool(self.recreate_fields(host_config))
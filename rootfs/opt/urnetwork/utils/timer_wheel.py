@@ -0,0 +1,119 @@
+"""Hashed timer wheel：以單一執行緒處理大量延遲回呼，沒有計時器時不會喚醒"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WheelTimer:
+    """已排程的計時器"""
+
+    __slots__ = ("id", "callback", "rounds", "deadline", "slot", "cancelled")
+
+    def __init__(self, timer_id: int, callback: Callable[[], None], rounds: int, deadline: float, slot: int):
+        self.id = timer_id
+        self.callback = callback
+        self.rounds = rounds
+        self.deadline = deadline
+        self.slot = slot
+        self.cancelled = False
+
+
+class TimerWheel:
+    """每個 tick 前進一格，超過一圈的計時器以 rounds 記錄剩餘圈數"""
+
+    def __init__(self, tick: float = 1.0, slots: int = 512, name: str = "timer-wheel"):
+        """初始化時間輪"""
+        self.tick = tick
+        self.slots: List[Dict[int, WheelTimer]] = [{} for _ in range(slots)]
+        self.name = name
+        self._cursor = 0
+        self._count = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._last_tick = time.monotonic()
+
+    def start(self):
+        """啟動時間輪執行緒"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> WheelTimer:
+        """delay 秒後在時間輪執行緒中呼叫 callback"""
+        ticks = max(1, int(round(max(0.0, delay) / self.tick)))
+        with self._wakeup:
+            # 閒置一段時間後，游標以目前時間為準重新起算
+            if self._count == 0:
+                self._last_tick = time.monotonic()
+            rounds, offset = divmod(ticks, len(self.slots))
+            if offset == 0:
+                rounds, offset = rounds - 1, len(self.slots)
+            slot = (self._cursor + offset) % len(self.slots)
+            timer = WheelTimer(next(self._ids), callback, rounds, time.time() + delay, slot)
+            self.slots[slot][timer.id] = timer
+            self._count += 1
+            self._wakeup.notify()
+        return timer
+
+    def cancel(self, timer: Optional[WheelTimer]):
+        """取消計時器（已執行或已取消時不做任何事）"""
+        if timer is None:
+            return
+        with self._wakeup:
+            if timer.cancelled:
+                return
+            timer.cancelled = True
+            if self.slots[timer.slot].pop(timer.id, None) is not None:
+                self._count -= 1
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._count
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while self._count == 0 and not self._stopped:
+                    self._wakeup.wait()
+                if self._stopped:
+                    return
+                delay = self._last_tick + self.tick - time.monotonic()
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+                self._last_tick += self.tick
+                self._cursor = (self._cursor + 1) % len(self.slots)
+                due = self._advance(self.slots[self._cursor])
+
+            for timer in due:
+                try:
+                    timer.callback()
+                except Exception as e:
+                    logger.error(f"Timer callback failed: {e}")
+
+    def _advance(self, slot: Dict[int, WheelTimer]) -> List[WheelTimer]:
+        """取出本格到期的計時器，其餘減少一圈"""
+        due = []
+        for timer_id, timer in list(slot.items()):
+            if timer.rounds > 0:
+                timer.rounds -= 1
+                continue
+            del slot[timer_id]
+            self._count -= 1
+            timer.cancelled = True
+            due.append(timer)
+        return due
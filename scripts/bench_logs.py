@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""比較容器日誌累積大小對讀取延遲的影響：未限制的 json-file 與輪替設定（LogProfile）
+
+對每個設定與日誌量啟動一個測試容器（經由 EngineClient 套用與 Provider 容器
+相同的 LogProfile.host_config()），寫入指定 MB 的日誌後，量測
+`logs(tail=N)`（控制台與統計解析使用的讀取方式）的延遲、統計解析時間，
+以及讀取全部日誌的時間。需在 Docker 主機上執行；主機上的日誌檔大小
+只有在可讀取 LogPath 時（例如以 root 執行）才會顯示。
+
+用法：
+    python3 scripts/bench_logs.py [--sizes 16,64,256] [--driver json-file] [--max-size 10m] [--max-file 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rootfs", "opt", "urnetwork"))
+
+from utils.docker_engine import EngineClient  # noqa: E402
+from utils.log_profile import LOG_DRIVERS, LogProfile  # noqa: E402
+from utils.stats_collector import StatsCollector  # noqa: E402
+
+BENCH_IMAGE = "python:3.12-alpine"
+DONE_MARKER = "BENCH-DONE"
+
+WRITER_SCRIPT = """
+import sys, time
+line = "2024-01-01T00:00:00Z INFO relay stats bytes=123456 connections=42 earnings=0.0012 " + "x" * 96 + "\\n"
+block = line * 512
+total = int(sys.argv[1]) * 1024 * 1024
+written = 0
+while written < total:
+    sys.stdout.write(block)
+    written += len(block)
+sys.stdout.write("%s\\n")
+sys.stdout.flush()
+time.sleep(86400)
+""" % DONE_MARKER
+
+
+def start_writer(client, megabytes, host_config, timeout):
+    """以指定的 HostConfig 啟動寫入 megabytes MB 日誌的容器，寫完後回傳容器"""
+    container = client.containers.run({
+        "Image": BENCH_IMAGE,
+        "Cmd": ["python3", "-c", WRITER_SCRIPT, str(megabytes)],
+        "HostConfig": host_config
+    }, name=f"urnetwork-bench-logs-{os.getpid()}")
+    deadline = time.monotonic() + timeout
+    while DONE_MARKER not in container.logs(tail=1).decode("utf-8", "replace"):
+        if time.monotonic() > deadline:
+            container.remove(force=True)
+            raise TimeoutError(f"Writing {megabytes} MB of logs did not finish in {timeout}s")
+        time.sleep(0.5)
+    return container
+
+
+def log_file_size(container):
+    """主機上目前日誌檔的大小（無法讀取時回傳 None）"""
+    container.reload()
+    try:
+        return os.path.getsize(container.attrs.get("LogPath") or "")
+    except OSError:
+        return None
+
+
+def measure(container, tail, repeat):
+    """回傳 tail 讀取延遲中位數、統計解析時間與全部讀取時間（毫秒）"""
+    parser = StatsCollector(docker_mgr=object())
+    tail_ms, parse_ms = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        logs = container.logs(tail=tail, timestamps=True).decode("utf-8", "replace")
+        tail_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        parser._parse_logs_for_stats(logs)
+        parse_ms.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    full = container.logs()
+    full_ms = (time.perf_counter() - started) * 1000
+    return {
+        "tail_ms": round(statistics.median(tail_ms), 2),
+        "parse_ms": round(statistics.median(parse_ms), 3),
+        "full_read_ms": round(full_ms, 1),
+        "full_read_mb": round(len(full) / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="16,64,256", help="寫入的日誌量（MB），以逗號分隔")
+    parser.add_argument("--driver", choices=LOG_DRIVERS, default="json-file")
+    parser.add_argument("--max-size", default="10m")
+    parser.add_argument("--max-file", type=int, default=3)
+    parser.add_argument("--no-compress", action="store_true")
+    parser.add_argument("--tail", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--timeout", type=int, default=900, help="等待每個容器寫完日誌的秒數")
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    args = parser.parse_args()
+
+    profile = LogProfile(args.driver, args.max_size, args.max_file, not args.no_compress)
+    configs = {
+        "unbounded": {"LogConfig": {"Type": "json-file", "Config": {}}},
+        f"{args.driver} {args.max_size}x{args.max_file}": profile.host_config(),
+    }
+
+    client = EngineClient.from_env()
+    client.images.pull(BENCH_IMAGE)
+
+    report = []
+    for name, host_config in configs.items():
+        for megabytes in (int(size) for size in args.sizes.split(",")):
+            container = start_writer(client, megabytes, host_config, args.timeout)
+            try:
+                result = measure(container, args.tail, args.repeat)
+                result.update(config=name, written_mb=megabytes, log_file_bytes=log_file_size(container))
+            finally:
+                container.remove(force=True)
+            report.append(result)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'config':<22}{'written MB':>11}{'tail ms':>10}{'parse ms':>10}{'full read ms':>14}{'full MB':>9}{'file bytes':>14}")
+    for row in report:
+        print(f"{row['config']:<22}{row['written_mb']:>11}{row['tail_ms']:>10}{row['parse_ms']:>10}"
+              f"{row['full_read_ms']:>14}{row['full_read_mb']:>9}{str(row['log_file_bytes']):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""比較各網路模式的中繼吞吐量
+
+對每個模式啟動一個測試容器，網路設定與 Add-on 建立 Provider 容器時相同
+（經由 EngineClient 套用 NetworkProfile.host_config()），容器內執行 TCP echo 中繼；本機的流量產生器以多條連線送出資料並讀回，
+計算來回吞吐量。需在 Docker 主機上執行。
+
+用法：
+    python3 scripts/bench_network.py [--modes bridge,tuned_bridge,host] [--megabytes 256] [--connections 4]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rootfs", "opt", "urnetwork"))
+
+from utils.docker_engine import EngineClient  # noqa: E402
+from utils.network_profile import NETWORK_MODES, NetworkProfile  # noqa: E402
+
+BENCH_IMAGE = "python:3.12-alpine"
+BENCH_PORT = 5201
+CHUNK = 256 * 1024
+
+RELAY_SCRIPT = """
+import socket, threading
+def relay(conn):
+    with conn:
+        while True:
+            data = conn.recv(262144)
+            if not data:
+                return
+            conn.sendall(data)
+server = socket.socket()
+server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+server.bind(("0.0.0.0", %d))
+server.listen(128)
+while True:
+    conn, _ = server.accept()
+    threading.Thread(target=relay, args=(conn,), daemon=True).start()
+""" % BENCH_PORT
+
+
+def start_relay(client, mode, mtu):
+    """以指定模式啟動 echo 中繼容器，回傳 (容器, 連線位址)"""
+    profile = NetworkProfile(mode, mtu)
+    # 與 DockerManager._prepare_container 相同：先建立專用 bridge，再套用 HostConfig
+    profile.ensure_network(client)
+    body = {"Image": BENCH_IMAGE, "Cmd": ["python3", "-c", RELAY_SCRIPT], "HostConfig": profile.host_config()}
+    if mode != "host":
+        body["ExposedPorts"] = {f"{BENCH_PORT}/tcp": {}}
+        body["HostConfig"]["PortBindings"] = {f"{BENCH_PORT}/tcp": [{"HostIp": "127.0.0.1", "HostPort": ""}]}
+
+    container = client.containers.run(body, name=f"urnetwork-bench-{mode}", auto_remove=True)
+
+    if mode == "host":
+        address = ("127.0.0.1", BENCH_PORT)
+    else:
+        container.reload()
+        binding = container.attrs["NetworkSettings"]["Ports"][f"{BENCH_PORT}/tcp"][0]
+        address = (binding["HostIp"], int(binding["HostPort"]))
+
+    # 等待中繼開始接受連線
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(address, timeout=1).close()
+            return container, address
+        except OSError:
+            if time.monotonic() > deadline:
+                container.remove(force=True)
+                raise
+            time.sleep(0.2)
+
+
+def drive(address, total_bytes, results):
+    """送出 total_bytes 並讀回相同數量"""
+    payload = os.urandom(CHUNK)
+    with socket.create_connection(address) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def reader():
+            received = 0
+            while received < total_bytes:
+                data = sock.recv(CHUNK)
+                if not data:
+                    break
+                received += len(data)
+            results.append(received)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        sent = 0
+        while sent < total_bytes:
+            sock.sendall(payload[:min(CHUNK, total_bytes - sent)])
+            sent += min(CHUNK, total_bytes - sent)
+        thread.join()
+
+
+def bench(address, megabytes, connections):
+    """回傳來回吞吐量（MB/s）"""
+    per_connection = megabytes * 1024 * 1024 // connections
+    results = []
+    threads = [threading.Thread(target=drive, args=(address, per_connection, results)) for _ in range(connections)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return sum(results) / 1024 / 1024 / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(NETWORK_MODES))
+    parser.add_argument("--mtu", type=int, default=1500)
+    parser.add_argument("--megabytes", type=int, default=256)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="輸出 JSON")
+    args = parser.parse_args()
+
+    client = EngineClient.from_env()
+    client.images.pull(BENCH_IMAGE)
+
+    report = {}
+    for mode in args.modes.split(","):
+        container, address = start_relay(client, mode, args.mtu)
+        try:
+            bench(address, min(16, args.megabytes), args.connections)  # 暖機
+            rates = [bench(address, args.megabytes, args.connections) for _ in range(args.repeat)]
+        finally:
+            container.remove(force=True)
+        report[mode] = {"best_mb_s": round(max(rates), 1), "runs_mb_s": [round(r, 1) for r in rates]}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'mode':<14}{'best MB/s':>12}  runs")
+    for mode, result in report.items():
+        print(f"{mode:<14}{result['best_mb_s']:>12}  {result['runs_mb_s']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""讓測試可以直接匯入 Add-on 的 utils 模組"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "rootfs", "opt", "urnetwork"))
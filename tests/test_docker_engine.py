@@ -0,0 +1,136 @@
+"""精簡 Engine 客戶端：串流解碼、exec 與自動移除的容器"""
+
+import io
+import json
+import os
+import shutil
+import socketserver
+import struct
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from utils.docker_engine import EngineClient, iter_frames, iter_json
+
+
+def frame(stream_type, payload):
+    return struct.pack(">BxxxI", stream_type, len(payload)) + payload
+
+
+class ChunkedReader:
+    """每次 read1 只回傳固定大小的片段，模擬分段到達的串流"""
+
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+
+    def read1(self, amount=-1):
+        chunk, self.data = self.data[:self.size], self.data[self.size:]
+        return chunk
+
+
+def test_iter_frames_decodes_and_stops_on_truncation():
+    data = frame(1, b"out\n") + frame(2, b"err\n") + frame(1, b"")
+    assert list(iter_frames(io.BytesIO(data))) == [(1, b"out\n"), (2, b"err\n"), (1, b"")]
+    # 不完整的標頭或內容視為串流結束
+    assert list(iter_frames(io.BytesIO(frame(1, b"ok") + frame(1, b"cut")[:-1]))) == [(1, b"ok")]
+    assert list(iter_frames(io.BytesIO(b"\x01\x00"))) == []
+
+
+def test_iter_json_handles_split_lines_and_trailing_object():
+    data = b'{"a": 1}\n\n{"b": 2}\n{"c": 3}'
+    assert list(iter_json(ChunkedReader(data, 3))) == [{"a": 1}, {"b": 2}, {"c": 3}]
+
+
+class FakeEngine(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, FakeEngineHandler)
+        self.requests = []
+
+
+class FakeEngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload=None):
+        data = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def do_POST(self):
+        body = self._body()
+        self.server.requests.append(("POST", self.path, body))
+        if self.path == "/containers/helper/exec":
+            self._reply(201, {"Id": "exec1"})
+        elif self.path == "/exec/exec1/start":
+            # 與 Docker 相同：hijack 連線，沒有長度標頭，寫完後關閉
+            self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/vnd.docker.raw-stream\r\n\r\n")
+            self.wfile.write(frame(1, b"hello ") + frame(2, b"world"))
+            self.close_connection = True
+        elif self.path.startswith("/containers/create"):
+            self._reply(201, {"Id": "c1"})
+        elif self.path == "/containers/c1/start":
+            self._reply(204)
+        else:
+            self._reply(404, {"message": "no such endpoint"})
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, None))
+        if self.path == "/containers/helper/json":
+            self._reply(200, {"Id": "helper", "Name": "/helper", "State": {"Status": "running"}})
+        elif self.path == "/exec/exec1/json":
+            self._reply(200, {"ExitCode": 3, "Running": False})
+        elif self.path == "/containers/c1/json" and ("POST", "/containers/c1/start", None) not in self.server.requests:
+            self._reply(200, {"Id": "c1", "Name": "/helper", "State": {"Status": "created"}})
+        else:
+            # 自動移除的容器在 reload 前就已經被移除
+            self._reply(404, {"message": "No such container"})
+
+
+@pytest.fixture
+def engine():
+    directory = tempfile.mkdtemp(prefix="engine-")
+    server = FakeEngine(os.path.join(directory, "docker.sock"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = EngineClient(server.server_address, timeout=5)
+    yield server, client
+    client.close()
+    server.shutdown()
+    server.server_close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_exec_create_start_and_inspect(engine):
+    server, client = engine
+    container = client.containers.get("helper")
+    exec_id = container.exec_create(["status", "--json"], environment={"HOME": "/auth/job"})
+
+    assert exec_id == "exec1"
+    assert client.exec_start(exec_id) == b"hello world"
+    assert client.exec_inspect(exec_id)["ExitCode"] == 3
+    create = next(body for method, path, body in server.requests if path.endswith("/exec"))
+    assert create["Cmd"] == ["status", "--json"]
+    assert create["Env"] == ["HOME=/auth/job"]
+
+
+def test_run_with_auto_remove(engine):
+    server, client = engine
+    container = client.containers.run({"Image": "helper", "HostConfig": {"Binds": ["/a:/b:rw"]}},
+                                      name="helper", auto_remove=True)
+
+    assert container.id == "c1"
+    create = next(body for method, path, body in server.requests if path.startswith("/containers/create"))
+    assert create["HostConfig"] == {"Binds": ["/a:/b:rw"], "AutoRemove": True}
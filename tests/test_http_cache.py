@@ -0,0 +1,60 @@
+"""cached_json：ETag、If-None-Match 的 304、volatile 欄位與壓縮"""
+
+import gzip
+import json
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from utils import http_cache  # noqa: E402
+from utils.http_cache import SnapshotSequence, cached_json  # noqa: E402
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(http_cache, "snapshots", SnapshotSequence())
+    app = flask.Flask(__name__)
+    state = {"payload": {"value": 1, "meta": {"timestamp": 0}}}
+
+    @app.route("/status")
+    def status():
+        return cached_json("status", state["payload"], volatile=("meta.timestamp",))
+
+    app.state = state
+    return app
+
+
+def test_not_modified_until_content_changes(app):
+    client = app.test_client()
+    first = client.get("/status")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    assert client.get("/status", headers={"If-None-Match": etag}).status_code == 304
+
+    # 只有 volatile 欄位改變時版本不變
+    app.state["payload"] = {"value": 1, "meta": {"timestamp": 5}}
+    assert client.get("/status", headers={"If-None-Match": etag}).status_code == 304
+
+    app.state["payload"] = {"value": 2, "meta": {"timestamp": 5}}
+    changed = client.get("/status", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["value"] == 2
+
+
+def test_large_responses_are_gzipped(app):
+    app.state["payload"] = {"value": "x" * 4096, "meta": {}}
+    response = app.test_client().get("/status", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data))["value"] == "x" * 4096
+
+
+def test_sequence_only_advances_on_change():
+    seq = SnapshotSequence()
+    assert seq.current("logs") == 0
+    assert seq.observe("logs", b"a") == 1
+    assert seq.observe("logs", b"a") == 1
+    assert seq.observe("logs", b"b") == 2
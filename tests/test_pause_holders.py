@@ -0,0 +1,210 @@
+"""Provider 暫停經由 DockerManager：多個來源共用暫停，明確的啟停優先"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.bandwidth_scheduler import BandwidthScheduler
+from utils.docker_manager import DockerManager
+from utils.lifecycle import LifecycleCoordinator
+from utils.load_governor import LoadGovernor
+from utils.resource_profile import ResourceProfile
+from utils.single_flight import SingleFlight
+
+
+class FakeContainer:
+    short_id = "abc123"
+
+    def __init__(self, status="running"):
+        self.status = status
+        self.attrs = {"HostConfig": {}}
+        self.calls = []
+
+    def _record(self, name, status=None):
+        self.calls.append(name)
+        if status:
+            self.status = status
+
+    def pause(self):
+        self._record("pause", "paused")
+
+    def unpause(self):
+        self._record("unpause", "running")
+
+    def stop(self):
+        if self.status == "paused":
+            raise AssertionError("paused containers must be unpaused before stop")
+        self._record("stop", "exited")
+
+    def start(self):
+        self._record("start", "running")
+
+    def reload(self):
+        pass
+
+    def update_resources(self, changes):
+        self.calls.append(("update", changes))
+
+
+class IdleWheel:
+    """不執行任何回呼的時間輪，測試直接觸發評估"""
+
+    def start(self):
+        pass
+
+    def schedule(self, delay, callback):
+        return None
+
+    def cancel(self, timer):
+        pass
+
+
+@pytest.fixture
+def mgr():
+    manager = DockerManager.__new__(DockerManager)
+    manager.client = object()
+    manager.container_name = "urnetwork-provider"
+    manager.lifecycle = LifecycleCoordinator(manager.container_name)
+    manager._flight = SingleFlight()
+    manager._pause_holders = set()
+    manager._pause_lock = threading.Lock()
+    manager._start_listeners = []
+    manager.container = FakeContainer()
+    manager.get_container = lambda: manager.container
+    manager._prepare_container = lambda: manager.container
+    manager._start_container = lambda container: container.start()
+    return manager
+
+
+def test_one_holder_never_undoes_another(mgr):
+    assert mgr.pause_provider("scheduler")["success"]
+    assert mgr.pause_provider("governor")["paused_by"] == ["governor", "scheduler"]
+    assert mgr.container.calls == ["pause"]
+
+    result = mgr.resume_provider("governor")
+    assert result["paused_by"] == ["scheduler"]
+    assert mgr.container.status == "paused"
+
+    # 沒有要求暫停的來源不能恢復
+    mgr.resume_provider("governor")
+    assert mgr.container.status == "paused"
+
+    mgr.resume_provider("scheduler")
+    assert mgr.container.status == "running"
+    assert mgr.container.calls == ["pause", "unpause"]
+
+
+def test_start_unpauses_and_clears_holders(mgr):
+    mgr.pause_provider("scheduler")
+    result = mgr.start_provider()
+    assert result["success"] and mgr.container.status == "running"
+    assert mgr.pause_holders() == set()
+
+
+def test_stop_stops_a_paused_container(mgr):
+    mgr.pause_provider("governor")
+    assert mgr.stop_provider()["success"]
+    assert mgr.container.calls == ["pause", "unpause", "stop"]
+    assert mgr.pause_holders() == set()
+    # 停止後的暫停要求不會作用在已停止的容器上
+    assert not mgr.pause_provider("scheduler")["success"]
+
+
+def test_governor_pauses_and_updates_through_the_manager(mgr):
+    pressure = {"value": 90.0}
+    governor = LoadGovernor(mgr, max_cpus=2.0, sampler=lambda: {"pressure": pressure["value"]})
+
+    governor.step()
+    assert governor.state == "paused" and mgr.pause_holders() == {"governor"}
+
+    # 使用者明確啟動後，調速器不再認為自己持有暫停
+    mgr.start_provider()
+    pressure["value"] = 50.0
+    governor.step()
+    assert governor.state == "running"
+
+    governor.step()
+    assert governor.cpus == 1.0
+    assert ("update", {"CpuPeriod": 100000, "CpuQuota": 100000}) in mgr.container.calls
+
+
+def test_scheduler_release_keeps_the_governor_pause(mgr, tmp_path):
+    scheduler = BandwidthScheduler(mgr, str(tmp_path / "usage.json"), windows="08:00-18:00")
+
+    scheduler.evaluate({}, now=datetime(2026, 1, 5, 20, 0))
+    assert scheduler.paused and scheduler.reason == "outside_window"
+    mgr.pause_provider("governor")
+
+    scheduler.evaluate({}, now=datetime(2026, 1, 6, 9, 0))
+    assert not scheduler.paused
+    assert mgr.container.status == "paused" and mgr.pause_holders() == {"governor"}
+
+
+def test_scheduler_pause_waits_for_a_running_stop(mgr, tmp_path):
+    in_stop = threading.Event()
+    release = threading.Event()
+    stop = mgr.container.stop
+
+    def slow_stop():
+        in_stop.set()
+        release.wait(2)
+        stop()
+
+    mgr.container.stop = slow_stop
+    scheduler = BandwidthScheduler(mgr, str(tmp_path / "usage.json"), windows="08:00-18:00")
+
+    stopper = threading.Thread(target=mgr.stop_provider)
+    stopper.start()
+    assert in_stop.wait(2)
+
+    # 排程器看到的仍是 running，暫停要求必須等停止完成
+    pauser = threading.Thread(target=scheduler.evaluate, args=({}, datetime(2026, 1, 5, 20, 0)))
+    pauser.start()
+    pauser.join(0.2)
+    assert pauser.is_alive()
+
+    release.set()
+    stopper.join(2)
+    pauser.join(2)
+    assert mgr.container.status == "exited"
+    assert mgr.container.calls == ["stop"]
+    assert not scheduler.paused and mgr.pause_holders() == set()
+
+
+def test_governor_follows_a_manual_cpu_change(mgr):
+    mgr.resource_profile = ResourceProfile(cpus=2.0)
+    pressure = {"value": 50.0}
+    governor = LoadGovernor(mgr, sampler=lambda: {"pressure": pressure["value"]})
+    governor.state = "running"
+
+    governor.step()
+    assert governor.cpus == 1.0
+
+    # 使用者經由 /api/resources 把上限改為 4 顆 CPU（容器配額已由 apply_resources 更新）
+    mgr.resource_profile = ResourceProfile(cpus=4.0)
+    mgr.container.calls.clear()
+    pressure["value"] = 5.0
+    for _ in range(3):
+        governor.step()
+    assert governor.max_cpus == 4.0 and governor.cpus == 4.0
+    assert mgr.container.calls == []
+
+    # 之後的減半從使用者的值開始，不會寫回舊的上限
+    pressure["value"] = 50.0
+    governor.step()
+    assert mgr.container.calls == [("update", {"CpuPeriod": 100000, "CpuQuota": 200000})]
+
+
+def test_manual_start_outside_the_window_is_paused_at_once(mgr, tmp_path):
+    now = datetime.now()
+    window = f"{(now + timedelta(hours=2)):%H:%M}-{(now + timedelta(hours=3)):%H:%M}"
+    scheduler = BandwidthScheduler(mgr, str(tmp_path / "usage.json"), windows=window, wheel=IdleWheel())
+    scheduler.start()
+
+    mgr.container.status = "exited"
+    assert mgr.start_provider()["success"]
+    # 不等下一次取樣，啟動後立即由排程器重新暫停
+    assert mgr.container.calls == ["start", "pause"]
+    assert mgr.pause_holders() == {"scheduler"}
+    assert scheduler.paused and scheduler.reason == "outside_window"
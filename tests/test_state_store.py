@@ -0,0 +1,51 @@
+"""JsonStateFile：原子寫入、校驗碼與快取"""
+
+import json
+import os
+
+from utils.state_store import JsonStateFile, atomic_write, file_sha256, sha256_hex
+
+
+def test_round_trip_and_update(tmp_path):
+    state = JsonStateFile(str(tmp_path / "state.json"))
+    assert state.load() == {}
+
+    state.save({"count": 1})
+    assert state.update(lambda data: data.update(count=data["count"] + 1)) == {"count": 2}
+    assert JsonStateFile(state.path).load() == {"count": 2}
+
+
+def test_load_returns_a_copy(tmp_path):
+    state = JsonStateFile(str(tmp_path / "state.json"))
+    state.save({"nested": {"value": 1}})
+    state.load()["nested"]["value"] = 99
+    assert state.load() == {"nested": {"value": 1}}
+
+
+def test_checksum_mismatch_is_rejected(tmp_path):
+    path = tmp_path / "state.json"
+    JsonStateFile(str(path)).save({"success": True})
+    document = json.loads(path.read_text())
+    document["data"]["success"] = False
+    path.write_text(json.dumps(document))
+    assert JsonStateFile(str(path)).load() == {}
+
+
+def test_truncated_and_legacy_files(tmp_path):
+    truncated = tmp_path / "truncated.json"
+    truncated.write_text('{"schema": 1, "data": {')
+    assert JsonStateFile(str(truncated)).load() == {}
+
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps({"success": True}))
+    assert JsonStateFile(str(legacy)).load() == {"success": True}
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "jwt"
+    atomic_write(str(path), "token")
+    assert path.read_text() == "token"
+    assert oct(os.stat(path).st_mode & 0o777) == oct(0o600)
+    assert os.listdir(tmp_path) == ["jwt"]
+    assert file_sha256(str(path)) == sha256_hex(b"token")
+    assert file_sha256(str(tmp_path / "missing")) is None
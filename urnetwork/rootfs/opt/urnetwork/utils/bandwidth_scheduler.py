@@ -0,0 +1,309 @@
+"""Provider 的運行時段與流量配額：超出時段或配額時暫停容器，恢復後自動繼續
+
+時段切換與配額重置都以時間輪排程在準確的時間點觸發；流量取樣的間隔
+依剩餘配額與目前速率調整，配額充足時很少查詢 Docker。
+累計流量保存在狀態檔中，容器或 Add-on 重啟後仍然延續。
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from .state_store import JsonStateFile
+from .timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+# 流量取樣間隔（秒）
+MIN_SAMPLE_INTERVAL = 30
+MAX_SAMPLE_INTERVAL = 900
+
+# DockerManager 暫停要求的來源名稱
+PAUSE_HOLDER = "scheduler"
+
+# 暫停原因的說明（回傳給使用者）
+REASON_LABELS = {
+    "outside_window": "目前不在運行時段",
+    "daily_quota": "已用完今日流量配額",
+    "monthly_quota": "已用完本月流量配額",
+}
+
+# /proc/net/dev 中不計入的介面：迴路與其他容器的虛擬介面（流量已計入實體介面）
+VIRTUAL_INTERFACES = ("lo", "docker", "veth", "br-", "hassio")
+
+
+def parse_windows(spec: str) -> List[Tuple[int, int]]:
+    """解析 "08:00-18:00,22:00-02:00" 為 [(開始分鐘, 結束分鐘)]，可跨越午夜"""
+    windows = []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r"(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})", part)
+        if not match:
+            raise ValueError(f"無效的時段: {part}")
+        hours_minutes = [int(value) for value in match.groups()]
+        # 分鐘 00-59，小時 00-24；24:00 只能作為結束時間（當日結束）
+        if any(minute > 59 for minute in hours_minutes[1::2]) or any(hour > 24 for hour in hours_minutes[::2]):
+            raise ValueError(f"無效的時段: {part}")
+        start = hours_minutes[0] * 60 + hours_minutes[1]
+        end = hours_minutes[2] * 60 + hours_minutes[3]
+        if start >= 24 * 60 or end > 24 * 60 or start == end:
+            raise ValueError(f"無效的時段: {part}")
+        windows.append((start, end))
+    return windows
+
+
+def parse_net_dev(text: str) -> Optional[Tuple[int, int]]:
+    """加總 /proc/net/dev 中實體介面的 rx/tx 位元組，沒有可用介面時回傳 None"""
+    totals = None
+    for line in (text or "").splitlines()[2:]:
+        name, _, data = line.partition(":")
+        fields = data.split()
+        if not data or len(fields) < 9 or name.strip().startswith(VIRTUAL_INTERFACES):
+            continue
+        rx, tx = totals or (0, 0)
+        totals = (rx + int(fields[0]), tx + int(fields[8]))
+    return totals
+
+
+def in_windows(windows: List[Tuple[int, int]], minute: int) -> bool:
+    """minute（當日第幾分鐘）是否落在任一時段內；沒有時段表示全天"""
+    if not windows:
+        return True
+    for start, end in windows:
+        if start < end and start <= minute < end:
+            return True
+        if start > end and (minute >= start or minute < end):
+            return True
+    return False
+
+
+def next_boundary(windows: List[Tuple[int, int]], now: datetime) -> Optional[datetime]:
+    """下一個時段開始或結束的時間"""
+    if not windows:
+        return None
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    candidates = []
+    for day in (0, 1):
+        for start, end in windows:
+            for minute in (start, end):
+                moment = midnight + timedelta(days=day, minutes=minute)
+                if moment > now:
+                    candidates.append(moment)
+    return min(candidates) if candidates else None
+
+
+def period_keys(now: datetime, reset_day: int) -> Tuple[str, str]:
+    """目前的日配額與月配額週期（月週期從每月 reset_day 日開始）"""
+    month_start = now.replace(day=min(reset_day, 28))
+    if now.day < month_start.day:
+        month_start = (month_start.replace(day=1) - timedelta(days=1)).replace(day=month_start.day)
+    return now.strftime("%Y-%m-%d"), month_start.strftime("%Y-%m-%d")
+
+
+class BandwidthScheduler:
+    """依時段與流量配額暫停或恢復 Provider"""
+
+    def __init__(self, docker_mgr, state_path: str, windows: str = "",
+                 daily_quota_gb: Optional[float] = None, monthly_quota_gb: Optional[float] = None,
+                 reset_day: int = 1, wheel: Optional[TimerWheel] = None):
+        """初始化排程器；配額為 None 表示不限制"""
+        self.docker_mgr = docker_mgr
+        self.windows = parse_windows(windows)
+        self.daily_limit = int(daily_quota_gb * GB) if daily_quota_gb else None
+        self.monthly_limit = int(monthly_quota_gb * GB) if monthly_quota_gb else None
+        self.reset_day = reset_day
+        self.usage = JsonStateFile(state_path)
+        self.wheel = wheel or TimerWheel(name="bandwidth-scheduler")
+
+        self.paused = False
+        self.reason: Optional[str] = None
+        self._rate = 0.0
+        self._lock = threading.RLock()
+        self._sample_timer = None
+        self._boundary_timer = None
+        # 計數器來源："container"（容器統計）或 "host"（/proc/net/dev），切換時重新取基準
+        self._counter_source = "container"
+        self._counters_warned = False
+        self._host_counters_noted = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.windows or self.daily_limit or self.monthly_limit)
+
+    def start(self):
+        """載入累計流量並開始排程"""
+        if not self.enabled or getattr(self.docker_mgr, "client", None) is None:
+            return
+        logger.info(
+            f"Bandwidth scheduler started (windows={self.windows or 'always'}, "
+            f"daily={self.daily_limit}, monthly={self.monthly_limit})"
+        )
+        self.docker_mgr.add_start_listener(self._on_provider_started)
+        self.wheel.start()
+        self.wheel.schedule(0, self._on_sample)
+
+    def _read_counters(self) -> Optional[Tuple[int, int]]:
+        """從容器統計取得累計 rx/tx 位元組；host 網路模式的統計沒有 networks，改讀容器內的 /proc/net/dev"""
+        stats = self.docker_mgr.get_stats() or {}
+        networks = stats.get("networks")
+        if networks:
+            self._counter_source = "container"
+            rx = sum(net.get("rx_bytes", 0) for net in networks.values())
+            tx = sum(net.get("tx_bytes", 0) for net in networks.values())
+            return rx, tx
+        if not stats:
+            # 容器未運行
+            return None
+
+        counters = parse_net_dev(self.docker_mgr.read_provider_file("/proc/net/dev"))
+        self._counter_source = "host"
+        if counters is None:
+            if not self._counters_warned:
+                self._counters_warned = True
+                logger.warning("Provider network counters are unavailable (no networks in container stats "
+                               "and /proc/net/dev is unreadable); traffic quotas cannot be enforced")
+        elif not self._host_counters_noted:
+            self._host_counters_noted = True
+            logger.warning("Container stats have no network counters (host network mode); using host "
+                           "interface counters from /proc/net/dev, which include other host traffic")
+        return counters
+
+    def record_sample(self, counters: Optional[Tuple[int, int]], now: Optional[datetime] = None) -> Dict[str, Any]:
+        """把新的累計值併入日/月用量；計數器變小代表容器重啟，從零重新計算"""
+        now = now or datetime.now()
+        day, month = period_keys(now, self.reset_day)
+
+        def mutate(data: Dict[str, Any]):
+            if data.get("day") != day:
+                data["day"], data["day_bytes"] = day, 0
+            if data.get("month") != month:
+                data["month"], data["month_bytes"] = month, 0
+            if counters is None:
+                return
+
+            rx, tx = counters
+            last_rx, last_tx = data.get("last_rx"), data.get("last_tx")
+            if last_rx is None or data.get("counter_source", "container") != self._counter_source:
+                # 第一次取樣或換了計數器來源：只記錄基準
+                delta = 0
+            elif rx < last_rx or tx < last_tx:
+                delta = rx + tx
+            else:
+                delta = (rx - last_rx) + (tx - last_tx)
+            data["counter_source"] = self._counter_source
+
+            elapsed = time.time() - data.get("sampled_at", time.time())
+            self._rate = delta / elapsed if elapsed > 0 else 0.0
+
+            data["last_rx"], data["last_tx"] = rx, tx
+            data["sampled_at"] = time.time()
+            data["day_bytes"] = data.get("day_bytes", 0) + delta
+            data["month_bytes"] = data.get("month_bytes", 0) + delta
+
+        return self.usage.update(mutate)
+
+    def _remaining(self, usage: Dict[str, Any]) -> Dict[str, Optional[int]]:
+        return {
+            "daily": None if self.daily_limit is None else max(0, self.daily_limit - usage.get("day_bytes", 0)),
+            "monthly": None if self.monthly_limit is None else max(0, self.monthly_limit - usage.get("month_bytes", 0)),
+        }
+
+    def _next_sample_delay(self, remaining: Dict[str, Optional[int]]) -> float:
+        """剩餘配額以目前速率用掉一半所需的時間，限制在取樣間隔範圍內"""
+        budgets = [value for value in remaining.values() if value is not None]
+        if not budgets or self._rate <= 0:
+            return MAX_SAMPLE_INTERVAL
+        return max(MIN_SAMPLE_INTERVAL, min(MAX_SAMPLE_INTERVAL, min(budgets) / 2 / self._rate))
+
+    def _on_sample(self):
+        """時間輪回呼：取樣流量、檢查限制並排程下一次"""
+        try:
+            counters = self._read_counters() if (self.daily_limit or self.monthly_limit) else None
+            usage = self.record_sample(counters)
+            self.evaluate(usage)
+        except Exception as e:
+            logger.error(f"Bandwidth scheduler sample failed: {e}")
+            usage = self.usage.load()
+
+        with self._lock:
+            self._sample_timer = self.wheel.schedule(self._next_sample_delay(self._remaining(usage)), self._on_sample)
+            self._schedule_boundary()
+
+    def _schedule_boundary(self):
+        """在下一個時段邊界或午夜（配額重置）重新評估"""
+        now = datetime.now()
+        moments = []
+        boundary = next_boundary(self.windows, now)
+        if boundary:
+            moments.append(boundary)
+        if self.daily_limit or self.monthly_limit:
+            moments.append(now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1))
+        if not moments:
+            return
+
+        self.wheel.cancel(self._boundary_timer)
+        delay = (min(moments) - now).total_seconds() + 1
+        self._boundary_timer = self.wheel.schedule(delay, self._on_boundary)
+
+    def _on_provider_started(self):
+        """明確的啟動或重啟會清除暫停要求；立即重新評估，不等到下一次取樣"""
+        self.evaluate(self.record_sample(None))
+
+    def _on_boundary(self):
+        with self._lock:
+            self.wheel.cancel(self._sample_timer)
+        self._on_sample()
+
+    def evaluate(self, usage: Dict[str, Any], now: Optional[datetime] = None):
+        """依時段與配額決定是否暫停或恢復"""
+        now = now or datetime.now()
+        remaining = self._remaining(usage)
+
+        reason = None
+        if not in_windows(self.windows, now.hour * 60 + now.minute):
+            reason = "outside_window"
+        elif remaining["daily"] == 0:
+            reason = "daily_quota"
+        elif remaining["monthly"] == 0:
+            reason = "monthly_quota"
+
+        with self._lock:
+            # 暫停經由 DockerManager：與生命週期操作互斥，也不會解除調速器的暫停
+            holding = PAUSE_HOLDER in self.docker_mgr.pause_holders()
+            if reason and not holding:
+                container = self.docker_mgr.get_container()
+                if container is not None and container.status in ("running", "paused"):
+                    logger.info(f"Pausing provider: {reason}")
+                    self.docker_mgr.pause_provider(PAUSE_HOLDER)
+            elif not reason and holding:
+                logger.info("Resuming provider: within schedule and quota")
+                self.docker_mgr.resume_provider(PAUSE_HOLDER)
+            self.paused = PAUSE_HOLDER in self.docker_mgr.pause_holders()
+            self.reason = reason
+
+    def get_state(self) -> Dict[str, Any]:
+        """回傳時段與剩餘配額"""
+        usage = self.usage.load()
+        remaining = self._remaining(usage)
+        now = datetime.now()
+        boundary = next_boundary(self.windows, now)
+        return {
+            "enabled": self.enabled,
+            "paused": self.paused,
+            "reason": self.reason,
+            "in_window": in_windows(self.windows, now.hour * 60 + now.minute),
+            "next_window_change": boundary.isoformat() if boundary else None,
+            "daily": {"used": usage.get("day_bytes", 0), "limit": self.daily_limit, "remaining": remaining["daily"]},
+            "monthly": {
+                "used": usage.get("month_bytes", 0), "limit": self.monthly_limit,
+                "remaining": remaining["monthly"], "period_start": usage.get("month")
+            },
+            "rate_bytes_per_sec": round(self._rate, 1)
+        }
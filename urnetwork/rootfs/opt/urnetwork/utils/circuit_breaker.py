@@ -0,0 +1,103 @@
+"""後端呼叫的斷路器：連續失敗後暫停呼叫，逾時後以單一探測請求恢復"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """斷路器開啟中，呼叫未送出"""
+
+
+class CircuitBreaker:
+    """closed → (連續失敗) → open → (reset_timeout 後) → half_open → 探測成功 → closed"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 failures: Tuple[Type[BaseException], ...] = (Exception,),
+                 ignored: Tuple[Type[BaseException], ...] = ()):
+        """failures 為計入失敗的例外類型，其餘例外（例如 404）視為後端正常；
+        ignored 的例外（例如呼叫端自己的期限用完）不影響狀態"""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = failures
+        self.ignored = ignored
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                # 只放行一個探測請求
+                self._probing = True
+                return
+            raise CircuitOpen(f"{self.name} circuit is open: {self.last_error}")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self, error: BaseException):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error) or type(error).__name__
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"{self.name} circuit opened after {self.consecutive_failures} failures: {self.last_error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """經由斷路器執行 func"""
+        self._before_call()
+        try:
+            result = func()
+        except self.ignored:
+            with self._lock:
+                self._probing = False
+            raise
+        except self.failures as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            # 不計入失敗的例外也要結束探測
+            self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """目前狀態"""
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "last_error": self.last_error,
+                "retry_in": retry_in
+            }
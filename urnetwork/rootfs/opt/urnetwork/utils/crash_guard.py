@@ -0,0 +1,204 @@
+"""Provider 容器的崩潰循環偵測與指數退避重啟控制"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 日誌中代表認證失效的訊息
+AUTH_ERROR_PATTERNS = re.compile(
+    r'(jwt|token)[^\n]*(expired|invalid|missing|not found)|unauthori[sz]ed|\b401\b|auth(entication)? (failed|required)',
+    re.IGNORECASE
+)
+
+# kill 事件後這段時間內的 die 視為手動停止
+INTENTIONAL_STOP_GRACE = 15
+
+
+class CrashLoopGuard:
+    """監聽 Docker 事件，偵測崩潰循環後暫停容器並以指數退避重新啟動"""
+
+    def __init__(self, max_restarts: int = 5, window: float = 120.0,
+                 base_backoff: float = 60.0, max_backoff: float = 3600.0,
+                 stable_after: float = 600.0):
+        """初始化崩潰循環控制器"""
+        self.max_restarts = max_restarts
+        self.window = window
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+
+        self.docker_mgr = None
+        self.state = "idle"
+        self.backoff_level = 0
+        self.resume_at: Optional[float] = None
+        self.last_exit_code: Optional[int] = None
+        self.last_error: Optional[str] = None
+        self.last_loop_at: Optional[float] = None
+        self.crash_loops = 0
+
+        self._deaths = deque()
+        self._last_kill = 0.0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, docker_mgr):
+        """開始監聽 Docker 事件"""
+        if self._thread is not None or getattr(docker_mgr, 'client', None) is None:
+            return
+        self.docker_mgr = docker_mgr
+        self.state = "monitoring"
+        self._thread = threading.Thread(target=self._watch_events, name="crash-guard", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止監聽"""
+        self._stop.set()
+        if self._timer:
+            self._timer.cancel()
+
+    def _watch_events(self):
+        """讀取容器事件串流，中斷時自動重新連線"""
+        filters = {"type": "container", "container": self.docker_mgr.container_name}
+        while not self._stop.is_set():
+            try:
+                for event in self.docker_mgr.client.events(decode=True, filters=filters):
+                    if self._stop.is_set():
+                        return
+                    self.handle_event(event)
+            except Exception as e:
+                logger.warning(f"Docker event stream interrupted: {e}")
+            self._stop.wait(5)
+
+    def handle_event(self, event: Dict[str, Any]):
+        """處理單一 Docker 事件"""
+        action = event.get("Action") or event.get("status", "")
+        now = time.time()
+
+        if action == "kill":
+            self._last_kill = now
+            return
+        if action != "die":
+            return
+        if now - self._last_kill < INTENTIONAL_STOP_GRACE:
+            logger.debug("Ignoring die event caused by an intentional stop")
+            return
+
+        attributes = event.get("Actor", {}).get("Attributes", {})
+        try:
+            self.last_exit_code = int(attributes.get("exitCode", -1))
+        except (TypeError, ValueError):
+            self.last_exit_code = -1
+
+        with self._lock:
+            if self.state in ("backoff", "needs_reauth"):
+                return
+
+            self._deaths.append(now)
+            while self._deaths and now - self._deaths[0] > self.window:
+                self._deaths.popleft()
+
+            if len(self._deaths) < self.max_restarts:
+                return
+
+            self._deaths.clear()
+            if self.last_loop_at and now - self.last_loop_at > self.stable_after:
+                self.backoff_level = 0
+            self.last_loop_at = now
+            self.crash_loops += 1
+
+        self._on_crash_loop()
+
+    def _on_crash_loop(self):
+        """暫停容器，判斷是否需要重新認證，否則排程退避重啟"""
+        needs_reauth = self._logs_indicate_auth_failure()
+        logger.warning(
+            f"Provider crash loop detected ({self.max_restarts} exits in {self.window:.0f}s, "
+            f"last exit code {self.last_exit_code}){' - re-authentication required' if needs_reauth else ''}"
+        )
+
+        self._pause_container()
+
+        with self._lock:
+            if needs_reauth:
+                self.state = "needs_reauth"
+                self.resume_at = None
+                return
+
+            delay = min(self.max_backoff, self.base_backoff * (2 ** self.backoff_level))
+            self.backoff_level += 1
+            self.state = "backoff"
+            self.resume_at = time.time() + delay
+
+            self._timer = threading.Timer(delay, self._resume)
+            self._timer.daemon = True
+            self._timer.start()
+
+        logger.info(f"Provider paused for {delay:.0f}s before next restart attempt")
+
+    def _logs_indicate_auth_failure(self) -> bool:
+        """從最近的容器日誌中尋找認證失效訊息"""
+        try:
+            logs = self.docker_mgr.get_logs(lines=50)
+            match = AUTH_ERROR_PATTERNS.search(logs)
+            if match:
+                line_start = logs.rfind("\n", 0, match.start()) + 1
+                line_end = logs.find("\n", match.end())
+                self.last_error = logs[line_start:line_end if line_end != -1 else None].strip()
+                return True
+        except Exception as e:
+            logger.debug(f"Unable to inspect provider logs: {e}")
+        return False
+
+    def _pause_container(self):
+        """經由生命週期協調器停止容器，阻止 Docker 的 restart policy 繼續重啟"""
+        self._last_kill = time.time()
+        result = self.docker_mgr.stop_provider()
+        if not result.get("success"):
+            logger.error(f"Failed to pause crash-looping provider: {result.get('error')}")
+
+    def _resume(self):
+        """退避時間結束後重新啟動容器"""
+        with self._lock:
+            if self.state != "backoff":
+                return
+            self.state = "monitoring"
+            self.resume_at = None
+
+        logger.info("Backoff elapsed, restarting provider")
+        result = self.docker_mgr.start_provider()
+        if not result.get("success"):
+            logger.error(f"Failed to restart provider after backoff: {result.get('error')}")
+
+    def reset(self):
+        """手動啟動或重新認證後清除暫停狀態"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._deaths.clear()
+            self.backoff_level = 0
+            self.resume_at = None
+            self.last_error = None
+            if self.state in ("backoff", "needs_reauth"):
+                self.state = "monitoring"
+
+    def get_state(self) -> Dict[str, Any]:
+        """回傳監控狀態"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "needs_reauth": self.state == "needs_reauth",
+                "recent_exits": len(self._deaths),
+                "crash_loops": self.crash_loops,
+                "backoff_level": self.backoff_level,
+                "resume_in": max(0, round(self.resume_at - time.time())) if self.resume_at else None,
+                "last_exit_code": self.last_exit_code,
+                "last_error": self.last_error
+            }
@@ -0,0 +1,76 @@
+"""Provider（Go 程式）的執行環境變數：GOMAXPROCS、GOGC、GOMEMLIMIT 與時區"""
+
+import math
+import os
+from typing import Dict, Any, Optional
+
+from .addon_options import get_option
+from .resource_profile import ResourceProfile
+
+# GOMEMLIMIT 設在記憶體上限的比例，保留空間給 Go 執行環境以外的記憶體
+MEMLIMIT_RATIO = 0.9
+
+RUNTIME_KEYS = ("GOMAXPROCS", "GOGC", "GOMEMLIMIT")
+
+
+def cpuset_size(cpuset: str) -> int:
+    """計算 "0-2,4" 這類 cpuset 的 CPU 數量"""
+    count = 0
+    for part in cpuset.split(","):
+        if "-" in part:
+            start, end = part.split("-", 1)
+            count += int(end) - int(start) + 1
+        elif part:
+            count += 1
+    return count
+
+
+def default_timezone() -> str:
+    """Supervisor 會把 Home Assistant 的時區放在 TZ 環境變數"""
+    return os.getenv("TZ") or "UTC"
+
+
+def go_runtime_env(profile: ResourceProfile, host_cpus: Optional[int] = None) -> Dict[str, str]:
+    """依資源設定推算 Go 執行環境變數，選項中的 go_* 值優先"""
+    host_cpus = host_cpus or os.cpu_count() or 1
+    env: Dict[str, str] = {}
+
+    procs = host_cpus
+    if profile.cpuset_cpus:
+        procs = min(procs, cpuset_size(profile.cpuset_cpus))
+    if profile.cpus:
+        procs = min(procs, math.ceil(profile.cpus))
+    env["GOMAXPROCS"] = str(max(1, procs))
+
+    if profile.mem_limit:
+        env["GOMEMLIMIT"] = f"{int(profile.mem_limit * MEMLIMIT_RATIO) // (1024 * 1024)}MiB"
+
+    overrides = {
+        "GOMAXPROCS": get_option("go_maxprocs"),
+        "GOGC": get_option("go_gc"),
+        "GOMEMLIMIT": get_option("go_memlimit"),
+    }
+    for key, value in overrides.items():
+        if value not in (None, ""):
+            env[key] = str(value)
+    return env
+
+
+def provider_environment(profile: ResourceProfile) -> Dict[str, str]:
+    """Provider 容器的完整環境變數"""
+    env = {"TZ": default_timezone()}
+    env.update(go_runtime_env(profile))
+    return env
+
+
+def environment_drift(wanted: Dict[str, str], container_env: Any) -> Dict[str, Any]:
+    """與容器建立時的 Env 比較，回傳不同的執行環境變數（需重建容器才會生效）"""
+    current = {}
+    for item in container_env or []:
+        key, _, value = item.partition("=")
+        current[key] = value
+    return {
+        key: {"current": current.get(key), "wanted": wanted.get(key)}
+        for key in RUNTIME_KEYS + ("TZ",)
+        if current.get(key) != wanted.get(key)
+    }
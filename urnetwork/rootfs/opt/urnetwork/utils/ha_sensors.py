@@ -0,0 +1,194 @@
+"""把 Provider 指標推送到 Home Assistant 成為 sensor 實體
+
+透過 Supervisor 代理的 Core API（POST /api/states/<entity_id>）寫入狀態。
+每個週期收集一次指標，只推送有變化的實體；同一週期的變更在同一個
+HTTP 連線上依序送出，Home Assistant 不需要額外輪詢。
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "http://supervisor/core/api"
+ENTITY_PREFIX = "sensor.urnetwork_"
+
+# 即使沒有變化也定期重送，Home Assistant 重啟後狀態才會恢復
+REFRESH_INTERVAL = 600
+
+# key: (名稱, 單位, 圖示, device_class, state_class)
+SENSORS = {
+    "state": ("URnetwork Provider 狀態", None, "mdi:server-network", None, None),
+    "cpu": ("URnetwork Provider CPU", "%", "mdi:cpu-64-bit", None, "measurement"),
+    "memory": ("URnetwork Provider 記憶體", "MB", "mdi:memory", None, "measurement"),
+    "rx_rate": ("URnetwork Provider 下載速率", "kB/s", "mdi:download-network", "data_rate", "measurement"),
+    "tx_rate": ("URnetwork Provider 上傳速率", "kB/s", "mdi:upload-network", "data_rate", "measurement"),
+    "earnings": ("URnetwork Provider 總獎勵", "USDC", "mdi:cash", None, "total_increasing"),
+    "error_rate": ("URnetwork Provider 錯誤率", "%", "mdi:alert-circle-outline", None, "measurement"),
+}
+
+Sample = Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """把 "1.23"、"12.5%" 之類的字串轉成數字"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().rstrip('%').split()[0])
+        except (ValueError, IndexError):
+            return None
+    return None
+
+
+def _cpu_percent(raw: Dict[str, Any]) -> Optional[float]:
+    """由 docker stats 原始資料計算 CPU 百分比"""
+    try:
+        cpu, precpu = raw['cpu_stats'], raw['precpu_stats']
+        cpu_delta = cpu['cpu_usage']['total_usage'] - precpu['cpu_usage']['total_usage']
+        system_delta = cpu['system_cpu_usage'] - precpu['system_cpu_usage']
+        cpus = cpu.get('online_cpus') or len(cpu['cpu_usage'].get('percpu_usage') or [1])
+    except (KeyError, TypeError):
+        return None
+    if system_delta <= 0:
+        return None
+    return round(cpu_delta / system_delta * cpus * 100, 1)
+
+
+class SensorPublisher:
+    """定期收集指標、偵測變化並批次推送到 Home Assistant"""
+
+    def __init__(self, collect: Callable[[], Sample], api_url: str = DEFAULT_API_URL,
+                 token: Optional[str] = None, interval: float = 30.0, timeout: float = 10.0):
+        """collect 回傳 (容器狀態, docker stats 原始資料, 統計資料)"""
+        self.collect = collect
+        self.api_url = api_url.rstrip('/')
+        self.token = token
+        self.interval = max(5.0, interval)
+        self.timeout = timeout
+        self._pushed: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._last_refresh = 0.0
+        self._last_net: Optional[Tuple[float, int, int]] = None
+        self._session = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, wait: Optional[Callable[[], Any]] = None):
+        """啟動背景推送執行緒；wait 用來等待管理器就緒"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(wait,), name="ha-sensors", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, wait):
+        if wait is not None:
+            wait()
+        logger.info(f"Publishing sensors to {self.api_url} every {self.interval:.0f}s")
+        while not self._stop.is_set():
+            try:
+                self.publish_once()
+            except Exception as e:
+                logger.warning(f"Sensor publish failed: {e}")
+            self._stop.wait(self.interval)
+
+    def build_states(self, sample: Sample, now: Optional[float] = None) -> Dict[str, Tuple[Any, Dict[str, Any]]]:
+        """把一次取樣轉換成 {entity_id: (state, attributes)}"""
+        now = time.monotonic() if now is None else now
+        status, raw, stats = sample
+        values: Dict[str, Any] = {"state": status.get("status", "unknown")}
+
+        values["cpu"] = _cpu_percent(raw) if raw else None
+        usage = (raw.get('memory_stats') or raw.get('memory') or {}).get('usage') if raw else None
+        values["memory"] = round(usage / 1024 / 1024, 1) if usage else None
+
+        # 網路速率：與上一次取樣的累計位元組相減
+        values["rx_rate"] = values["tx_rate"] = None
+        networks = raw.get('networks') if raw else None
+        if networks:
+            rx = sum(net.get('rx_bytes', 0) for net in networks.values())
+            tx = sum(net.get('tx_bytes', 0) for net in networks.values())
+            if self._last_net is not None:
+                elapsed = now - self._last_net[0]
+                if elapsed > 0 and rx >= self._last_net[1] and tx >= self._last_net[2]:
+                    values["rx_rate"] = round((rx - self._last_net[1]) / elapsed / 1024, 1)
+                    values["tx_rate"] = round((tx - self._last_net[2]) / elapsed / 1024, 1)
+            self._last_net = (now, rx, tx)
+
+        values["earnings"] = _to_float(stats.get("total_earnings"))
+
+        successes = _to_float(stats.get("successful_connections")) or 0
+        errors = _to_float(stats.get("connection_errors")) or 0
+        total = successes + errors
+        values["error_rate"] = round(errors / total * 100, 1) if total else None
+
+        states = {}
+        for key, (name, unit, icon, device_class, state_class) in SENSORS.items():
+            attributes = {"friendly_name": name, "icon": icon}
+            if unit:
+                attributes["unit_of_measurement"] = unit
+            if device_class:
+                attributes["device_class"] = device_class
+            if state_class:
+                attributes["state_class"] = state_class
+            value = values.get(key)
+            states[ENTITY_PREFIX + key] = ("unknown" if value is None else value, attributes)
+        return states
+
+    def changed_states(self, states: Dict[str, Tuple[Any, Dict[str, Any]]], force: bool = False):
+        """與上次成功推送的內容比較，只留下有變化的實體"""
+        return {
+            entity_id: state for entity_id, state in states.items()
+            if force or self._pushed.get(entity_id) != state
+        }
+
+    def publish_once(self) -> int:
+        """收集一次並推送有變化的實體，回傳推送成功的數量"""
+        now = time.monotonic()
+        force = now - self._last_refresh >= REFRESH_INTERVAL
+        changes = self.changed_states(self.build_states(self.collect(), now), force=force)
+        if not changes:
+            return 0
+
+        session = self._get_session()
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        pushed = 0
+        for entity_id, (state, attributes) in changes.items():
+            try:
+                response = session.post(
+                    f"{self.api_url}/states/{entity_id}",
+                    json={"state": state, "attributes": attributes},
+                    headers=headers,
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                logger.warning(f"Failed to push {entity_id}: {e}")
+                break
+
+            if response.status_code in (200, 201):
+                self._pushed[entity_id] = (state, attributes)
+                pushed += 1
+            else:
+                logger.warning(f"Home Assistant rejected {entity_id}: {response.status_code} {response.text[:200]}")
+                if response.status_code in (401, 403):
+                    break
+
+        if force and pushed == len(changes):
+            self._last_refresh = now
+        logger.debug(f"Pushed {pushed}/{len(changes)} sensor updates")
+        return pushed
+
+    def _get_session(self):
+        """重複使用同一個 HTTP 連線"""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
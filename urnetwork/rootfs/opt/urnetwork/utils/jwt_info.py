@@ -0,0 +1,42 @@
+"""在本機解析 JWT 的 claims（不驗證簽章，只用來判斷有效期限）"""
+
+import base64
+import json
+import time
+from typing import Dict, Any, Optional
+
+# 到期前多久視為「即將到期」（秒）
+EXPIRING_SOON_SECONDS = 3 * 24 * 3600
+
+
+def decode_claims(token: str) -> Optional[Dict[str, Any]]:
+    """解析 JWT payload，格式不符時回傳 None"""
+    parts = token.strip().split(".")
+    if len(parts) != 3 or not parts[1]:
+        return None
+
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload.encode("ascii")))
+    except (ValueError, UnicodeError):
+        return None
+
+    return claims if isinstance(claims, dict) else None
+
+
+def describe_claims(claims: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+    """整理到期資訊：exp/iat、剩餘秒數、是否已過期或即將到期"""
+    now = time.time() if now is None else now
+    exp = claims.get("exp")
+    iat = claims.get("iat")
+    exp = exp if isinstance(exp, (int, float)) else None
+    iat = iat if isinstance(iat, (int, float)) else None
+
+    expires_in = None if exp is None else int(exp - now)
+    return {
+        "exp": exp,
+        "iat": iat,
+        "expires_in": expires_in,
+        "expired": expires_in is not None and expires_in <= 0,
+        "expiring_soon": expires_in is not None and 0 < expires_in <= EXPIRING_SOON_SECONDS
+    }
@@ -0,0 +1,142 @@
+"""單一寫入者的日誌管線（QueueHandler + 背景 QueueListener）"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Home Assistant 的 log_level 選項對應到 Python 日誌等級
+LEVELS = {
+    'trace': logging.DEBUG,
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'notice': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'fatal': logging.CRITICAL
+}
+
+# 預設抽樣規則：(logger 名稱, 函式名稱) -> 每 N 筆保留 1 筆
+DEFAULT_SAMPLING = {
+    ('utils.auth_manager', 'is_authenticated'): 20
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """輸出 JSON lines 格式"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """對特定來源的低等級訊息進行抽樣，WARNING 以上一律保留"""
+
+    def __init__(self, rules: Dict[Tuple[str, str], int]):
+        super().__init__()
+        self.rules = rules
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, record.funcName)
+        rate = self.rules.get(key)
+        if not rate or rate <= 1:
+            return True
+
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+        return count % rate == 0
+
+
+class RateLimitFilter(logging.Filter):
+    """每個 logger 使用 token bucket 限流，並回報被略過的筆數"""
+
+    def __init__(self, rate: float = 20.0, burst: int = 100):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or self.rate <= 0:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            # [剩餘 token, 上次補充時間, 被略過筆數]
+            bucket = self._buckets.setdefault(record.name, [float(self.burst), now, 0])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed:
+            record.msg = f"{record.msg} (suppressed {suppressed} messages)"
+        return True
+
+
+def setup_logging(level: str = 'info', json_format: bool = False,
+                  rate: float = 20.0, burst: int = 100,
+                  sampling: Optional[Dict[Tuple[str, str], int]] = None) -> logging.Logger:
+    """設定根 logger：請求執行緒只寫入佇列，由背景執行緒統一輸出到 stdout"""
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel(LEVELS.get(level.lower(), logging.INFO))
+
+    if _listener is not None:
+        return root
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(DEFAULT_SAMPLING if sampling is None else sampling))
+    queue_handler.addFilter(RateLimitFilter(rate, burst))
+
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    return root
+
+
+def shutdown_logging():
+    """停止背景寫入執行緒並送出剩餘的日誌"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
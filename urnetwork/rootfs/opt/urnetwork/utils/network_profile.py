@@ -0,0 +1,93 @@
+"""Provider 容器的網路模式：預設 bridge、調整 MTU 的專用 bridge，或 host 網路"""
+
+import logging
+from typing import Dict, Any, Optional
+
+from .addon_options import get_option
+
+logger = logging.getLogger(__name__)
+
+NETWORK_MODES = ("bridge", "tuned_bridge", "host")
+TUNED_NETWORK_NAME = "urnetwork-fast"
+DEFAULT_MTU = 1500
+
+# 容器網路命名空間內的 sysctl；host 網路共用主機命名空間，Docker 不允許設定
+TUNED_SYSCTLS = {
+    "net.core.somaxconn": "4096",
+    "net.ipv4.tcp_rmem": "4096 131072 16777216",
+    "net.ipv4.tcp_wmem": "4096 65536 16777216",
+    "net.ipv4.ip_local_port_range": "1024 65535",
+    "net.ipv4.tcp_tw_reuse": "1",
+}
+
+
+class NetworkProfile:
+    """高吞吐量網路設定（選用，預設維持一般 bridge）"""
+
+    def __init__(self, mode: str = "bridge", mtu: int = DEFAULT_MTU):
+        """初始化網路設定"""
+        if mode not in NETWORK_MODES:
+            raise ValueError(f"無效的網路模式: {mode}")
+        self.mode = mode
+        self.mtu = int(mtu)
+
+    @classmethod
+    def from_options(cls) -> "NetworkProfile":
+        """由 Add-on 選項建立，選項不合法時退回預設"""
+        try:
+            return cls(get_option("network_mode", "bridge"), get_option("network_mtu", DEFAULT_MTU))
+        except (ValueError, TypeError) as e:
+            logger.error(f"Invalid network options, using bridge: {e}")
+            return cls()
+
+    @property
+    def sysctls(self) -> Dict[str, str]:
+        return dict(TUNED_SYSCTLS) if self.mode == "tuned_bridge" else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "mtu": self.mtu if self.mode == "tuned_bridge" else None, "sysctls": self.sysctls}
+
+    def ensure_network(self, client) -> Optional[str]:
+        """tuned_bridge 模式時建立（或沿用）專用 bridge，回傳網路名稱"""
+        if self.mode != "tuned_bridge":
+            return None
+
+        existing = client.networks.list(names=[TUNED_NETWORK_NAME])
+        for network in existing:
+            options = network.attrs.get("Options") or {}
+            if options.get("com.docker.network.driver.mtu") == str(self.mtu):
+                return TUNED_NETWORK_NAME
+            # MTU 不同時重建網路（沒有容器連接時才能移除）
+            logger.info(f"Recreating network {TUNED_NETWORK_NAME} with MTU {self.mtu}")
+            network.remove()
+
+        client.networks.create(
+            TUNED_NETWORK_NAME,
+            driver="bridge",
+            options={"com.docker.network.driver.mtu": str(self.mtu)}
+        )
+        return TUNED_NETWORK_NAME
+
+    def host_config(self) -> Dict[str, Any]:
+        """Engine API 的 HostConfig 欄位（網路需事先建立）"""
+        if self.mode == "host":
+            return {"NetworkMode": "host"}
+        if self.mode == "tuned_bridge":
+            return {"NetworkMode": TUNED_NETWORK_NAME, "Sysctls": self.sysctls}
+        return {}
+
+    def network_create_request(self) -> Optional[Dict[str, Any]]:
+        """Engine API 建立專用 bridge 的請求內容"""
+        if self.mode != "tuned_bridge":
+            return None
+        return {
+            "Name": TUNED_NETWORK_NAME,
+            "Driver": "bridge",
+            "CheckDuplicate": True,
+            "Options": {"com.docker.network.driver.mtu": str(self.mtu)}
+        }
+
+    def matches(self, host_config: Dict[str, Any]) -> bool:
+        """既有容器的網路模式是否與設定相同（不同時需重建容器才會生效）"""
+        wanted = {"bridge": ("default", "bridge"), "tuned_bridge": (TUNED_NETWORK_NAME,), "host": ("host",)}
+        return host_config.get("NetworkMode", "default") in wanted[self.mode]
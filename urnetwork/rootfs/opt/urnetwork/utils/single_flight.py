@@ -0,0 +1,83 @@
+"""Single-flight：同時間相同的查詢共用一次執行結果"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .deadline import DeadlineExceeded, timeout_for
+
+
+class _Call:
+    """進行中的呼叫"""
+
+    def __init__(self, generation: int):
+        self.done = threading.Event()
+        self.generation = generation
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """合併同一 key 的並行呼叫，並在 max_age 秒內重用上一次的結果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        # forget() 時遞增；較舊世代的呼叫完成後不寫入快取
+        self._generation = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any], max_age: float = 0.0) -> Any:
+        """執行 func，或等待並共用同一 key 正在進行的呼叫"""
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and time.monotonic() - cached[0] < max_age:
+                return cached[1]
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(self._generation)
+
+        if not leader:
+            # 跟隨者同樣受請求期限約束，卡住的 leader 不會無限期占住等待的執行緒
+            if not call.done.wait(timeout_for(None)):
+                raise DeadlineExceeded("Request deadline exceeded while waiting for a shared call")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            with self._lock:
+                if call.generation == self._generation:
+                    self._results[key] = (time.monotonic(), call.result)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def age(self, key: Hashable):
+        """上一次結果距今的秒數，沒有結果時回傳 None"""
+        with self._lock:
+            cached = self._results.get(key)
+        return None if cached is None else time.monotonic() - cached[0]
+
+    def forget(self, key: Hashable = None):
+        """清除快取結果（狀態變更後呼叫）
+
+        進行中的呼叫也一併作廢：之後的呼叫會重新執行，舊呼叫的結果不寫入快取。
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._results.clear()
+                self._calls.clear()
+            else:
+                self._results.pop(key, None)
+                self._calls.pop(key, None)
@@ -0,0 +1,159 @@
+"""背景初始化管理器，讓 HTTP 伺服器可以先行啟動"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from .resource_profile import ResourceProfile
+
+logger = logging.getLogger(__name__)
+
+# (屬性名稱, 模組, 類別, 建構參數對應的已建立管理器)；Docker 客戶端會在這裡才建立
+MANAGER_SPECS = [
+    ("docker_mgr", "utils.docker_manager", "DockerManager", {}),
+    ("auth_mgr", "utils.auth_manager", "AuthManager", {}),
+    ("stats_collector", "utils.stats_collector", "StatsCollector", {"docker_mgr": "docker_mgr"}),
+]
+
+
+class DummyManager:
+    """管理器載入失敗時的替代品，避免頁面錯誤"""
+
+    resource_profile = ResourceProfile()
+
+    def is_authenticated(self):
+        return False
+    def get_token_status(self):
+        return None
+    def get_status(self):
+        return {"status": "停止", "message": "模擬狀態"}
+    def get_latest_stats(self):
+        return {"total_earnings": "0.00", "uptime": "未知", "traffic_served": "0 MB"}
+    def authenticate(self, code, progress=None):
+        return {"success": True, "message": "模擬認證成功"}
+    def force_docker_auth(self, code, progress=None):
+        return {"success": True, "message": "模擬認證成功"}
+    def start_provider(self):
+        return {"success": True, "message": "模擬啟動"}
+    def stop_provider(self):
+        return {"success": True, "message": "模擬停止"}
+    def restart_provider(self):
+        return {"success": True, "message": "模擬重啟"}
+    def update_provider(self):
+        return {"success": True, "message": "模擬更新"}
+    def get_logs(self, lines=100):
+        return "URnetwork 模擬日誌輸出\n程式正在運行中...\n等待實際 Docker 容器啟動"
+    def get_last_update(self):
+        return "2024-01-01 12:00:00"
+    def cache_age(self, key=None):
+        return None
+    def stale_since(self, key):
+        return None
+    def circuit_state(self):
+        return None
+    def lifecycle_state(self):
+        return {"state": "unknown", "active": None, "last_operation": None}
+    def get_stats(self):
+        return {}
+    def apply_resources(self, profile=None):
+        return {"success": False, "error": "管理器未載入"}
+    def get_resources(self):
+        return {"profile": {}, "current": {}, "pending": {}, "requires_recreate": False, "network": None, "logging": None}
+
+
+class ManagerLoader:
+    """在背景執行緒建立各管理器並追蹤就緒狀態"""
+
+    def __init__(self):
+        """初始化載入器"""
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.docker_mgr = None
+        self.auth_mgr = None
+        self.stats_collector = None
+        self._ready = threading.Event()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        """是否已完成初始化"""
+        return self._ready.is_set()
+
+    def start(self):
+        """啟動背景初始化"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.load, name="manager-loader", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待初始化完成"""
+        return self._ready.wait(timeout)
+
+    def on_ready(self, callback):
+        """註冊初始化完成後要執行的回呼（已就緒則立即執行）"""
+        with self._callbacks_lock:
+            if not self.ready:
+                self._callbacks.append(callback)
+                return
+        self._run_callback(callback)
+
+    def _run_callback(self, callback):
+        try:
+            callback(self)
+        except Exception as e:
+            logger.error(f"Ready callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def load(self):
+        """依序匯入並建立管理器（可同步呼叫）"""
+        if self.ready:
+            return
+
+        self.state = "loading"
+        try:
+            for attr, module_name, class_name, dependencies in MANAGER_SPECS:
+                started = time.monotonic()
+                module = importlib.import_module(module_name)
+                imported = time.monotonic()
+                kwargs = {name: getattr(self, source) for name, source in dependencies.items()}
+                setattr(self, attr, getattr(module, class_name)(**kwargs))
+                finished = time.monotonic()
+
+                self.timings[f"{module_name}.import"] = round(imported - started, 3)
+                self.timings[f"{class_name}.init"] = round(finished - imported, 3)
+
+            self.state = "ready"
+            logger.info(f"All managers loaded in {time.monotonic() - self._started_at:.2f}s")
+        except ImportError as e:
+            logger.error(f"Failed to load managers: {e}")
+            self.error = str(e)
+            self.state = "degraded"
+            self.docker_mgr = self.auth_mgr = self.stats_collector = DummyManager()
+        except Exception as e:
+            logger.error(f"Manager initialization failed: {e}")
+            self.error = str(e)
+            self.state = "degraded"
+            for attr, _, _, _ in MANAGER_SPECS:
+                if getattr(self, attr) is None:
+                    setattr(self, attr, DummyManager())
+        finally:
+            with self._callbacks_lock:
+                self._ready.set()
+                callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            self._run_callback(callback)
+
+    def status(self) -> Dict[str, Any]:
+        """回傳初始化狀態"""
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "error": self.error,
+            "timings": dict(self.timings)
+        }
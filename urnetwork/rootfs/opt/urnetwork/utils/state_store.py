@@ -0,0 +1,142 @@
+"""設定目錄的耐久狀態層：原子寫入、校驗碼、版本化格式與記憶體快取"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+
+def sha256_hex(data: bytes) -> str:
+    """計算 SHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """計算檔案的 SHA-256，讀取失敗時回傳 None"""
+    try:
+        with open(path, 'rb') as f:
+            return sha256_hex(f.read())
+    except OSError:
+        return None
+
+
+def fsync_dir(directory: str):
+    """同步目錄項目，確保 rename 在斷電後仍然存在"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, data: Union[bytes, str], mode: int = 0o600):
+    """寫入暫存檔、fsync 後以 rename 取代，讀者只會看到舊檔或完整的新檔"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    fsync_dir(directory)
+
+
+def _canonical(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class JsonStateFile:
+    """帶校驗碼與版本的 JSON 狀態檔；讀取時以 mtime/大小判斷是否需要重新解析"""
+
+    def __init__(self, path: str, schema_version: int = SCHEMA_VERSION):
+        """初始化狀態檔"""
+        self.path = path
+        self.schema_version = schema_version
+        self._cache_key: Optional[Tuple[int, int]] = None
+        self._cache: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def load(self) -> Dict[str, Any]:
+        """讀取資料（回傳副本），檔案不存在、截斷或校驗失敗時回傳空字典"""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                self._cache_key, self._cache = None, {}
+                return {}
+
+            key = (st.st_mtime_ns, st.st_size)
+            if key != self._cache_key:
+                self._cache = self._read()
+                self._cache_key = key
+            return copy.deepcopy(self._cache)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'rb') as f:
+                document = json.loads(f.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"State file {os.path.basename(self.path)} is unreadable: {e}")
+            return {}
+
+        if not isinstance(document, dict):
+            return {}
+
+        # 舊版沒有外層結構，直接視為資料
+        if "schema" not in document or "data" not in document:
+            return document
+
+        data = document.get("data")
+        if not isinstance(data, dict) or sha256_hex(_canonical(data)) != document.get("checksum"):
+            logger.warning(f"State file {os.path.basename(self.path)} failed checksum validation")
+            return {}
+
+        if document["schema"] > self.schema_version:
+            logger.warning(f"State file {os.path.basename(self.path)} has newer schema {document['schema']}")
+        return data
+
+    def save(self, data: Dict[str, Any]):
+        """以原子寫入儲存資料"""
+        document = {
+            "schema": self.schema_version,
+            "checksum": sha256_hex(_canonical(data)),
+            "data": data
+        }
+        with self._lock:
+            atomic_write(self.path, json.dumps(document, indent=2, ensure_ascii=False))
+            st = os.stat(self.path)
+            self._cache_key = (st.st_mtime_ns, st.st_size)
+            self._cache = copy.deepcopy(data)
+
+    def update(self, mutate) -> Dict[str, Any]:
+        """讀取、修改並寫回（在同一把鎖內）"""
+        with self._lock:
+            data = self.load()
+            mutate(data)
+            self.save(data)
+            return data
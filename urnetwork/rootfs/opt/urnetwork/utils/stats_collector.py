@@ -6,24 +6,42 @@ import re
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from .single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 class StatsCollector:
     """收集和解析 URnetwork 統計資料"""
     
-    def __init__(self):
+    def __init__(self, docker_mgr=None):
         """初始化統計收集器"""
         self.last_update = None
         self.cached_stats = {}
+        self.docker_mgr = docker_mgr
+        self._flight = SingleFlight()
+    
+    def _get_docker_mgr(self):
+        """取得共用的 DockerManager（未注入時只建立一次）"""
+        if self.docker_mgr is None:
+            from .docker_manager import DockerManager
+            self.docker_mgr = DockerManager()
+        return self.docker_mgr
+    
+    def cache_age(self) -> Optional[float]:
+        """統計資料快取的年齡（秒）"""
+        return self._flight.age("stats")
     
     def get_latest_stats(self) -> Dict[str, Any]:
-        """獲取最新統計資料"""
+        """獲取最新統計資料（並行請求共用同一次收集）"""
+        return self._flight.do("stats", self._collect_stats, getattr(self._get_docker_mgr(), "cache_ttl", 0))
+    
+    def _collect_stats(self) -> Dict[str, Any]:
+        """從 Docker 容器日誌與統計資訊收集資料"""
         try:
             # 這裡可以從 Docker 容器日誌中解析統計資料
             # 目前返回基本資料
             
-            from .docker_manager import DockerManager
-            docker_mgr = DockerManager()
+            docker_mgr = self._get_docker_mgr()
             
             # 獲取容器日誌
             logs = docker_mgr.get_logs(lines=50)
@@ -35,6 +53,10 @@ class StatsCollector:
             container_stats = docker_mgr.get_stats()
             if container_stats:
                 stats.update(self._parse_container_stats(container_stats))
+
+            # Docker 無回應時底層資料是上一次的結果
+            stale_since = getattr(docker_mgr, "stale_since", None)
+            stats["stale"] = bool(stale_since and (stale_since("stats") or stale_since(("logs", 50))))
             
             self.cached_stats = stats
             self.last_update = datetime.now().isoformat()
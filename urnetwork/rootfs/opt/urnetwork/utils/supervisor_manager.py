@@ -4,9 +4,15 @@ import os
 import json
 import logging
 import requests
-import subprocess
 from typing import Dict, Any, Optional
 
+from .circuit_breaker import CircuitBreaker, CircuitOpen
+from .deadline import timeout_for
+from .go_runtime import provider_environment
+from .log_profile import LogProfile
+from .network_profile import NetworkProfile
+from .resource_profile import ResourceProfile
+
 logger = logging.getLogger(__name__)
 
 class SupervisorManager:
@@ -20,6 +26,18 @@ class SupervisorManager:
         self.image_name = "bringyour/community-provider:g4-latest"
         self.config_path = "/addon_config/.urnetwork"
 
+        try:
+            self.resource_profile = ResourceProfile.from_options()
+        except ValueError as e:
+            logger.error(f"Invalid resource profile, ignoring: {e}")
+            self.resource_profile = ResourceProfile()
+        self.network_profile = NetworkProfile.from_options()
+        self.log_profile = LogProfile.from_options()
+
+        # Supervisor 連不上或逾時時暫停呼叫；期間 get_status 回傳上一次的狀態
+        self.breaker = CircuitBreaker("supervisor", failures=(requests.ConnectionError, requests.Timeout))
+        self._last_status: Optional[Dict[str, Any]] = None
+
         if not self.hassio_token:
             logger.warning("SUPERVISOR_TOKEN not found, container management may not work")
             self.hassio_token = None
@@ -41,13 +59,13 @@ class SupervisorManager:
             url = f"{self.supervisor_url}/{endpoint}"
             logger.info(f"Making {method} request to: {url}")
 
-            response = requests.request(
+            response = self.breaker.call(lambda: requests.request(
                 method,
                 url,
                 headers=self.headers,
                 json=data,
-                timeout=30
-            )
+                timeout=timeout_for(30)
+            ))
 
             logger.info(f"Response status: {response.status_code}")
 
@@ -57,6 +75,9 @@ class SupervisorManager:
                 logger.error(f"API request failed: {response.status_code} - {response.text}")
                 return None
 
+        except CircuitOpen as e:
+            logger.warning(f"Skipping {method} {endpoint}: {e}")
+            return None
         except Exception as e:
             logger.error(f"API request error: {e}")
             return None
@@ -113,20 +134,28 @@ class SupervisorManager:
         """創建新的 Provider 容器"""
         try:
             # 確保配置目錄存在
-            subprocess.run(f"mkdir -p {self.config_path}", shell=True, check=True)
+            os.makedirs(self.config_path, exist_ok=True)
 
             # 容器設定
             container_config = {
                 "Image": self.image_name,
                 "Cmd": ["provide"],
-                "Env": ["TZ=Asia/Taipei"],
+                "Env": [f"{key}={value}" for key, value in provider_environment(self.resource_profile).items()],
                 "HostConfig": {
                     "Binds": [f"{self.config_path}:/root/.urnetwork:rw"],
-                    "RestartPolicy": {"Name": "unless-stopped"}
+                    "RestartPolicy": {"Name": "unless-stopped"},
+                    **self.resource_profile.host_config(),
+                    **self.network_profile.host_config(),
+                    **self.log_profile.host_config()
                 },
                 "name": self.container_name
             }
 
+            network_request = self.network_profile.network_create_request()
+            if network_request:
+                # 網路已存在時 Docker 回傳 409，直接沿用
+                self._make_request("POST", "networks/create", network_request)
+
             logger.info(f"Creating container with config: {json.dumps(container_config, indent=2)}")
 
             # 創建容器
@@ -150,6 +179,40 @@ class SupervisorManager:
             logger.error(f"Failed to create container: {e}")
             return {"success": False, "error": str(e)}
 
+    def apply_resources(self, profile: Optional[ResourceProfile] = None) -> Dict[str, Any]:
+        """透過 containers/{id}/update 即時套用資源設定"""
+        if profile is not None:
+            self.resource_profile = profile
+        profile = self.resource_profile
+
+        try:
+            if not self.hassio_token:
+                return {"success": False, "error": "無 Supervisor API 存取權限"}
+
+            container_info = self.get_container_info()
+            if not container_info:
+                return {"success": True, "message": "容器尚未建立，將在建立時套用", "applied": {}, "requires_recreate": False}
+
+            details = self._make_request("GET", f"containers/{container_info['Id']}/json") or {}
+            host_config = details.get("HostConfig", {})
+            changes = profile.diff(host_config)
+            if changes:
+                logger.info(f"Updating provider resources: {changes}")
+                if self._make_request("POST", f"containers/{container_info['Id']}/update", changes) is None:
+                    return {"success": False, "error": "無法更新容器資源設定"}
+
+            return {
+                "success": True,
+                "message": "資源設定已套用" if changes else "資源設定未變更",
+                "applied": changes,
+                "requires_recreate": (profile.needs_recreate(host_config) or not self.network_profile.matches(host_config)
+                                      or not self.log_profile.matches(host_config))
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to apply resources: {e}")
+            return {"success": False, "error": str(e)}
+
     def stop_provider(self) -> Dict[str, Any]:
         """停止 Provider 容器"""
         try:
@@ -204,6 +267,9 @@ class SupervisorManager:
                 }
 
             container_info = self.get_container_info()
+            if not container_info and self.breaker.consecutive_failures and self._last_status:
+                # Supervisor 無回應，不是容器不存在
+                return dict(self._last_status, stale=True)
             if not container_info:
                 return {
                     "status": "not_found",
@@ -211,13 +277,14 @@ class SupervisorManager:
                 }
 
             state = container_info.get("State", "unknown")
-            return {
+            self._last_status = {
                 "status": state,
                 "name": container_info.get("Names", [None])[0],
                 "id": container_info.get("Id", "unknown")[:12],
                 "image": container_info.get("Image", "unknown"),
                 "created": container_info.get("Created", "unknown")
             }
+            return dict(self._last_status, stale=False)
 
         except Exception as e:
             logger.error(f"Failed to get status: {e}")
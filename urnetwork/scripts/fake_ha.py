@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""模擬 Home Assistant Core API，用來在本機測試感測器推送
+
+接受 POST /api/states/<entity_id>，記錄並輸出每次更新。
+
+用法：
+    python3 scripts/fake_ha.py [--port 8123] [--token TOKEN]
+
+接著以下列環境變數啟動 Web UI：
+    URNETWORK_HA_SENSORS=true URNETWORK_HA_API_URL=http://127.0.0.1:8123/api
+"""
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATES = {}
+
+
+def make_handler(token):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self):
+            return token is None or self.headers.get("Authorization") == f"Bearer {token}"
+
+        def do_GET(self):
+            if not self._authorized():
+                return self._reply(401, {"message": "Unauthorized"})
+            if self.path.rstrip("/") == "/api/states":
+                return self._reply(200, list(STATES.values()))
+            return self._reply(404, {"message": "Not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return self._reply(401, {"message": "Unauthorized"})
+            if not self.path.startswith("/api/states/"):
+                return self._reply(404, {"message": "Not found"})
+
+            entity_id = self.path[len("/api/states/"):]
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+            created = entity_id not in STATES
+            STATES[entity_id] = {"entity_id": entity_id, **data, "last_updated": time.time()}
+            print(f"{time.strftime('%H:%M:%S')} {entity_id} = {data.get('state')}", flush=True)
+            return self._reply(201 if created else 200, STATES[entity_id])
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--token", default=None, help="要求的 Bearer token（預設不檢查）")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.token))
+    print(f"Fake Home Assistant listening on http://127.0.0.1:{args.port}/api", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""量測 Web UI 啟動成本：各模組匯入時間、常駐記憶體增量與管理器初始化時間
+
+每個項目都在全新的 Python 直譯器中量測，避免模組快取影響結果。
+比較 docker SDK 與內建 Engine 客戶端（utils.docker_engine）時，
+請在目標硬體（例如 armv7）上執行。
+
+用法：
+    python3 scripts/measure_startup.py [--app-dir /app] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_TARGETS = [
+    "flask",
+    "requests",
+    "docker",
+    "utils.docker_engine",
+    "utils.log_pipeline",
+    "utils.startup",
+    "utils.docker_manager",
+    "utils.auth_manager",
+    "utils.stats_collector",
+]
+
+INIT_TARGETS = [
+    ("utils.docker_manager", "DockerManager"),
+    ("utils.auth_manager", "AuthManager"),
+    ("utils.stats_collector", "StatsCollector"),
+]
+
+IMPORT_SNIPPET = """
+import json, resource, sys, time
+sys.path.insert(0, {app_dir!r})
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+import {module}
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+}}))
+"""
+
+INIT_SNIPPET = """
+import json, sys, time, importlib
+sys.path.insert(0, {app_dir!r})
+module = importlib.import_module({module!r})
+started = time.perf_counter()
+getattr(module, {cls!r})()
+print(json.dumps({{"seconds": time.perf_counter() - started}}))
+"""
+
+
+def run_snippet(code):
+    """在子行程執行程式碼並取得量測秒數"""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        timeout=300
+    )
+    if result.returncode != 0:
+        last_line = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return None, last_line
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def measure(label, code, repeat):
+    """重複量測並回傳中位數"""
+    samples = []
+    for _ in range(repeat):
+        sample, error = run_snippet(code)
+        if error:
+            return {"name": label, "error": error}
+        samples.append(sample)
+    result = {"name": label, "median_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1)}
+    if "rss_kb" in samples[0]:
+        result["rss_kb"] = int(statistics.median(s["rss_kb"] for s in samples))
+    return result
+
+
+def main():
+    default_app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rootfs", "opt", "urnetwork")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=os.path.normpath(default_app_dir), help="app.py 與 utils/ 所在目錄")
+    parser.add_argument("--repeat", type=int, default=3, help="每個項目的量測次數")
+    parser.add_argument("--json", action="store_true", help="以 JSON 輸出")
+    args = parser.parse_args()
+
+    results = {"imports": [], "inits": []}
+    for module in IMPORT_TARGETS:
+        code = IMPORT_SNIPPET.format(app_dir=args.app_dir, module=module)
+        results["imports"].append(measure(module, code, args.repeat))
+
+    for module, cls in INIT_TARGETS:
+        code = INIT_SNIPPET.format(app_dir=args.app_dir, module=module, cls=cls)
+        results["inits"].append(measure(f"{cls}()", code, args.repeat))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for section, title in (("imports", "Import cost"), ("inits", "Init cost")):
+        print(f"{title} (median of {args.repeat}, fresh interpreter):")
+        for item in results[section]:
+            value = f"{item['median_ms']:>9.1f} ms" if "median_ms" in item else f"  failed: {item['error']}"
+            if "rss_kb" in item:
+                value += f"  RSS +{item['rss_kb'] / 1024:.1f} MB"
+            print(f"  {item['name']:<28}{value}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
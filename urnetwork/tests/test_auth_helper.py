@@ -0,0 +1,47 @@
+"""認證輔助容器與 DockerManager 共用 Engine 客戶端、斷路器與請求期限"""
+
+import pytest
+
+from utils import deadline
+from utils.auth_helper import AuthHelperContainer
+from utils.auth_manager import AuthManager
+from utils.circuit_breaker import CircuitOpen
+from utils.deadline import DeadlineExceeded
+from utils.docker_engine import EngineClient
+
+
+@pytest.fixture
+def broken_client(tmp_path):
+    """連不上 daemon、斷路器已開啟的客戶端"""
+    client = EngineClient(str(tmp_path / "missing.sock"), timeout=1)
+    for _ in range(client.breaker.failure_threshold):
+        with pytest.raises(OSError):
+            client.ping()
+    assert client.breaker.snapshot()["state"] == "open"
+    return client
+
+
+def test_helper_defaults_to_the_shared_client(tmp_path):
+    helper = AuthHelperContainer("image", str(tmp_path / ".urnetwork"))
+    assert helper._get_client() is EngineClient.shared()
+    assert EngineClient.shared() is EngineClient.shared()
+
+
+def test_open_breaker_does_not_fall_back_to_docker_run(tmp_path, broken_client):
+    def no_docker_run(*args, **kwargs):
+        raise AssertionError("docker run must not bypass the open breaker")
+
+    manager = AuthManager.__new__(AuthManager)
+    manager.config_path = str(tmp_path)
+    manager.auth_helper = AuthHelperContainer("image", str(tmp_path / ".urnetwork"), client=broken_client)
+    manager._run_command = no_docker_run
+
+    with pytest.raises(CircuitOpen):
+        manager._run_auth_image(["status"], timeout=30)
+
+
+def test_exec_respects_the_request_deadline(tmp_path, broken_client):
+    helper = AuthHelperContainer("image", str(tmp_path / ".urnetwork"), client=broken_client)
+    with deadline.budget(0):
+        with pytest.raises(DeadlineExceeded):
+            helper.exec(["status"], timeout=30)
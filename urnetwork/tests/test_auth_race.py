@@ -0,0 +1,73 @@
+"""認證方法競速：落敗者先取消並結束，暫存目錄才會被移除；進度只轉送領先者"""
+
+import os
+import threading
+import time
+
+from utils import auth_manager
+from utils.auth_manager import AuthCancelled, AuthManager
+
+
+def make_manager(tmp_path):
+    mgr = AuthManager.__new__(AuthManager)
+    mgr.config_path = str(tmp_path / ".urnetwork")
+    os.makedirs(mgr.config_path)
+    mgr.auth_info = auth_manager.JsonStateFile(os.path.join(mgr.config_path, "auth_info.json"))
+    return mgr
+
+
+def test_losers_are_cancelled_and_joined_before_cleanup(tmp_path):
+    mgr = make_manager(tmp_path)
+    loser_state = {}
+
+    def fake_direct(auth_code, path, progress, config_dir, cancel):
+        progress("running_auth")
+        if path == "fast":
+            progress("waiting_for_jwt")
+            with open(os.path.join(config_dir, "jwt"), "w") as f:
+                f.write("a.b.c")
+            return {"success": True, "method": "direct_fast"}
+
+        # 落敗者：被取消後仍在寫入暫存目錄一小段時間
+        cancel.wait()
+        time.sleep(0.2)
+        with open(os.path.join(config_dir, "partial"), "w") as f:
+            f.write("x")
+        loser_state["home_existed"] = os.path.isdir(os.path.dirname(config_dir))
+        progress("verifying")
+        raise AuthCancelled()
+
+    mgr._authenticate_direct = fake_direct
+    stages = []
+    result = mgr._race_methods("code", [("direct_binary", "fast"), ("direct_command", "slow")], stages.append)
+
+    assert result["success"]
+    assert loser_state["home_existed"]
+    assert os.path.exists(os.path.join(mgr.config_path, "jwt"))
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".auth-race-")]
+    # 每個階段只回報一次且依序前進，落敗者取消後的進度不轉送
+    assert stages == ["running_auth", "waiting_for_jwt"]
+
+
+def test_abandoned_racer_cleans_up_its_own_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth_manager, "RACE_JOIN_TIMEOUT", 0.05)
+    mgr = make_manager(tmp_path)
+    release = threading.Event()
+
+    def fake_direct(auth_code, path, progress, config_dir, cancel):
+        if path == "fast":
+            with open(os.path.join(config_dir, "jwt"), "w") as f:
+                f.write("a.b.c")
+            return {"success": True, "method": "direct_fast"}
+        release.wait(5)
+        raise AuthCancelled()
+
+    mgr._authenticate_direct = fake_direct
+    assert mgr._race_methods("code", [("direct_binary", "fast"), ("direct_command", "stuck")])["success"]
+    assert [name for name in os.listdir(tmp_path) if name.startswith(".auth-race-")]
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while [name for name in os.listdir(tmp_path) if name.startswith(".auth-race-")]:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
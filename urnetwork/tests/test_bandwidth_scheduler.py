@@ -0,0 +1,112 @@
+"""流量排程：時段解析、計數器來源與用量累計"""
+
+import logging
+from datetime import datetime
+
+import pytest
+
+from utils.bandwidth_scheduler import BandwidthScheduler, in_windows, next_boundary, parse_net_dev, parse_windows
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: 5000      10    0    0    0     0          0         0     5000      10    0    0    0     0       0          0
+  eth0: 1000      20    0    0    0     0          0         0     300       10    0    0    0     0       0          0
+  wlan0: 200      20    0    0    0     0          0         0     40        10    0    0    0     0       0          0
+docker0: 9999     20    0    0    0     0          0         0     9999      10    0    0    0     0       0          0
+vethab12: 9999    20    0    0    0     0          0         0     9999      10    0    0    0     0       0          0
+"""
+
+
+def test_parse_windows():
+    assert parse_windows("08:00-18:00, 22:00-02:00") == [(480, 1080), (1320, 120)]
+    assert parse_windows("00:00-24:00") == [(0, 1440)]
+    assert parse_windows("") == []
+
+
+@pytest.mark.parametrize("spec", [
+    "10:75-11:00", "08:00-09:60", "25:00-26:00", "24:00-06:00", "24:30-01:00",
+    "08:00-08:00", "8-18", "08:00", "08:00-18:00,junk",
+])
+def test_parse_windows_rejects_invalid_times(spec):
+    with pytest.raises(ValueError):
+        parse_windows(spec)
+
+
+def test_in_windows_across_midnight():
+    windows = parse_windows("22:00-02:00")
+    assert in_windows(windows, 23 * 60)
+    assert in_windows(windows, 60)
+    assert not in_windows(windows, 2 * 60)
+    assert not in_windows(windows, 12 * 60)
+    assert in_windows([], 12 * 60)
+
+
+def test_next_boundary_rolls_over_to_tomorrow():
+    windows = parse_windows("08:00-18:00")
+    assert next_boundary(windows, datetime(2026, 1, 5, 9, 30)) == datetime(2026, 1, 5, 18, 0)
+    assert next_boundary(windows, datetime(2026, 1, 5, 19, 0)) == datetime(2026, 1, 6, 8, 0)
+    assert next_boundary([], datetime(2026, 1, 5, 19, 0)) is None
+
+
+class FakeManager:
+    def __init__(self, stats, net_dev=None):
+        self.stats = stats
+        self.net_dev = net_dev
+        self.reads = 0
+
+    def get_stats(self):
+        return self.stats
+
+    def read_provider_file(self, path):
+        self.reads += 1
+        return self.net_dev
+
+
+def scheduler(tmp_path, manager):
+    return BandwidthScheduler(manager, str(tmp_path / "usage.json"), daily_quota_gb=1)
+
+
+def test_parse_net_dev_skips_loopback_and_virtual_interfaces():
+    assert parse_net_dev(NET_DEV) == (1200, 340)
+    assert parse_net_dev("") is None
+    assert parse_net_dev(None) is None
+
+
+def test_container_stats_are_preferred(tmp_path):
+    manager = FakeManager({"networks": {"eth0": {"rx_bytes": 10, "tx_bytes": 5}}}, NET_DEV)
+    assert scheduler(tmp_path, manager)._read_counters() == (10, 5)
+    assert manager.reads == 0
+
+
+def test_host_network_falls_back_to_proc_net_dev(tmp_path, caplog):
+    bandwidth = scheduler(tmp_path, FakeManager({"cpu_stats": {}}, NET_DEV))
+    with caplog.at_level(logging.WARNING):
+        assert bandwidth._read_counters() == (1200, 340)
+        assert bandwidth._read_counters() == (1200, 340)
+    assert len([r for r in caplog.records if "/proc/net/dev" in r.getMessage()]) == 1
+
+
+def test_missing_counters_warn_once(tmp_path, caplog):
+    bandwidth = scheduler(tmp_path, FakeManager({"cpu_stats": {}}))
+    with caplog.at_level(logging.WARNING):
+        assert bandwidth._read_counters() is None
+        assert bandwidth._read_counters() is None
+    assert len([r for r in caplog.records if "cannot be enforced" in r.getMessage()]) == 1
+
+
+def test_stopped_container_reads_nothing(tmp_path):
+    manager = FakeManager({}, NET_DEV)
+    assert scheduler(tmp_path, manager)._read_counters() is None
+    assert manager.reads == 0
+
+
+def test_switching_counter_source_only_rebases(tmp_path):
+    manager = FakeManager({"networks": {"eth0": {"rx_bytes": 100, "tx_bytes": 100}}}, NET_DEV)
+    bandwidth = scheduler(tmp_path, manager)
+    bandwidth.record_sample(bandwidth._read_counters())
+    manager.stats = {"networks": {"eth0": {"rx_bytes": 150, "tx_bytes": 150}}}
+    assert bandwidth.record_sample(bandwidth._read_counters())["day_bytes"] == 100
+
+    # 改為 host 網路後主機計數器遠大於容器計數器，不能當成流量
+    manager.stats = {"cpu_stats": {}}
+    assert bandwidth.record_sample(bandwidth._read_counters())["day_bytes"] == 100
@@ -0,0 +1,80 @@
+"""CircuitBreaker 的狀態轉換與請求期限"""
+
+import time
+
+import pytest
+
+from utils import deadline
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from utils.deadline import DeadlineExceeded, timeout_for
+
+
+class Backend(Exception):
+    pass
+
+
+def fail():
+    raise Backend("down")
+
+
+def test_opens_after_consecutive_failures_and_rejects_calls():
+    breaker = CircuitBreaker("test", failure_threshold=2, failures=(Backend,))
+    for _ in range(2):
+        with pytest.raises(Backend):
+            breaker.call(fail)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpen):
+        breaker.call(lambda: "not called")
+    assert breaker.snapshot()["last_error"] == "down"
+
+
+def test_half_open_allows_one_probe_and_closes_on_success():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05, failures=(Backend,))
+    with pytest.raises(Backend):
+        breaker.call(fail)
+    time.sleep(0.06)
+
+    def probe():
+        assert breaker.state == HALF_OPEN
+        # 探測進行中時其他呼叫被拒絕
+        with pytest.raises(CircuitOpen):
+            breaker.call(lambda: None)
+        return "ok"
+
+    assert breaker.call(probe) == "ok"
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.05, failures=(Backend,))
+    for _ in range(3):
+        with pytest.raises(Backend):
+            breaker.call(fail)
+    time.sleep(0.06)
+    with pytest.raises(Backend):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+
+
+def test_other_errors_count_as_healthy_and_ignored_errors_do_not_count():
+    breaker = CircuitBreaker("test", failure_threshold=1, failures=(Backend,), ignored=(DeadlineExceeded,))
+    with pytest.raises(KeyError):
+        breaker.call(lambda: {}["missing"])
+    with deadline.budget(0):
+        with pytest.raises(DeadlineExceeded):
+            breaker.call(lambda: timeout_for(10))
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+
+
+def test_timeout_for_clamps_to_the_remaining_budget():
+    assert timeout_for(10) == 10
+    assert timeout_for(None) is None
+    with deadline.budget(1):
+        assert 0 < timeout_for(10) <= 1
+        assert 0 < timeout_for(None) <= 1
+        assert timeout_for(0.5) == 0.5
+    with deadline.budget(0):
+        with pytest.raises(DeadlineExceeded):
+            timeout_for(10)
+    assert deadline.remaining() is None
@@ -0,0 +1,90 @@
+"""崩潰循環保護經由生命週期協調器停止與重新啟動 Provider"""
+
+import threading
+
+from utils.crash_guard import CrashLoopGuard
+from utils.docker_manager import DockerManager
+from utils.lifecycle import LifecycleCoordinator
+from utils.single_flight import SingleFlight
+
+
+class FakeContainer:
+    short_id = "abc123"
+
+    def __init__(self, status):
+        self.status = status
+        self.calls = []
+
+    def stop(self):
+        self.calls.append("stop")
+        self.status = "exited"
+
+    def start(self):
+        self.calls.append("start")
+        self.status = "running"
+
+    def unpause(self):
+        self.calls.append("unpause")
+        self.status = "running"
+
+    def reload(self):
+        pass
+
+
+def manager(container):
+    mgr = DockerManager.__new__(DockerManager)
+    mgr.client = object()
+    mgr.container_name = "urnetwork-provider"
+    mgr.lifecycle = LifecycleCoordinator(mgr.container_name)
+    mgr._flight = SingleFlight()
+    mgr._pause_holders = set()
+    mgr._pause_lock = threading.Lock()
+    mgr._start_listeners = []
+    mgr.get_container = lambda: container
+    mgr._prepare_container = lambda: container
+    mgr._start_container = lambda c: c.start()
+    mgr.get_logs = lambda lines=50: ""
+    return mgr
+
+
+def guard_for(mgr):
+    guard = CrashLoopGuard(max_restarts=2, base_backoff=0.05)
+    guard.docker_mgr = mgr
+    guard.state = "monitoring"
+    return guard
+
+
+def die():
+    return {"Action": "die", "Actor": {"Attributes": {"exitCode": "1"}}}
+
+
+def test_crash_loop_stops_and_restarts_through_the_lifecycle():
+    container = FakeContainer("restarting")
+    mgr = manager(container)
+    guard = guard_for(mgr)
+
+    guard.handle_event(die())
+    guard.handle_event(die())
+    assert guard.state == "backoff"
+    assert container.calls == ["stop"]
+    assert mgr.lifecycle.snapshot()["last_operation"]["operation"] == "stop"
+
+    guard._timer.join(2)
+    assert container.calls == ["stop", "start"]
+    assert mgr.lifecycle.snapshot()["state"] == "running"
+
+
+def test_crash_loop_stop_waits_for_a_running_operation():
+    container = FakeContainer("running")
+    mgr = manager(container)
+    guard = guard_for(mgr)
+
+    with mgr.lifecycle.exclusive():
+        pauser = threading.Thread(target=guard._pause_container)
+        pauser.start()
+        pauser.join(0.2)
+        # 其他變更持有鎖時，保護機制不能直接操作容器
+        assert pauser.is_alive() and container.calls == []
+
+    pauser.join(2)
+    assert container.calls == ["stop"]
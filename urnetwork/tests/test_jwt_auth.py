@@ -0,0 +1,87 @@
+"""jwt 檔案存在時，認證狀態只依 exp 判斷"""
+
+import base64
+import json
+import os
+import time
+
+import pytest
+
+from utils import auth_manager
+from utils.auth_manager import AuthManager
+from utils.jwt_info import decode_claims, describe_claims
+
+
+def make_token(claims):
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    return f"{part({'alg': 'none'})}.{part(claims)}.sig"
+
+
+@pytest.fixture
+def mgr(tmp_path, monkeypatch):
+    def no_subprocess(*args, **kwargs):
+        raise AssertionError("is_authenticated must not run external commands when a JWT exists")
+
+    monkeypatch.setattr(auth_manager.subprocess, "run", no_subprocess)
+    manager = AuthManager.__new__(AuthManager)
+    manager.config_path = str(tmp_path)
+    manager.jwt_file = str(tmp_path / "jwt")
+    manager.auth_info_file = str(tmp_path / "auth_info.json")
+    manager.auth_info = auth_manager.JsonStateFile(manager.auth_info_file)
+    manager._jwt_cache = None
+    manager._expiry_warned = None
+    manager._invalid_warned = None
+    manager.auth_methods = [("docker_in_docker", "docker")]
+    # 會讓舊的推測判斷為已認證的狀態
+    manager.auth_info.save({"success": True, "timestamp": time.time()})
+    (tmp_path / "token").write_text("x" * 40)
+    return manager
+
+
+def test_decode_and_describe_claims():
+    claims = decode_claims(make_token({"exp": 2000, "iat": 1000}))
+    assert claims == {"exp": 2000, "iat": 1000}
+    assert describe_claims(claims, now=1500)["expires_in"] == 500
+    assert describe_claims(claims, now=2500)["expired"]
+    assert decode_claims("not-a-jwt") is None
+
+
+def test_valid_jwt_is_authenticated(mgr):
+    open(mgr.jwt_file, "w").write(make_token({"exp": time.time() + 3600}))
+    assert mgr.is_authenticated()
+
+
+def test_expired_jwt_is_authoritative(mgr):
+    open(mgr.jwt_file, "w").write(make_token({"exp": time.time() - 60}))
+    assert not mgr.is_authenticated()
+
+
+def test_undecodable_jwt_is_not_authenticated(mgr):
+    open(mgr.jwt_file, "w").write("garbage")
+    assert not mgr.is_authenticated()
+
+
+def test_heuristics_only_without_jwt(mgr):
+    assert mgr.is_authenticated()
+
+
+def test_manual_auth_is_authenticated(mgr):
+    # 只留下手動認證建立的檔案
+    mgr._clear_auth_files()
+    mgr.auth_info.save({})
+
+    result = mgr._authenticate_manual("a" * 60)
+    assert result["success"]
+    assert not os.path.exists(mgr.jwt_file)
+    assert mgr.is_authenticated()
+
+
+def test_no_auth_files_does_not_run_docker(mgr):
+    def no_auth_image(*args, **kwargs):
+        raise AssertionError("is_authenticated must not run the auth image")
+
+    mgr._clear_auth_files()
+    mgr.auth_info.save({})
+    mgr._run_auth_image = no_auth_image
+    assert not mgr.is_authenticated()
@@ -0,0 +1,38 @@
+"""LogProfile：選項驗證、壓縮與既有容器的比對"""
+
+import logging
+
+import pytest
+
+from utils.log_profile import LogProfile
+
+
+def test_log_config_uses_string_values():
+    profile = LogProfile("local", "20M", 5, False)
+    assert profile.log_config() == {
+        "Type": "local",
+        "Config": {"max-size": "20m", "max-file": "5", "compress": "false"}
+    }
+
+
+def test_single_file_disables_compression(caplog):
+    with caplog.at_level(logging.WARNING):
+        profile = LogProfile("json-file", "10m", 1, True)
+    assert profile.compress is False
+    assert profile.log_config()["Config"]["compress"] == "false"
+    assert "max-file >= 2" in caplog.text
+
+    assert LogProfile("json-file", "10m", 2, True).compress is True
+
+
+@pytest.mark.parametrize("args", [("syslog", "10m", 3), ("json-file", "10", 3), ("json-file", "10m", 0)])
+def test_invalid_options_are_rejected(args):
+    with pytest.raises(ValueError):
+        LogProfile(*args)
+
+
+def test_matches_existing_container():
+    profile = LogProfile()
+    assert profile.matches(profile.host_config())
+    assert not profile.matches({"LogConfig": {"Type": "json-file", "Config": {}}})
+    assert not profile.matches({})
@@ -0,0 +1,50 @@
+"""ResourceProfile：欄位轉換、差異比對與取消限制"""
+
+import pytest
+
+from utils.resource_profile import CPU_PERIOD, ResourceProfile, all_cpus, parse_size
+
+
+def test_parse_size():
+    assert parse_size("512m") == 512 * 1024 ** 2
+    assert parse_size("1.5g") == int(1.5 * 1024 ** 3)
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_diff_only_reports_changed_fields():
+    profile = ResourceProfile.from_dict({"cpus": 1.5, "pids_limit": 256})
+    applied = {"CpuPeriod": CPU_PERIOD, "CpuQuota": 150000, "PidsLimit": 256}
+    assert profile.diff(applied) == {}
+    assert profile.diff({}) == applied
+
+
+def test_clearing_live_limits_sends_reset_values():
+    current = ResourceProfile.from_dict({"cpus": 1, "pids_limit": 256, "cpuset_cpus": "0"})
+    host_config = current.host_config()
+
+    cleared = current.merged({"cpus": None, "pids_limit": None, "cpuset_cpus": None})
+    assert cleared.to_dict()["cpus"] is None
+    assert cleared.diff(host_config) == {"CpuQuota": -1, "PidsLimit": -1, "CpusetCpus": all_cpus()}
+    assert not cleared.needs_recreate(host_config)
+
+    # 取消後容器已不受限制，不再重複送出
+    reset = dict(host_config, CpuQuota=-1, PidsLimit=-1, CpusetCpus=all_cpus())
+    assert cleared.diff(reset) == {}
+
+
+def test_clearing_memory_requires_recreate():
+    current = ResourceProfile.from_dict({"mem_limit": "512m", "nofile": 4096})
+    host_config = current.host_config()
+    assert current.recreate_fields(host_config) == []
+
+    cleared = current.merged({"mem_limit": None, "nofile": None})
+    assert cleared.diff(host_config) == {}
+    assert cleared.recreate_fields(host_config) == ["mem_limit", "nofile"]
+    assert cleared.needs_recreate(host_config)
+
+
+def test_invalid_values_are_rejected():
+    for data in ({"cpus": 0}, {"cpuset_cpus": "a-b"}, {"mem_limit": "1m"}, {"blkio_weight": 5}):
+        with pytest.raises(ValueError):
+            ResourceProfile.from_dict(data)
@@ -0,0 +1,105 @@
+"""SingleFlight：並行呼叫合併為一次，結果在 max_age 內重用"""
+
+import threading
+import time
+
+import pytest
+
+from utils import deadline
+from utils.deadline import DeadlineExceeded
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 5
+
+
+def test_result_is_reused_within_max_age_and_forgotten():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do("key", lambda: next(counter), max_age=10) == 0
+    assert flight.do("key", lambda: next(counter), max_age=10) == 0
+    assert flight.age("key") < 1
+    assert flight.do("key", lambda: next(counter), max_age=0) == 1
+
+    flight.forget("key")
+    assert flight.age("key") is None
+    assert flight.do("key", lambda: next(counter), max_age=10) == 2
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail, max_age=10)
+    assert flight.do("key", lambda: "ok", max_age=10) == "ok"
+
+
+def test_follower_wait_is_bounded_by_the_deadline():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def hung():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    leader = threading.Thread(target=flight.do, args=("key", hung))
+    leader.start()
+    assert started.wait(2)
+
+    begin = time.monotonic()
+    with deadline.budget(0.1):
+        with pytest.raises(DeadlineExceeded):
+            flight.do("key", lambda: "unused")
+    assert time.monotonic() - begin < 1
+
+    release.set()
+    leader.join(2)
+
+
+def test_forget_during_a_flight_discards_its_result():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def stale():
+        started.set()
+        release.wait(2)
+        return "stale"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", stale, max_age=10)))
+    leader.start()
+    assert started.wait(2)
+
+    flight.forget()
+    # 作廢後的呼叫不再被共用
+    assert flight.do("key", lambda: "fresh", max_age=0) == "fresh"
+
+    release.set()
+    leader.join(2)
+    assert results == ["stale"]
+    assert flight.do("key", lambda: "recomputed", max_age=10) == "fresh"
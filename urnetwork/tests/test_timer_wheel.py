@@ -0,0 +1,54 @@
+"""TimerWheel：排程、取消與跨圈的計時器"""
+
+import threading
+import time
+
+import pytest
+
+from utils.timer_wheel import TimerWheel
+
+
+@pytest.fixture
+def wheel():
+    timers = TimerWheel(tick=0.01, slots=8, name="test-wheel")
+    timers.start()
+    yield timers
+    timers.stop()
+
+
+def test_callbacks_fire_in_deadline_order(wheel):
+    fired = []
+    done = threading.Event()
+    wheel.schedule(0.05, lambda: fired.append("late") or done.set())
+    wheel.schedule(0.01, lambda: fired.append("early"))
+
+    assert done.wait(2)
+    assert fired == ["early", "late"]
+    assert wheel.pending() == 0
+
+
+def test_cancelled_timer_does_not_fire(wheel):
+    fired = threading.Event()
+    timer = wheel.schedule(0.03, fired.set)
+    wheel.cancel(timer)
+    wheel.cancel(timer)
+
+    assert wheel.pending() == 0
+    assert not fired.wait(0.1)
+
+
+def test_delay_longer_than_one_revolution(wheel):
+    # 8 格 x 0.01 秒，0.2 秒需要轉兩圈以上
+    fired = threading.Event()
+    started = time.monotonic()
+    wheel.schedule(0.2, fired.set)
+
+    assert fired.wait(2)
+    assert time.monotonic() - started >= 0.18
+
+
+def test_failing_callback_does_not_stop_the_wheel(wheel):
+    fired = threading.Event()
+    wheel.schedule(0.01, lambda: 1 / 0)
+    wheel.schedule(0.02, fired.set)
+    assert fired.wait(2)